@@ -0,0 +1,170 @@
+from enum import StrEnum, auto
+from typing import Annotated
+
+from fastapi import APIRouter, HTTPException, Query, Response, status
+from fastapi.responses import PlainTextResponse
+
+from sleepy_rework_types import ErrDetail, OpSuccess
+
+from ..config_reload import ConfigReloadResult, config_reloader
+from ..diagnostics import (
+    LoopLagReport,
+    MemoryReport,
+    TracemallocReport,
+    format_collapsed,
+    format_metrics,
+    get_memory_report,
+    get_metrics,
+    loop_watchdog,
+    profile_lock,
+    profile_loop_cprofile,
+    profile_loop_sampling,
+    stop_tracemalloc,
+    take_tracemalloc_snapshot,
+)
+from .deps import AuthDep
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[AuthDep])
+
+
+class ProfileFormat(StrEnum):
+    COLLAPSED = auto()
+    PSTATS = auto()
+
+
+@router.get(
+    "/profile",
+    summary="对事件循环进行性能分析",
+    response_class=PlainTextResponse,
+    responses={
+        200: {
+            "content": {"text/plain": {}, "application/octet-stream": {}},
+            "description": "collapsed stacks 文本，或 pstats 文件",
+        },
+        401: {"model": ErrDetail, "description": "鉴权失败"},
+        409: {"model": ErrDetail, "description": "已有性能分析正在进行"},
+        422: {"model": ErrDetail, "description": "请求参数解析失败"},
+    },
+)
+async def _(
+    duration: Annotated[float, Query(gt=0, le=60)] = 10,
+    format: Annotated[ProfileFormat, Query()] = ProfileFormat.COLLAPSED,  # noqa: A002
+    interval: Annotated[float, Query(ge=0.001, le=1)] = 0.005,
+):
+    """
+    在 `duration` 秒内对处理请求的事件循环线程进行性能分析，同一时间只能进行一个
+
+    - `collapsed`（默认）：在另一线程中每 `interval` 秒采样一次事件循环线程的调用栈，\
+    返回 collapsed stacks 格式文本（每行为 `栈帧;栈帧;... 采样次数`），可直接用于生成火焰图，对服务影响很小
+    - `pstats`：使用 cProfile 记录事件循环期间运行的所有函数调用，返回 pstats 文件，\
+    可用 `pstats` 模块或 snakeviz 等工具查看，分析期间服务会明显变慢
+    """
+    if profile_lock.locked():
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A profile is already running",
+        )
+
+    async with profile_lock:
+        if format is ProfileFormat.PSTATS:
+            return Response(
+                await profile_loop_cprofile(duration),
+                media_type="application/octet-stream",
+                headers={"Content-Disposition": 'attachment; filename="loop.pstats"'},
+            )
+        return format_collapsed(await profile_loop_sampling(duration, interval))
+
+
+@router.get(
+    "/loop-lag",
+    summary="获取事件循环延迟情况",
+    responses={401: {"model": ErrDetail, "description": "鉴权失败"}},
+)
+async def _() -> LoopLagReport:
+    """
+    返回事件循环调度延迟的统计，以及最近捕获到的事件循环阻塞时的调用栈，\
+    需要在配置中开启 `loop_watchdog`
+    """
+    return loop_watchdog.report()
+
+
+@router.get(
+    "/metrics",
+    summary="获取 Prometheus 格式的指标",
+    response_class=PlainTextResponse,
+    responses={401: {"model": ErrDetail, "description": "鉴权失败"}},
+)
+async def _():
+    return format_metrics(get_metrics())
+
+
+@router.post(
+    "/config/reload",
+    summary="重新加载配置文件",
+    responses={
+        401: {"model": ErrDetail, "description": "鉴权失败"},
+        422: {"model": ErrDetail, "description": "配置文件加载失败，仍使用当前配置"},
+    },
+)
+async def _() -> ConfigReloadResult:
+    """
+    重新加载配置文件，并只应用与上次加载时相比有变化的部分，\
+    未变化的设备及其连接不受影响，配置中开启 `watch_config` 时会在配置文件变化时自动执行
+
+    部分仅在启动时读取的配置项（如 `app`、`cors` 等）变化时不会被应用，\
+    将在 `restart_required` 中列出，需重启后生效
+    """
+    try:
+        return await config_reloader.reload()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=ErrDetail(msg="Failed to reload config", data=str(e)),
+        ) from e
+
+
+@router.get(
+    "/memory",
+    summary="获取内存占用概况",
+    responses={
+        401: {"model": ErrDetail, "description": "鉴权失败"},
+        422: {"model": ErrDetail, "description": "请求参数解析失败"},
+    },
+)
+async def _(top: Annotated[int, Query(ge=0, le=1000)] = 10) -> MemoryReport:
+    """
+    返回进程峰值 RSS、各设备状态的大致内存占用、状态数据最大的 `top` 个设备、\
+    以 WebSocket 连接的设备数、各方式连接的状态查看者数，以及事件日志占用
+    """
+    return await get_memory_report(top)
+
+
+@router.post(
+    "/memory/tracemalloc",
+    summary="获取 tracemalloc 快照差异",
+    responses={
+        401: {"model": ErrDetail, "description": "鉴权失败"},
+        422: {"model": ErrDetail, "description": "请求参数解析失败"},
+    },
+)
+async def _(
+    top: Annotated[int, Query(ge=1, le=1000)] = 20,
+    nframes: Annotated[int, Query(ge=1, le=100)] = 1,
+) -> TracemallocReport:
+    """
+    未开始追踪时以 `nframes` 层调用栈开始追踪内存分配，\
+    然后拍摄快照，返回与上次调用时快照相比差异最大的 `top` 个分配位置，首次调用时为空
+
+    追踪期间内存分配会变慢，排查完毕后请调用 DELETE 方法停止追踪
+    """
+    return await take_tracemalloc_snapshot(top, nframes)
+
+
+@router.delete(
+    "/memory/tracemalloc",
+    summary="停止 tracemalloc 追踪",
+    responses={401: {"model": ErrDetail, "description": "鉴权失败"}},
+)
+async def _() -> OpSuccess:
+    stop_tracemalloc()
+    return OpSuccess()
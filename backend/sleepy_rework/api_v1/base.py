@@ -1,28 +1,50 @@
 import asyncio
+from collections.abc import AsyncIterator
+from contextlib import suppress
 from typing import Annotated
 
-from debouncer import DebounceOptions, debounce
-from fastapi import APIRouter, Query, Response, WebSocket, WebSocketDisconnect, status
+from fastapi import (
+    APIRouter,
+    Header,
+    Query,
+    Request,
+    Response,
+    WebSocket,
+    WebSocketDisconnect,
+    status,
+)
 from fastapi.exceptions import HTTPException
-from fastapi.responses import PlainTextResponse
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import ValidationError
 
 from sleepy_rework_types import (
+    AckMode,
     DeviceConfig,
     DeviceInfo,
+    DeviceInfoAck,
     DeviceInfoFromClient,
     DeviceInfoFromClientWS,
+    DeviceServerConfig,
     ErrDetail,
     FrontendConfig,
     Info,
     OpSuccess,
 )
 
+from ..broadcast import (
+    DEVICE_INFO_FIELDS,
+    get_info,
+    get_info_page,
+    info_broadcaster,
+    info_serializer,
+)
 from ..config import config
-from ..devices import Device, device_manager
+from ..devices import Device, DeviceFilter, device_manager
 from ..exc_handle import close_ws_use_http_exc
 from ..log import logger
-from .deps import AuthDep, WSAuthDep
+from ..utils import decode_cursor, encode_cursor, etag_matches, make_etag
+from .admin import router as admin_router
+from .deps import AuthDep, DeviceFilterDep, WSAuthDep
 
 DESCRIPTION = """
 ## API v1 基础知识
@@ -45,6 +67,24 @@ WebSocket 连接除了可以使用 HTTP 的请求方式外，也可以使用 `Se
 """
 
 router = APIRouter(prefix="/api/v1", tags=["v1"])
+router.include_router(admin_router)
+
+
+def conditional_json_response(
+    request: Request,
+    content: bytes,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """
+    JSON response with an `ETag` validator,
+    answers `304 Not Modified` when the client already has the same content
+    """
+    etag = make_etag(content)
+    # let clients revalidate every time instead of guessing a freshness lifetime
+    headers = {**(headers or {}), "ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("If-None-Match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content, media_type="application/json", headers=headers)
 
 
 @router.get(
@@ -57,58 +97,203 @@ async def _():
 
 
 @router.get("/config/frontend", summary="获取前端配置")
-async def _() -> FrontendConfig:
+async def _(request: Request) -> FrontendConfig:
     """
     获取配置文件中 frontend 项下定义的数据
+
+    响应带有 `ETag`，可使用 `If-None-Match` 进行条件请求
     """
-    return config.frontend
+    return conditional_json_response(  # type: ignore
+        request,
+        config.frontend.model_dump_json().encode(),
+    )
+
+
+SSE_PING_INTERVAL = 15
 
 
-async def get_info() -> Info:
-    devices = (
-        None
-        if config.privacy_mode
-        else {k: v.info for k, v in device_manager.devices.items()}
+async def info_event_stream(
+    last_event_id: str,
+    device_filter: DeviceFilter | None = None,
+) -> AsyncIterator[bytes]:
+    offset = int(last_event_id) if last_event_id.isdigit() else None
+    with info_broadcaster.track_viewer("sse"):
+        async for event in info_broadcaster.subscribe_events(
+            offset,
+            SSE_PING_INTERVAL,
+            device_filter,
+        ):
+            # pings keep proxies from closing the idle connection
+            yield event.sse_event if event else b": ping\n\n"
+
+
+LONG_POLL_MAX_TIMEOUT = 60
+INFO_PAGE_MAX_LIMIT = 1000
+
+
+def parse_fields(fields: list[str] | None) -> frozenset[str] | None:
+    """Fields given repeatedly or comma separated, `None` for all of them"""
+    if not fields:
+        return None
+    parsed = frozenset(
+        name for value in fields for x in value.split(",") if (name := x.strip())
     )
-    return Info(status=device_manager.overall_status, devices=devices)
+    if unknown := parsed - DEVICE_INFO_FIELDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=ErrDetail(msg="Unknown device fields", data=sorted(unknown)),
+        )
+    return parsed or None
+
+
+async def long_poll_info(
+    since: int,
+    max_wait: float,
+    device_filter: DeviceFilter | None = None,
+) -> Response:
+    # every parked request waits on the same event, woken at once by a publish
+    with info_broadcaster.track_viewer("long-poll"):
+        changed = await info_broadcaster.wait_changed(since, max_wait)
+    headers = {"Cache-Control": "no-cache"}
+    if not changed:
+        headers["X-Sleepy-Version"] = str(since)
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    snapshot = info_broadcaster.snapshot(device_filter)
+    headers["X-Sleepy-Version"] = str(snapshot.version)
+    return Response(snapshot.data, media_type="application/json", headers=headers)
 
 
-@router.get("/info", summary="获取当前状态信息")
-async def _() -> Info:
+@router.get(
+    "/info",
+    summary="获取当前状态信息",
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": "`Accept` 包含 `text/event-stream` 时为 SSE 流",
+        },
+        304: {"description": "状态未变化，或长轮询超时"},
+        422: {"model": ErrDetail, "description": "请求参数解析失败"},
+    },
+)
+async def _(
+    request: Request,
+    device_filter: DeviceFilterDep,
+    since: Annotated[int | None, Query()] = None,
+    max_wait: Annotated[
+        float,
+        Query(alias="timeout", gt=0, le=LONG_POLL_MAX_TIMEOUT),
+    ] = 30,
+    last_event_id: Annotated[str | None, Header()] = None,
+    cursor: Annotated[str | None, Query()] = None,
+    limit: Annotated[int | None, Query(ge=1, le=INFO_PAGE_MAX_LIMIT)] = None,
+    fields: Annotated[list[str] | None, Query()] = None,
+) -> Info:
     """
+    ### 筛选设备
+
+    可使用 `status`、`device_type`、`device_os` 查询参数只获取符合条件的设备，\
+    每个参数可重复传入多个值，设备需符合所有传入的参数，且符合每个参数的任一值，\
+    如 `?status=online&status=idle&device_type=phone`，筛选后的设备按 key 排序，\
+    `status` 字段仍为所有设备的总体状态
+
+    以下各种获取方式均可使用筛选，实时获取时只会收到符合条件的设备的变化，\
+    设备不再符合条件时视为被移除
+
     ### 实时获取
 
     使用 WebSocket 连接到该路径可以获取实时推送的状态
+
+    连接时携带 `offset` 查询参数则改为推送状态变更事件（参见 InfoEvent），`offset` 为事件序号，\
+    每个事件只包含发生变化的设备，被移除的设备值为 `null`，\
+    断线重连时传入最后收到的事件序号即可只收到错过的事件，\
+    若错过的事件已不在服务端保留的范围内（或首次连接传入 `0`），将先收到一个 `snapshot` 为 `true` 的完整状态事件
+
+    无法使用 WebSocket 时，也可以在 `Accept` Header 中包含 `text/event-stream` 以 SSE 的方式获取状态变更事件，\
+    事件的 `id` 为事件序号，断线重连时携带 `Last-Event-ID` Header 即可只收到错过的事件，未携带时先收到完整状态事件
+
+    ### 长轮询
+
+    WebSocket 与 SSE 均无法使用时，可携带 `since` 查询参数进行长轮询，\
+    响应的 `X-Sleepy-Version` Header 为当前状态版本号，下次请求时作为 `since` 传入即可：
+
+    - `since` 不是当前版本时（首次请求可传入 `0`），立即返回当前状态
+    - `since` 是当前版本时，等待至状态变化后返回新状态，`timeout` 秒内状态未变化则返回 304，不带响应体
+
+    ### 条件请求
+
+    未携带 `since` 时，响应带有 `ETag`，可使用 `If-None-Match` 进行条件请求，状态未变化时返回 304
+
+    ### 分页与字段选择
+
+    设备较多时，普通请求（非实时获取与长轮询）可携带 `limit` 查询参数分页获取，设备按 key 排序，\
+    每页最多 `limit` 个，还有下一页时响应带有 `X-Sleepy-Next-Cursor` Header，\
+    将其值作为 `cursor` 查询参数传入即可获取下一页，期间设备增删不会导致重复或遗漏已有设备
+
+    可携带 `fields` 查询参数只返回设备的指定字段（可重复传入或以逗号分隔，如 `fields=name,status`），\
+    能显著减小响应体积，传入不存在的字段时返回 422
     """
-    return await get_info()
+    if since is not None:
+        return await long_poll_info(since, max_wait, device_filter)  # type: ignore
+    if "text/event-stream" in request.headers.get("Accept", ""):
+        return StreamingResponse(  # type: ignore
+            info_event_stream(last_event_id or "", device_filter),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    projection = parse_fields(fields)
+    headers: dict[str, str] = {}
+    if (cursor is None) and (limit is None):
+        info = get_info(device_filter)
+    else:
+        try:
+            after = None if cursor is None else decode_cursor(cursor)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail=str(e),
+            ) from e
+        info, next_key = get_info_page(device_filter, after, limit)
+        if next_key is not None:
+            headers["X-Sleepy-Next-Cursor"] = encode_cursor(next_key)
+    return conditional_json_response(  # type: ignore
+        request,
+        info_serializer(projection)(info),
+        headers,
+    )
 
 
 @router.websocket("/info")
-async def _(ws: WebSocket):
+async def _(
+    ws: WebSocket,
+    device_filter: DeviceFilterDep,
+    offset: Annotated[int | None, Query()] = None,
+):
     await ws.accept()
 
-    @device_manager.handle_update
-    @debounce(
-        config.frontend_event_throttle,
-        DebounceOptions(
-            leading=True,
-            trailing=True,
-            time_window=config.frontend_event_throttle,
-        ),
-    )
-    async def _handler(*_):
-        await ws.send_text((await get_info()).model_dump_json())
+    async def send_messages():
+        messages = (
+            info_broadcaster.subscribe(device_filter=device_filter)
+            if offset is None
+            else info_broadcaster.subscribe_events(offset, device_filter=device_filter)
+        )
+        async for message in messages:
+            if message:
+                await ws.send_text(message.data)
 
+    sender = asyncio.create_task(send_messages())
     try:
-        await _handler()
-        while True:
-            await ws.receive_bytes()
+        with info_broadcaster.track_viewer("websocket"):
+            while True:
+                await ws.receive_bytes()
     except WebSocketDisconnect:
         pass
     except Exception:
         logger.exception("WebSocket error")
     finally:
-        device_manager.update_handlers.remove(_handler)
+        sender.cancel()
+        with suppress(asyncio.CancelledError, Exception):
+            await sender
 
 
 def find_device_http(device_key: str) -> Device | None:
@@ -144,18 +329,23 @@ async def add_device(
     },
 )
 async def _(
+    request: Request,
     device_key: str,
     exclude_unset: Annotated[bool, Query()] = False,
 ):
+    """
+    响应带有 `ETag`，可使用 `If-None-Match` 进行条件请求
+    """
     if device_key in device_manager.devices:
-        return device_manager.devices[device_key].config.model_dump(
-            exclude_unset=exclude_unset,
-        )
-    if device_key in config.devices:
-        return config.devices[device_key].model_dump(
-            exclude_unset=exclude_unset,
-        )
-    raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+        device_config = device_manager.devices[device_key].config
+    elif device_key in config.devices:
+        device_config = config.devices[device_key]
+    else:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND)
+    return conditional_json_response(
+        request,
+        device_config.model_dump_json(exclude_unset=exclude_unset).encode(),
+    )
 
 
 @router.put(
@@ -175,27 +365,49 @@ async def _(
 )
 async def _(response: Response, device_key: str, new_config: DeviceConfig):
     device = find_device_http(device_key)
+    # update rate limits are only set by the config files, keep them
+    old_config = config.devices.get(device_key) or DeviceServerConfig()
+    config.devices[device_key] = old_config.with_config(new_config)
     if device:
         await device.update_config(new_config)
     else:
         response.status_code = status.HTTP_201_CREATED
-    config.devices[device_key] = new_config
     return OpSuccess()
 
 
-async def update_device_info_http(
-    response: Response,
+async def update_device_info(
     device_key: str,
     info: DeviceInfoFromClient | None = None,
     is_replace: bool = False,
-):
+) -> tuple[Device, bool]:
+    """Returns the updated device, and whether it was newly added"""
     device = find_device_http(device_key)
     if device:
         await device.update(info, replace=is_replace)
-    else:
-        device = await add_device(device_key, info)
+        return device, False
+    device = await add_device(device_key, info)
+    await device.update()
+    return device, True
+
+
+async def update_device_info_http(
+    response: Response,
+    device_key: str,
+    info: DeviceInfoFromClient | None = None,
+    is_replace: bool = False,
+    ack: AckMode = AckMode.FULL,
+):
+    device, created = await update_device_info(device_key, info, is_replace)
+    if ack is AckMode.NONE:
+        return Response(
+            status_code=(
+                status.HTTP_201_CREATED if created else status.HTTP_204_NO_CONTENT
+            ),
+        )
+    if created:
         response.status_code = status.HTTP_201_CREATED
-        await device.update()
+    if ack is AckMode.SEQ:
+        return DeviceInfoAck(seq=device.update_seq)
     return device.info
 
 
@@ -204,8 +416,12 @@ async def update_device_info_http(
     dependencies=[AuthDep],
     summary="更新当前设备状态",
     responses={
-        200: {"model": DeviceInfo},
-        201: {"model": DeviceInfo},
+        200: {
+            "model": DeviceInfo | DeviceInfoAck,
+            "description": "更新成功，`ack` 为 `seq` 时返回 DeviceInfoAck",
+        },
+        201: {"model": DeviceInfo, "description": "已添加新设备"},
+        204: {"description": "`ack` 为 `none` 时更新成功"},
         401: {"model": ErrDetail, "description": "鉴权失败"},
         404: {
             "model": ErrDetail,
@@ -218,6 +434,7 @@ async def _(
     response: Response,
     device_key: str,
     info: DeviceInfoFromClient | None = None,
+    ack: Annotated[AckMode, Query()] = AckMode.FULL,
 ):
     """
     ### ⚠️ 注意！数据更新机制
@@ -289,9 +506,32 @@ async def _(
     ### 仅保持唯一数据接收方式
 
     当某设备已通过 WebSocket 连接到后端，依然 HTTP 请求本接口，或新建一个 WebSocket 连接时，旧连接将自动断开
+
+    ### 更新频率限制
+
+    如配置了设备的更新频率限制，超出频率的更新不会被拒绝，而是暂缓应用，\
+    并与之后收到的更新合并（后收到的字段覆盖先收到的），在频率允许时作为一次更新应用，\
+    此时返回的是合并的更新应用前的设备状态
+
+    ### 确认模式
+
+    可使用 `ack` 查询参数指定更新成功后返回的内容，WebSocket 连接时指定则对整个连接生效：
+
+    - `full`（默认）：返回更新后的完整设备状态
+    - `seq`：仅返回设备的更新序号（参见 DeviceInfoAck），每次更新后递增
+    - `none`：不返回内容，HTTP 请求将返回 `204 No Content`（新设备仍为 `201 Created`），WebSocket 连接将不再推送消息
+
+    WebSocket 连接消息体中也可以设置 `ack` 字段，覆盖连接的确认模式，仅对该条消息生效，\
+    例如以 `seq` 模式连接后，在需要时发送 `{"ack": "full"}` 获取一次完整状态
     """
 
-    return await update_device_info_http(response, device_key, info, is_replace=False)
+    return await update_device_info_http(
+        response,
+        device_key,
+        info,
+        is_replace=False,
+        ack=ack,
+    )
 
 
 @router.put(
@@ -299,8 +539,12 @@ async def _(
     dependencies=[AuthDep],
     summary="替换当前设备状态",
     responses={
-        200: {"model": DeviceInfo},
-        201: {"model": DeviceInfo},
+        200: {
+            "model": DeviceInfo | DeviceInfoAck,
+            "description": "更新成功，`ack` 为 `seq` 时返回 DeviceInfoAck",
+        },
+        201: {"model": DeviceInfo, "description": "已添加新设备"},
+        204: {"description": "`ack` 为 `none` 时更新成功"},
         400: {"model": ErrDetail, "description": "新设备缺少设备初始配置"},
         401: {"model": ErrDetail, "description": "鉴权失败"},
         404: {
@@ -314,6 +558,7 @@ async def _(
     response: Response,
     device_key: str,
     info: DeviceInfoFromClient | None = None,
+    ack: Annotated[AckMode, Query()] = AckMode.FULL,
 ):
     """
     ### ⚠️ 注意！数据更新机制
@@ -365,7 +610,13 @@ async def _(
     请参考 PATCH 方法的文档
     """
 
-    return await update_device_info_http(response, device_key, info, is_replace=True)
+    return await update_device_info_http(
+        response,
+        device_key,
+        info,
+        is_replace=True,
+        ack=ack,
+    )
 
 
 @router.delete(
@@ -391,7 +642,11 @@ async def _(device_key: str):
 
 
 @router.websocket("/device/{device_key}/info", dependencies=[WSAuthDep])
-async def _(ws: WebSocket, device_key: str):
+async def _(
+    ws: WebSocket,
+    device_key: str,
+    ack: Annotated[AckMode, Query()] = AckMode.FULL,
+):
     try:
         device = find_device_http(device_key)
     except HTTPException as e:
@@ -429,7 +684,7 @@ async def _(ws: WebSocket, device_key: str):
             return
 
     try:
-        await device.handle_ws(ws)
+        await device.handle_ws(ws, ack)
     except WebSocketDisconnect:
         pass
     except Exception as e:
@@ -1,12 +1,13 @@
 from typing import Annotated
 
-from fastapi import Depends, HTTPException, WebSocket, params, status
+from fastapi import Depends, HTTPException, Query, WebSocket, params, status
 from fastapi.security import APIKeyHeader, HTTPAuthorizationCredentials, HTTPBearer
 from fastapi.security.utils import get_authorization_scheme_param
 
-from sleepy_rework_types import ErrDetail
+from sleepy_rework_types import ErrDetail, OnlineStatus
 
 from ..config import config
+from ..devices import DeviceFilter
 
 bearer_auth = HTTPBearer(auto_error=False)
 header_auth = APIKeyHeader(name="X-Sleepy-Secret", auto_error=False)
@@ -36,5 +37,19 @@ async def ws_auth_dep(ws: WebSocket):
     raise HTTPException(status.HTTP_401_UNAUTHORIZED, ErrDetail())
 
 
+async def device_filter_dep(
+    statuses: Annotated[list[OnlineStatus] | None, Query(alias="status")] = None,
+    device_type: Annotated[list[str] | None, Query()] = None,
+    device_os: Annotated[list[str] | None, Query()] = None,
+) -> DeviceFilter | None:
+    device_filter = DeviceFilter(
+        status=statuses,
+        device_type=device_type,
+        device_os=device_os,
+    )
+    return device_filter if device_filter.active else None
+
+
 AuthDep: params.Depends = Depends(auth_dep)
 WSAuthDep: params.Depends = Depends(ws_auth_dep)
+DeviceFilterDep = Annotated[DeviceFilter | None, Depends(device_filter_dep)]
@@ -0,0 +1,176 @@
+import hmac
+import json
+import re
+from typing import Any
+from urllib.parse import parse_qsl
+
+from fastapi import HTTPException, status
+from pydantic import TypeAdapter, ValidationError
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from sleepy_rework_types import AckMode, DeviceInfoFromClient
+
+from ..config import config
+from ..devices import Device
+from .base import update_device_info
+
+DEVICE_INFO_PATH = re.compile(r"^/api/v1/device/(?P<device_key>[^/]+)/info$")
+JSON_CONTENT_TYPE = b"application/json"
+
+_validate_info = TypeAdapter(DeviceInfoFromClient).validate_json
+
+
+def encode_json(content: Any) -> bytes:
+    # the same bytes FastAPI's JSONResponse renders for a returned model
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def encode_ack(device: Device, mode: AckMode) -> bytes:
+    if mode is AckMode.FULL:
+        return encode_json(device.info.model_dump(mode="json"))
+    if mode is AckMode.SEQ:
+        return encode_json({"seq": device.update_seq})
+    return b""
+
+
+def parse_ack_mode(query_string: bytes) -> AckMode | None:
+    """Returns `None` for anything but an empty query or a valid `ack`."""
+    if not query_string:
+        return AckMode.FULL
+    query = parse_qsl(query_string.decode("latin-1"))
+    if len(query) != 1 or query[0][0] != "ack":
+        return None
+    try:
+        return AckMode(query[0][1])
+    except ValueError:
+        return None
+
+
+class DeviceIngestFastPath:
+    """
+    Serves successful `PATCH /api/v1/device/{device_key}/info` requests
+    without going through FastAPI routing, dependencies and response encoding.
+
+    Anything it is not sure about (auth failure, non JSON body, validation error,
+    unknown device) is handed to the wrapped app with the body replayed,
+    so error responses stay exactly the same.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    def _authorized(self, headers: dict[bytes, bytes]) -> bool:
+        # read on every request, the config may be reloaded
+        if config.secret is None:
+            return True
+        secret = config.secret.encode()
+        if (v := headers.get(b"x-sleepy-secret")) is not None and hmac.compare_digest(
+            v,
+            secret,
+        ):
+            return True
+        scheme, _, credentials = headers.get(b"authorization", b"").partition(b" ")
+        return scheme.lower() == b"bearer" and hmac.compare_digest(
+            credentials,
+            secret,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "PATCH":
+            await self.app(scope, receive, send)
+            return
+
+        path: str = scope["path"]
+        if (root_path := scope.get("root_path")) and path.startswith(root_path):
+            path = path[len(root_path) :]
+        if not (match := DEVICE_INFO_PATH.match(path)):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        content_type = headers.get(b"content-type", b"").partition(b";")[0].strip()
+        ack = parse_ack_mode(scope["query_string"])
+        if not (
+            ack and self._authorized(headers) and content_type == JSON_CONTENT_TYPE
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        body, messages = await self._read_body(receive)
+        if body is None:
+            await self._fallback(scope, messages, receive, send)
+            return
+
+        try:
+            info = _validate_info(body)
+            device, created = await update_device_info(
+                match["device_key"],
+                info,
+            )
+        except (ValidationError, HTTPException):
+            await self._fallback(scope, messages, receive, send)
+            return
+
+        content = encode_ack(device, ack)
+        if created:
+            code = status.HTTP_201_CREATED
+        elif ack is AckMode.NONE:
+            code = status.HTTP_204_NO_CONTENT
+        else:
+            code = status.HTTP_200_OK
+        # mirrors starlette's Response, which leaves out the length of a 204
+        response_headers = (
+            []
+            if code == status.HTTP_204_NO_CONTENT
+            else [(b"content-length", str(len(content)).encode())]
+        )
+        if content:
+            response_headers.append((b"content-type", JSON_CONTENT_TYPE))
+        await send(
+            {
+                "type": "http.response.start",
+                "status": code,
+                "headers": response_headers,
+            },
+        )
+        await send({"type": "http.response.body", "body": content})
+
+    async def _read_body(
+        self,
+        receive: Receive,
+    ) -> tuple[bytes | None, list[Message]]:
+        """Returns `None` as body if the client went away or sent nothing."""
+        messages: list[Message] = []
+        chunks: list[bytes] = []
+        while True:
+            message = await receive()
+            messages.append(message)
+            if message["type"] != "http.request":
+                return None, messages
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body"):
+                break
+        body = b"".join(chunks)
+        return (body or None), messages
+
+    async def _fallback(
+        self,
+        scope: Scope,
+        messages: list[Message],
+        receive: Receive,
+        send: Send,
+    ) -> None:
+        pending = iter(messages)
+
+        async def replay() -> Any:
+            if (message := next(pending, None)) is not None:
+                return message
+            return await receive()
+
+        await self.app(scope, replay, send)
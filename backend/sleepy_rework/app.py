@@ -1,25 +1,55 @@
+import asyncio
 from contextlib import asynccontextmanager
 from pathlib import Path
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.httpsredirect import HTTPSRedirectMiddleware
-from fastapi.staticfiles import StaticFiles
 
 from . import __version__, api_v1
+from .api_v1.fast_path import DeviceIngestFastPath
+from .broadcast import info_broadcaster
 from .config import config
+from .config_reload import config_reloader
+from .diagnostics import loop_watchdog
 from .exc_handle import install_exc_handlers
 from .log import logger
+from .static import CachedStaticFiles
 
 DESCRIPTION = f"""
 {api_v1.DESCRIPTION}
 """
 
 
+def render_initial_state() -> str:
+    """
+    `<script>` defining `window.__SLEEPY_INITIAL_STATE__` as the frontend config
+    and the current `Info`, so the website can paint without fetching them first
+    """
+    state = (
+        f'{{"config":{config.frontend.model_dump_json()},'
+        f'"info":{info_broadcaster.snapshot().data}}}'
+    )
+    # keeps `</script>` in strings from ending the script early
+    state = (
+        state.replace("<", "\\u003c")
+        .replace("\u2028", "\\u2028")
+        .replace("\u2029", "\\u2029")
+    )
+    return f"<script>window.__SLEEPY_INITIAL_STATE__={state}</script>"
+
+
 @asynccontextmanager
 async def lifespan(_: FastAPI):
     logger.debug(f"Starting app with config: {config.model_dump_json()}")
+    await asyncio.to_thread(static_files.load)
+    if config.loop_watchdog:
+        loop_watchdog.start()
+    if config.watch_config:
+        config_reloader.start()
     yield
+    config_reloader.stop()
+    loop_watchdog.stop()
 
 
 app = FastAPI(
@@ -35,6 +65,9 @@ app = FastAPI(
     ),
 )
 
+# added first so it sits innermost, behind CORS and the HTTPS redirect
+if config.fast_device_ingest:
+    app.add_middleware(DeviceIngestFastPath)
 if config.app.ssl_keyfile:
     app.add_middleware(HTTPSRedirectMiddleware)
 app.add_middleware(
@@ -45,15 +78,18 @@ app.add_middleware(
 install_exc_handlers(app)
 
 app.include_router(api_v1.router)
-app.mount(
-    "/",
-    StaticFiles(
-        directory=(
-            config.static_dir
-            if config.static_dir
-            else (Path(__file__).parent / "static")
-        ),
-        html=True,
+static_files = CachedStaticFiles(
+    directory=(
+        config.static_dir if config.static_dir else (Path(__file__).parent / "static")
     ),
-    name="static",
+    html=True,
+    state_version=lambda: info_broadcaster.version,
+    render_state=render_initial_state if config.inline_initial_state else None,
 )
+app.mount("/", static_files, name="static")
+
+
+@config_reloader.handle_reload
+async def _(changed: set[str]):
+    if "frontend" in changed:
+        static_files.reset_state()
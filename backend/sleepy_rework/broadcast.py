@@ -0,0 +1,392 @@
+import asyncio
+import time
+from bisect import bisect_right
+from collections import Counter, OrderedDict, deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import cached_property, lru_cache, partial
+from itertools import islice
+
+from debouncer import DebounceOptions, debounce
+
+from sleepy_rework_types import DeviceInfo, Info, InfoEvent, OnlineStatus
+
+from .config import config
+from .config_reload import config_reloader
+from .devices import DeviceFilter, DeviceManager, device_manager
+
+type FilteredKey = tuple[str, tuple[frozenset[str] | None, ...], int]
+
+# filters come from anyone's query parameters, so only the recently used are kept
+FILTERED_CACHE_SIZE = 256
+
+DEVICE_INFO_FIELDS = frozenset(DeviceInfo.model_fields) | frozenset(
+    DeviceInfo.model_computed_fields,
+)
+
+
+def get_info(device_filter: DeviceFilter | None = None) -> Info:
+    devices = (
+        None
+        if config.privacy_mode
+        else {
+            k: v.info
+            for k, v in (
+                device_manager.query(device_filter)
+                if device_filter is not None
+                else device_manager.devices
+            ).items()
+        }
+    )
+    return Info(status=device_manager.overall_status, devices=devices)
+
+
+def get_info_page(
+    device_filter: DeviceFilter | None = None,
+    after: str | None = None,
+    limit: int | None = None,
+) -> tuple[Info, str | None]:
+    """
+    `Info` with the devices sorted by key, only those after the key `after`
+    and at most `limit` of them, and the key to get the next page after
+    """
+    if config.privacy_mode:
+        return get_info(), None
+    if device_filter is not None:
+        matched = device_manager.query(device_filter)
+        keys = list(matched)
+    else:
+        matched = device_manager.devices
+        keys = device_manager.sorted_keys()
+
+    start = 0 if after is None else bisect_right(keys, after)
+    end = len(keys) if limit is None else start + limit
+    page = keys[start:end]
+    info = Info(
+        status=device_manager.overall_status,
+        devices={k: matched[k].info for k in page},
+    )
+    return info, (page[-1] if page and end < len(keys) else None)
+
+
+@lru_cache(maxsize=64)
+def info_serializer(fields: frozenset[str] | None = None) -> Callable[[Info], bytes]:
+    """
+    Encodes `Info` with only `fields` of every device, skipping the others
+    instead of dumping and dropping them, built once per projection
+    """
+    serializer = Info.__pydantic_serializer__
+    if fields is None:
+        return serializer.to_json
+    return partial(
+        serializer.to_json,
+        include={"status": True, "devices": {"__all__": set(fields)}},
+    )
+
+
+@dataclass(frozen=True)
+class InfoChange:
+    """A published `InfoEvent`, with what it changed, to filter it for viewers"""
+
+    event: InfoEvent
+    previous: dict[str, DeviceInfo]  # the changed devices before the change
+    status_changed: bool
+
+
+@dataclass(frozen=True)
+class EncodedMessage:
+    version: int
+    data: str
+    change: InfoChange | None = None  # only for events in the log
+
+    @cached_property
+    def sse_event(self) -> bytes:
+        return f"id: {self.version}\ndata: {self.data}\n\n".encode()
+
+
+class InfoBroadcaster:
+    """
+    Publishes the changes since the last publish once per throttled device update,
+    encoded once and shared between all viewers.
+
+    Each publish bumps `version` and appends an `InfoEvent` with the same offset
+    to a bounded log, so reconnecting viewers only replay what they missed.
+
+    Versions start from the boot time in milliseconds, so they keep increasing
+    across restarts and a version from before a restart is never taken as current.
+
+    Viewers with a `DeviceFilter` get the messages re-encoded with only the devices
+    matching it, once per version for each of the recently used filters.
+    """
+
+    def __init__(self, manager: DeviceManager, throttle: float, log_size: int):
+        self.version = int(time.time() * 1000)
+        self.log: deque[EncodedMessage] = deque(maxlen=log_size)
+        self.viewers: Counter[str] = Counter()
+
+        self._status: OnlineStatus | None = None
+        self._devices: dict[str, str] = {}
+        self._infos: dict[str, DeviceInfo] = {}
+        self._filtered: OrderedDict[FilteredKey, EncodedMessage | None] = OrderedDict()
+        self._snapshot: EncodedMessage | None = None
+        self._event_snapshot: EncodedMessage | None = None
+        self._changed = asyncio.Event()
+
+        @manager.handle_update
+        @debounce(
+            throttle,
+            DebounceOptions(leading=True, trailing=True, time_window=throttle),
+        )
+        async def _(*_):
+            await self._publish()
+
+        @config_reloader.handle_reload
+        async def _(changed: set[str]):
+            if changed & {"privacy_mode", "unknown_as_offline"}:
+                await self._publish()
+
+    async def _publish(self):
+        info = get_info()
+        devices = info.devices or {}
+        dumped = {k: v.model_dump_json() for k, v in devices.items()}
+        # copies, as devices change fields like `online` of their info in place,
+        # and filtering the event later has to see them as they were published
+        changed: dict[str, DeviceInfo | None] = {
+            k: devices[k].model_copy()
+            for k, v in dumped.items()
+            if self._devices.get(k) != v
+        }
+        changed.update(dict.fromkeys(self._devices.keys() - dumped.keys()))
+        if not (changed or info.status != self._status):
+            return
+
+        change = InfoChange(
+            InfoEvent(
+                offset=self.version + 1,
+                status=info.status,
+                devices=None if info.devices is None else changed,
+            ),
+            {k: self._infos[k] for k in changed if k in self._infos},
+            info.status != self._status,
+        )
+        self._status = info.status
+        self._devices = dumped
+        self._infos = {
+            **{k: v for k, v in self._infos.items() if k in dumped},
+            **{k: v for k, v in changed.items() if v is not None},
+        }
+        self.version += 1
+        self._filtered.clear()
+        self.log.append(
+            EncodedMessage(self.version, change.event.model_dump_json(), change),
+        )
+
+        # wakes every waiter at once, later waiters wait on the new event
+        changed_event, self._changed = self._changed, asyncio.Event()
+        changed_event.set()
+
+    @contextmanager
+    def track_viewer(self, transport: str) -> Iterator[None]:
+        self.viewers[transport] += 1
+        try:
+            yield
+        finally:
+            self.viewers[transport] -= 1
+
+    def _cached_filtered(
+        self,
+        key: FilteredKey,
+        build: Callable[[], EncodedMessage | None],
+    ) -> EncodedMessage | None:
+        """`build()`, cached for the `FILTERED_CACHE_SIZE` most recently used keys"""
+        if key in self._filtered:
+            self._filtered.move_to_end(key)
+            return self._filtered[key]
+        message = self._filtered[key] = build()
+        if len(self._filtered) > FILTERED_CACHE_SIZE:
+            self._filtered.popitem(last=False)
+        return message
+
+    def snapshot(self, device_filter: DeviceFilter | None = None) -> EncodedMessage:
+        """Encoded `Info`, lazily and at most once per version"""
+        if device_filter is not None:
+            message = self._cached_filtered(
+                ("info", device_filter.key(), self.version),
+                lambda: EncodedMessage(
+                    self.version,
+                    get_info(device_filter).model_dump_json(),
+                ),
+            )
+            assert message is not None
+            return message
+
+        if (self._snapshot is None) or (self._snapshot.version != self.version):
+            self._snapshot = EncodedMessage(
+                self.version,
+                get_info().model_dump_json(),
+            )
+        return self._snapshot
+
+    def _encode_event_snapshot(
+        self,
+        device_filter: DeviceFilter | None = None,
+    ) -> EncodedMessage:
+        info = get_info(device_filter)
+        event = InfoEvent(
+            offset=self.version,
+            status=info.status,
+            devices=info.devices,  # type: ignore
+            snapshot=True,
+        )
+        return EncodedMessage(self.version, event.model_dump_json())
+
+    def event_snapshot(
+        self,
+        device_filter: DeviceFilter | None = None,
+    ) -> EncodedMessage:
+        """Encoded snapshot `InfoEvent`, lazily and at most once per version"""
+        if device_filter is not None:
+            message = self._cached_filtered(
+                ("event-snapshot", device_filter.key(), self.version),
+                lambda: self._encode_event_snapshot(device_filter),
+            )
+            assert message is not None
+            return message
+
+        if (self._event_snapshot is None) or (
+            self._event_snapshot.version != self.version
+        ):
+            self._event_snapshot = self._encode_event_snapshot()
+        return self._event_snapshot
+
+    def filter_event(
+        self,
+        message: EncodedMessage,
+        device_filter: DeviceFilter,
+    ) -> EncodedMessage | None:
+        """
+        `message` with only the devices matching `device_filter`, and the ones that
+        stopped matching as removed, or `None` if nothing the viewer sees changed
+        """
+        change = message.change
+        if (change is None) or (change.event.devices is None):
+            return message
+        event, changed = change.event, change.event.devices
+
+        def build() -> EncodedMessage | None:
+            devices: dict[str, DeviceInfo | None] = {}
+            for k, info in changed.items():
+                if (info is not None) and device_filter.matches(info):
+                    devices[k] = info
+                elif (prev := change.previous.get(k)) and device_filter.matches(prev):
+                    devices[k] = None
+            if not (devices or change.status_changed):
+                return None
+            return EncodedMessage(
+                message.version,
+                event.model_copy(update={"devices": devices}).model_dump_json(),
+            )
+
+        return self._cached_filtered(
+            ("event", device_filter.key(), message.version),
+            build,
+        )
+
+    def replay(self, offset: int | None) -> list[EncodedMessage] | None:
+        """
+        Returns the events after `offset`,
+        or `None` if `offset` is unknown or some of them already fell off the log
+        """
+        if offset == self.version:
+            return []
+        if (offset is None) or (not self.log) or (offset > self.version):
+            return None
+        # the log holds consecutive offsets
+        start = offset - self.log[0].version + 1
+        if start < 0:
+            return None
+        return list(islice(self.log, start, None))
+
+    async def wait_changed(self, version: int, max_wait: float) -> bool:
+        """
+        Waits for `version` to stop being the current one,
+        returns `False` if it still is after `max_wait` seconds
+        """
+        if version != self.version:
+            return True
+        try:
+            await asyncio.wait_for(self._changed.wait(), max_wait)
+        except TimeoutError:
+            return False
+        return True
+
+    async def wait_snapshot(
+        self,
+        last_version: int | None = None,
+        device_filter: DeviceFilter | None = None,
+    ) -> EncodedMessage:
+        """
+        Returns the current snapshot right away if `last_version` isn't current,
+        otherwise waits for the next one
+        """
+        if last_version == self.version:
+            await self._changed.wait()
+        return self.snapshot(device_filter)
+
+    async def subscribe(
+        self,
+        last_version: int | None = None,
+        device_filter: DeviceFilter | None = None,
+    ) -> AsyncIterator[EncodedMessage]:
+        """
+        Encoded `Info` of every version, skipping those missed while waiting,
+        and with `device_filter` those where no matching device changed
+        """
+        last_data: str | None = None
+        while True:
+            snapshot = await self.wait_snapshot(last_version, device_filter)
+            last_version = snapshot.version
+            if (device_filter is not None) and snapshot.data == last_data:
+                continue
+            last_data = snapshot.data
+            yield snapshot
+
+    async def subscribe_events(
+        self,
+        offset: int | None = None,
+        keepalive: float | None = None,
+        device_filter: DeviceFilter | None = None,
+    ) -> AsyncIterator[EncodedMessage | None]:
+        """
+        Encoded `InfoEvent`s after `offset`, starting with a snapshot
+        if `offset` is unknown or the subscriber falls behind the log
+
+        Yields `None` when there was nothing to send for `keepalive` seconds
+        """
+        while True:
+            if offset == self.version:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), keepalive)
+                except TimeoutError:
+                    yield None
+                    continue
+            events = self.replay(offset)
+            if events is None:
+                events = [self.event_snapshot(device_filter)]
+            for event in events:
+                offset = event.version
+                message = (
+                    event
+                    if device_filter is None
+                    else self.filter_event(event, device_filter)
+                )
+                if message is not None:
+                    yield message
+
+
+info_broadcaster = InfoBroadcaster(
+    device_manager,
+    config.frontend_event_throttle,
+    config.frontend_event_log_size,
+)
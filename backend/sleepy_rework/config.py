@@ -1,6 +1,7 @@
-from typing import Any, ClassVar, override
+from typing import Any, override
 
 from pydantic import model_validator
+from pydantic.fields import FieldInfo
 from pydantic_settings import (
     BaseSettings,
     DotEnvSettingsSource,
@@ -16,6 +17,8 @@ from sleepy_rework_types import (
     OnlineStatus,
 )
 
+from .utils import deep_update
+
 DEFAULT_FRONTEND_STATUSES = {
     OnlineStatus.ONLINE: FrontendStatusConfig(
         name="活着",
@@ -49,6 +52,45 @@ FrontendConfig.model_config["json_schema_extra"] = {
 }
 
 
+class EnvironmentSettingsSource(PydanticBaseSettingsSource):
+    """
+    `sleepy.{environment}.toml` over `.env.{environment}`, with `environment`
+    taken from the first of `sources` setting it, so no source is read twice
+    """
+
+    def __init__(
+        self,
+        settings_cls: type[BaseSettings],
+        sources: tuple[PydanticBaseSettingsSource, ...],
+    ):
+        super().__init__(settings_cls)
+        self.sources = sources
+
+    @override
+    def get_field_value(
+        self,
+        field: FieldInfo,
+        field_name: str,
+    ) -> tuple[Any, str, bool]:
+        # `__call__` is overridden, so this is never used
+        return None, field_name, False
+
+    @override
+    def __call__(self) -> dict[str, Any]:
+        environment = next(
+            (v for x in self.sources if (v := x().get("environment")) is not None),
+            self.settings_cls.model_fields["environment"].default,
+        )
+        env = str(environment)
+        data = deep_update(
+            DotEnvSettingsSource(self.settings_cls, f".env.{env}")(),
+            TomlConfigSettingsSource(self.settings_cls, f"sleepy.{env}.toml")(),
+        )
+        # environment specific sources can't switch to another environment
+        data["environment"] = environment
+        return data
+
+
 class Config(BaseConfig, BaseSettings):
     model_config = SettingsConfigDict(
         extra="ignore",
@@ -58,8 +100,6 @@ class Config(BaseConfig, BaseSettings):
         env_nested_delimiter="__",
     )
 
-    cls_environment: ClassVar[str | None] = None
-
     @model_validator(mode="before")
     @classmethod
     def _validate_override_frontend_statuses(cls, raw: Any):
@@ -89,12 +129,6 @@ class Config(BaseConfig, BaseSettings):
 
         return raw
 
-    @model_validator(mode="after")
-    def _correct_environment(self):
-        if self.cls_environment:
-            self.environment = self.cls_environment
-        return self
-
     @override
     @classmethod
     def settings_customise_sources(
@@ -106,27 +140,21 @@ class Config(BaseConfig, BaseSettings):
         file_secret_settings: PydanticBaseSettingsSource,
     ) -> tuple[PydanticBaseSettingsSource, ...]:
         toml_settings = TomlConfigSettingsSource(settings_cls, "sleepy.toml")
-
-        if not cls.cls_environment:
-            return (
+        environment_settings = EnvironmentSettingsSource(
+            settings_cls,
+            (
                 init_settings,
                 file_secret_settings,
-                # ---
                 toml_settings,
                 dotenv_settings,
-                # ---
                 env_settings,
-            )
-
-        env = cls.cls_environment
-        env_toml_settings = TomlConfigSettingsSource(settings_cls, f"sleepy.{env}.toml")
-        env_dot_env_settings = DotEnvSettingsSource(settings_cls, f".env.{env}")
+            ),
+        )
         return (
             init_settings,
             file_secret_settings,
             # ---
-            env_toml_settings,
-            env_dot_env_settings,
+            environment_settings,
             # ---
             toml_settings,
             dotenv_settings,
@@ -135,10 +163,4 @@ class Config(BaseConfig, BaseSettings):
         )
 
 
-def _load_config():
-    environment = Config().environment
-    Config.cls_environment = environment
-    return Config()
-
-
-config = _load_config()
+config = Config()
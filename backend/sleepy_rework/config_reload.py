@@ -0,0 +1,144 @@
+import asyncio
+from collections.abc import Callable, Coroutine
+from pathlib import Path
+from typing import Any
+
+from pydantic import BaseModel
+from watchfiles import Change, awatch
+
+from sleepy_rework_types import DeviceServerConfig
+
+from .config import Config, config
+from .devices import DeviceManager, device_manager
+from .log import logger
+
+type Co[T] = Coroutine[Any, Any, T]
+type ConfigReloadHandler = Callable[[set[str]], Co[Any]]
+
+# only read when starting up
+RESTART_REQUIRED_FIELDS = frozenset(
+    {
+        "environment",
+        "docs_url",
+        "static_dir",
+        "app",
+        "cors",
+        "fast_device_ingest",
+        "frontend_event_throttle",
+        "frontend_event_log_size",
+        "loop_watchdog",
+        "loop_watchdog_interval",
+        "loop_lag_threshold",
+        "inline_initial_state",
+        "watch_config",
+    },
+)
+
+
+class ConfigReloadResult(BaseModel):
+    applied: list[str]
+    restart_required: list[str]  # changed, but only applied after a restart
+
+
+class ConfigReloader:
+    """
+    Reloads the config files and applies what changed since the last load to the
+    running `config` and `DeviceManager`, devices whose config didn't change in
+    the files are left alone, even if it was changed at runtime
+    """
+
+    def __init__(self, manager: DeviceManager):
+        self.manager = manager
+        self.handlers: list[ConfigReloadHandler] = []
+
+        # what the files said at the last load, `config.devices` is changed at runtime
+        self._loaded = {k: getattr(config, k) for k in Config.model_fields}
+        self._loaded["devices"] = dict(config.devices)
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+
+    def handle_reload[F: ConfigReloadHandler](self, handler: F) -> F:
+        """`handler` is called with the names of the applied fields"""
+        self.handlers.append(handler)
+        return handler
+
+    @property
+    def watched_files(self) -> set[str]:
+        env = config.environment
+        return {"sleepy.toml", f"sleepy.{env}.toml", ".env", f".env.{env}"}
+
+    async def reload(self) -> ConfigReloadResult:
+        async with self._lock:
+            new = await asyncio.to_thread(Config)
+            changed = {
+                k for k in Config.model_fields if getattr(new, k) != self._loaded[k]
+            }
+            restart_required = changed & RESTART_REQUIRED_FIELDS
+            applied = changed - restart_required
+
+            for k in applied - {"devices"}:
+                setattr(config, k, getattr(new, k))
+            if "devices" in applied:
+                await self._apply_devices(self._loaded["devices"], new.devices)
+            if applied & {"device_update_rate", "device_update_burst"}:
+                for device in self.manager.devices.values():
+                    device.reset_limiter()
+
+            for k in changed:
+                self._loaded[k] = getattr(new, k)
+            self._loaded["devices"] = dict(new.devices)
+
+        if restart_required:
+            logger.warning(
+                f"Config changed {', '.join(sorted(restart_required))},"
+                f" restart to apply",
+            )
+        if applied:
+            logger.info(f"Config reloaded, applied {', '.join(sorted(applied))}")
+            await asyncio.gather(*(handler(applied) for handler in self.handlers))
+        return ConfigReloadResult(
+            applied=sorted(applied),
+            restart_required=sorted(restart_required),
+        )
+
+    async def _apply_devices(
+        self,
+        old: dict[str, DeviceServerConfig],
+        new: dict[str, DeviceServerConfig],
+    ):
+        for key in old.keys() - new.keys():
+            config.devices.pop(key, None)
+            if key in self.manager.devices:
+                await self.manager.remove(key)
+
+        for key, cfg in new.items():
+            if old.get(key) == cfg:
+                continue
+            config.devices[key] = cfg
+            if (device := self.manager.devices.get(key)) is not None:
+                await device.update_config(cfg)
+            elif not cfg.remove_when_offline:
+                device = self.manager.add(key, cfg)
+                asyncio.create_task(device.run_handlers())
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._watch())
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def _filter(self, _: Change, path: str) -> bool:
+        return Path(path).name in self.watched_files
+
+    async def _watch(self):
+        async for _ in awatch(Path.cwd(), watch_filter=self._filter, recursive=False):
+            try:
+                await self.reload()
+            except Exception:
+                logger.exception("Failed to reload config, keeping the current one")
+
+
+config_reloader = ConfigReloader(device_manager)
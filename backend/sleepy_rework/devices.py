@@ -1,17 +1,20 @@
 import asyncio
 import time
 from asyncio import Future, Lock, TaskGroup, TimerHandle, get_running_loop
-from collections.abc import Callable, Coroutine
+from collections.abc import Callable, Coroutine, Iterable, Mapping
 from contextlib import suppress
 from dataclasses import dataclass, field
 from typing import Any, Self
 
 from cookit import copy_func_annotations
 from fastapi import WebSocket
+from pydantic import BaseModel
 
 from sleepy_rework_types import (
+    AckMode,
     DeviceConfig,
     DeviceInfo,
+    DeviceInfoAck,
     DeviceInfoFromClient,
     DeviceInfoFromClientWS,
     OnlineStatus,
@@ -19,12 +22,31 @@ from sleepy_rework_types import (
 
 from .config import config
 from .log import logger
-from .utils import combine_model_from_model, deep_update
+from .utils import TokenBucket, combine_model, combine_model_from_model, deep_update
 
 type Co[T] = Coroutine[Any, Any, T]
 type DeviceStatusUpdateHandler = Callable[[Device], Co[Any]]
 type ManagerStatusUpdateHandler = Callable[["DeviceManager", Device], Co[Any]]
 
+INDEXED_FIELDS = ("status", "device_type", "device_os")
+
+
+@dataclass
+class UpdateStats:
+    applied: int = 0
+    throttled: int = 0  # updates deferred by the rate limit
+    coalesced: int = 0  # deferred updates merged into a later one
+
+
+update_stats = UpdateStats()
+
+
+@dataclass
+class PendingUpdate:
+    data: DeviceInfoFromClient
+    in_long_conn: bool
+    replace: bool
+
 
 @dataclass
 class Device:
@@ -33,16 +55,43 @@ class Device:
     info: DeviceInfo
 
     update_handlers: list[DeviceStatusUpdateHandler] = field(default_factory=list)
+    update_seq: int = 0
+    throttled_updates: int = 0
     _update_lock: Lock = field(default_factory=Lock)
     _timer: TimerHandle | None = None
     _ws_connection: WebSocket | None = None
+    _limiter: TokenBucket | None = None
+    _pending: PendingUpdate | None = None
+    _flush_timer: TimerHandle | None = None
+
+    def __post_init__(self):
+        self.reset_limiter()
 
     @classmethod
     def new(cls, key: str, cfg: DeviceConfig, **kwargs) -> Self:
-        info = DeviceInfo.model_validate(cfg.model_dump(exclude_unset=True))
-        cfg = DeviceConfig.model_validate(cfg.model_dump(exclude_unset=True))
+        data = cfg.model_dump(exclude_unset=True)
+        info = DeviceInfo.model_validate(data)
+        # configs from the config file are validated already,
+        # only client sent infos need to be turned into one
+        if isinstance(cfg, DeviceInfoFromClient):
+            cfg = DeviceConfig.model_validate(data)
         return cls(key=key, config=cfg, info=info, **kwargs)
 
+    @property
+    def throttled(self) -> bool:
+        return self._pending is not None
+
+    def _make_limiter(self) -> TokenBucket | None:
+        # only from the config files, whatever the device sent can't lift it
+        server_config = config.devices.get(self.key)
+        rate = None if server_config is None else server_config.update_rate
+        if rate is None:
+            rate = config.device_update_rate
+        if not rate:
+            return None
+        burst = None if server_config is None else server_config.update_burst
+        return TokenBucket(rate, config.device_update_burst if burst is None else burst)
+
     def handle_update[F: DeviceStatusUpdateHandler](self, handler: F) -> F:
         self.update_handlers.append(handler)
         return handler
@@ -111,26 +160,118 @@ class Device:
         self.info.online = online
         self.info.long_connection = in_long_conn
         self.info.last_update_time = int(time.time() * 1000)
+        self.update_seq += 1
+        update_stats.applied += 1
 
         asyncio.create_task(self.run_handlers())
         return self.info
 
-    @copy_func_annotations(_update)
-    async def update(self, *args, **kwargs):
+    def _pop_pending(self) -> PendingUpdate | None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        pending, self._pending = self._pending, None
+        return pending
+
+    @staticmethod
+    def _merge_pending(
+        pending: PendingUpdate,
+        data: DeviceInfoFromClient,
+        replace: bool,
+    ) -> tuple[DeviceInfoFromClient, bool]:
+        """The newer update wins, last writer wins for each field when merging"""
+        if replace:
+            return data, True
+        return combine_model_from_model(pending.data, data), pending.replace
+
+    def _schedule_flush(self):
+        assert self._limiter
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+        self._flush_timer = get_running_loop().call_later(
+            self._limiter.delay(),
+            lambda: asyncio.create_task(self._flush()),
+        )
+
+    def _defer(self, data: DeviceInfoFromClient, in_long_conn: bool, replace: bool):
+        self.throttled_updates += 1
+        update_stats.throttled += 1
+        if (pending := self._pop_pending()) is not None:
+            update_stats.coalesced += 1
+            data, replace = self._merge_pending(pending, data, replace)
+        self._pending = PendingUpdate(data, in_long_conn, replace)
+        self._schedule_flush()
+
+    async def _flush(self):
         async with self._update_lock:
-            return await self._update(*args, **kwargs)
+            if self._pending is None:
+                return
+            if self._limiter and (not self._limiter.acquire()):
+                self._schedule_flush()
+                return
+            pending = self._pop_pending()
+            assert pending
+            await self._update(
+                pending.data,
+                in_long_conn=pending.in_long_conn,
+                replace=pending.replace,
+            )
+
+    async def update(
+        self,
+        data: DeviceInfoFromClient | None = None,
+        online: bool = True,
+        in_long_conn: bool = False,
+        replace: bool = False,
+    ):
+        """
+        Updates over the rate limit are deferred and coalesced with the following
+        ones until the limit allows one again, the current info is returned meanwhile
+        """
+        async with self._update_lock:
+            if (
+                (data is not None)
+                and online
+                and self._limiter
+                and (not self._limiter.acquire())
+            ):
+                self._defer(data, in_long_conn, replace)
+                return self.info
+            if (pending := self._pop_pending()) is not None:
+                data, replace = (
+                    (pending.data, pending.replace)
+                    if data is None
+                    else self._merge_pending(pending, data, replace)
+                )
+            return await self._update(data, online, in_long_conn, replace)
+
+    def reset_limiter(self):
+        self._limiter = self._make_limiter()
 
     async def _update_config(self, config: DeviceConfig):
+        # only what the new config changes overrides the current info,
+        # the rest of it may have been sent by the device since
+        old = self.config.model_dump()
+        changed = {k: v for k, v in config.model_dump().items() if old.get(k) != v}
         self.config = config
-        self.info = self._replace_info(self.info)
+        self.reset_limiter()
+        if changed:
+            self.info = combine_model(self.info, **changed)
         asyncio.create_task(self.run_handlers())
 
     @copy_func_annotations(_update_config)
     async def update_config(self, *args, **kwargs):
         async with self._update_lock:
-            return await self.update_config(*args, **kwargs)
+            return await self._update_config(*args, **kwargs)
 
-    async def handle_ws(self, ws: WebSocket):
+    def dump_ack(self, mode: AckMode) -> str | None:
+        if mode is AckMode.FULL:
+            return self.info.model_dump_json()
+        if mode is AckMode.SEQ:
+            return DeviceInfoAck(seq=self.update_seq).model_dump_json()
+        return None
+
+    async def handle_ws(self, ws: WebSocket, ack: AckMode = AckMode.FULL):
         old_connection = self._ws_connection
         self._ws_connection = ws
 
@@ -148,21 +289,78 @@ class Device:
                 data = DeviceInfoFromClientWS.model_validate_json(
                     await ws.receive_text(),
                 )
-                updated = await self.update(
-                    data,
-                    in_long_conn=True,
-                    replace=data.replace,
-                )
-                await ws.send_text(updated.model_dump_json())
+                await self.update(data, in_long_conn=True, replace=data.replace)
+                if (msg := self.dump_ack(data.ack or ack)) is not None:
+                    await ws.send_text(msg)
         finally:
             self._ws_connection = None
             if self._timer is None:
                 await self.update(online=False)
 
 
+class DeviceFilter(BaseModel):
+    """Devices matching every given field, and any of the values given for it"""
+
+    status: list[OnlineStatus] | None = None
+    device_type: list[str] | None = None
+    device_os: list[str] | None = None
+
+    @property
+    def active(self) -> bool:
+        return any(getattr(self, x) is not None for x in INDEXED_FIELDS)
+
+    def key(self) -> tuple[frozenset[str] | None, ...]:
+        """Equal for filters matching the same devices"""
+        return tuple(
+            None if (values := getattr(self, x)) is None else frozenset(values)
+            for x in INDEXED_FIELDS
+        )
+
+    def matches(self, info: DeviceInfo) -> bool:
+        return all(
+            (values := getattr(self, x)) is None or getattr(info, x) in values
+            for x in INDEXED_FIELDS
+        )
+
+
+class DeviceIndex:
+    """Device keys by the value of each of their `INDEXED_FIELDS`"""
+
+    def __init__(self) -> None:
+        self.entries: dict[str, dict[Any, set[str]]] = {x: {} for x in INDEXED_FIELDS}
+        self._values: dict[str, tuple[Any, ...]] = {}
+
+    def update(self, key: str, info: DeviceInfo):
+        values = tuple(getattr(info, x) for x in INDEXED_FIELDS)
+        if (old := self._values.get(key)) == values:
+            return
+        if old is not None:
+            self._discard(key, old)
+        self._values[key] = values
+        for field_name, value in zip(INDEXED_FIELDS, values, strict=True):
+            self.entries[field_name].setdefault(value, set()).add(key)
+
+    def remove(self, key: str):
+        if (old := self._values.pop(key, None)) is not None:
+            self._discard(key, old)
+
+    def _discard(self, key: str, values: tuple[Any, ...]):
+        for field_name, value in zip(INDEXED_FIELDS, values, strict=True):
+            keys = self.entries[field_name][value]
+            keys.discard(key)
+            if not keys:
+                del self.entries[field_name][value]
+
+    def lookup(self, field_name: str, values: Iterable[Any]) -> set[str]:
+        entries = self.entries[field_name]
+        return set().union(*(entries.get(x, ()) for x in values))
+
+
 class DeviceManager:
-    def __init__(self, config: dict[str, DeviceConfig] | None = None) -> None:
+    def __init__(self, config: Mapping[str, DeviceConfig] | None = None) -> None:
         self.devices: dict[str, Device] = {}
+        self.index = DeviceIndex()
+        self._sorted_keys: list[str] | None = None
         self.update_handlers: list[ManagerStatusUpdateHandler] = []
 
         if not config:
@@ -188,12 +386,39 @@ class DeviceManager:
     def add(self, key: str, cfg: DeviceConfig) -> Device:
         device = Device.new(key, cfg, update_handlers=[self.update_handler])
         self.devices[key] = device
+        self.index.update(key, device.info)
+        self._sorted_keys = None
         return device
 
     async def remove(self, key: str) -> None:
         device = self.devices.pop(key)
+        self.index.remove(key)
+        self._sorted_keys = None
         await device.update(online=False)
 
+    def sorted_keys(self) -> list[str]:
+        """Device keys in a stable order to paginate over, sorted once per change"""
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self.devices)
+        return self._sorted_keys
+
+    def query(self, device_filter: DeviceFilter) -> dict[str, Device]:
+        """Devices matching `device_filter`, sorted by key"""
+        keys: set[str] | None = None
+        for field_name in INDEXED_FIELDS:
+            if (values := getattr(device_filter, field_name)) is None:
+                continue
+            found = self.index.lookup(field_name, values)
+            keys = found if keys is None else keys & found
+        if keys is None:
+            return dict(sorted(self.devices.items()))
+        # the index is updated by the handlers, after the device itself
+        return {
+            k: device
+            for k in sorted(keys)
+            if (device := self.devices.get(k)) and device_filter.matches(device.info)
+        }
+
     def handle_update[F: ManagerStatusUpdateHandler](self, handler: F) -> F:
         self.update_handlers.append(handler)
         return handler
@@ -205,6 +430,11 @@ class DeviceManager:
             and device.key in self.devices
         ):
             del self.devices[device.key]
+            self._sorted_keys = None
+        if self.devices.get(device.key) is device:
+            self.index.update(device.key, device.info)
+        elif device.key not in self.devices:
+            self.index.remove(device.key)
 
         async with TaskGroup() as tg:
             for handler in self.update_handlers:
@@ -0,0 +1,492 @@
+import asyncio
+import cProfile
+import inspect
+import marshal
+import pstats
+import sys
+import threading
+import time
+import traceback
+import tracemalloc
+from collections import Counter, deque
+from types import CodeType, FrameType
+from typing import Any
+
+from pydantic import BaseModel
+
+from sleepy_rework_types import DeviceInfo
+
+from .broadcast import info_broadcaster
+from .config import config
+from .devices import device_manager, update_stats
+from .log import logger
+
+# region profiling
+
+profile_lock = asyncio.Lock()
+
+
+def collapse_stack(frame: FrameType | None, labels: dict[CodeType, str]) -> str:
+    """Frames from the outermost to `frame`, in the collapsed stack format"""
+    names: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        if (label := labels.get(code)) is None:
+            label = f"{code.co_qualname} ({code.co_filename}:{code.co_firstlineno})"
+            labels[code] = label
+        names.append(label)
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+def sample_stacks(thread_id: int, duration: float, interval: float) -> Counter[str]:
+    """
+    Samples the stack of thread `thread_id` every `interval` seconds,
+    meant to run in another thread so the sampled one isn't slowed down by it
+    """
+    stacks: Counter[str] = Counter()
+    labels: dict[CodeType, str] = {}
+    end = time.monotonic() + duration
+    while time.monotonic() < end:
+        if (frame := sys._current_frames().get(thread_id)) is not None:  # noqa: SLF001
+            stacks[collapse_stack(frame, labels)] += 1
+        del frame
+        time.sleep(interval)
+    return stacks
+
+
+def format_collapsed(stacks: Counter[str]) -> str:
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+async def profile_loop_sampling(duration: float, interval: float) -> Counter[str]:
+    """Sampling profile of the thread running the current event loop"""
+    return await asyncio.to_thread(
+        sample_stacks,
+        threading.get_ident(),
+        duration,
+        interval,
+    )
+
+
+async def profile_loop_cprofile(duration: float) -> bytes:
+    """
+    Deterministic profile of everything the current event loop runs meanwhile,
+    returns the marshalled stats, same as `pstats.Stats.dump_stats` writes
+    """
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        await asyncio.sleep(duration)
+    finally:
+        profiler.disable()
+    return marshal.dumps(pstats.Stats(profiler).stats)  # type: ignore
+
+
+# endregion
+
+# region memory
+
+
+class DeviceMemoryUsage(BaseModel):
+    key: str
+    payload_size: int  # bytes of the JSON encoded info
+    approx_memory: int  # bytes of the info objects, shared objects counted once
+
+
+class MemoryReport(BaseModel):
+    peak_rss: int | None  # bytes, `None` where not available
+    devices: int
+    devices_approx_memory: int
+    top_devices: list[DeviceMemoryUsage]
+    device_connections: int  # devices connected with WebSocket
+    viewers: dict[str, int]  # `/info` viewers by transport
+    event_log_entries: int
+    event_log_size: int  # bytes of the encoded events
+
+
+class TracemallocStat(BaseModel):
+    location: str
+    size: int
+    size_diff: int
+    count: int
+    count_diff: int
+
+
+class TracemallocReport(BaseModel):
+    traced_memory: int
+    peak_traced_memory: int
+    # top differences to the previous snapshot, empty for the first one
+    stats: list[TracemallocStat]
+
+
+def deep_sizeof(obj: Any, seen: set[int] | None = None) -> int:
+    """Rough size of `obj` and everything reachable through containers and models"""
+    if seen is None:
+        seen = set()
+    size = 0
+    stack = [obj]
+    while stack:
+        o = stack.pop()
+        if id(o) in seen:
+            continue
+        seen.add(id(o))
+        size += sys.getsizeof(o)
+        if isinstance(o, dict):
+            stack.extend(o.keys())
+            stack.extend(o.values())
+        elif isinstance(o, list | tuple | set | frozenset):
+            stack.extend(o)
+        elif isinstance(o, BaseModel):
+            stack.append(o.__dict__)
+            if o.__pydantic_extra__:
+                stack.append(o.__pydantic_extra__)
+    return size
+
+
+def get_peak_rss() -> int | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def measure_devices(infos: list[tuple[str, DeviceInfo]]) -> list[DeviceMemoryUsage]:
+    # objects shared between devices (field names, enum members, ...)
+    # are only counted for the first device referencing them
+    seen = {id(x) for x in (None, True, False)}
+    usages = [
+        DeviceMemoryUsage(
+            key=key,
+            payload_size=len(info.model_dump_json()),
+            approx_memory=deep_sizeof(info, seen),
+        )
+        for key, info in infos
+    ]
+    usages.sort(key=lambda x: x.payload_size, reverse=True)
+    return usages
+
+
+async def get_memory_report(top: int) -> MemoryReport:
+    # only the references are taken on the loop,
+    # measuring every device would block it with many of them
+    infos = [(key, device.info) for key, device in device_manager.devices.items()]
+    usages = await asyncio.to_thread(measure_devices, infos)
+    return MemoryReport(
+        peak_rss=get_peak_rss(),
+        devices=len(usages),
+        devices_approx_memory=sum(x.approx_memory for x in usages),
+        top_devices=usages[:top],
+        device_connections=sum(
+            d.info.long_connection for d in device_manager.devices.values()
+        ),
+        viewers={k: v for k, v in info_broadcaster.viewers.items() if v},
+        event_log_entries=len(info_broadcaster.log),
+        event_log_size=sum(len(x.data) for x in info_broadcaster.log),
+    )
+
+
+TRACEMALLOC_FILTERS = (
+    tracemalloc.Filter(inclusive=False, filename_pattern=tracemalloc.__file__),
+    tracemalloc.Filter(
+        inclusive=False,
+        filename_pattern="<frozen importlib._bootstrap>",
+    ),
+    tracemalloc.Filter(inclusive=False, filename_pattern="<unknown>"),
+)
+
+_last_snapshot: tracemalloc.Snapshot | None = None
+
+
+def _take_tracemalloc_snapshot(top: int) -> list[TracemallocStat]:
+    global _last_snapshot
+
+    snapshot = tracemalloc.take_snapshot().filter_traces(TRACEMALLOC_FILTERS)
+    last_snapshot, _last_snapshot = _last_snapshot, snapshot
+    if last_snapshot is None:
+        return []
+    return [
+        TracemallocStat(
+            location=str(stat.traceback),
+            size=stat.size,
+            size_diff=stat.size_diff,
+            count=stat.count,
+            count_diff=stat.count_diff,
+        )
+        for stat in snapshot.compare_to(last_snapshot, "lineno")[:top]
+    ]
+
+
+async def take_tracemalloc_snapshot(top: int, nframes: int) -> TracemallocReport:
+    """
+    Starts tracing if needed, then returns the top differences to the previous call,
+    tracing slows down allocations until `stop_tracemalloc` is called
+    """
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(nframes)
+    # it's mostly spent in Python, the loop can keep going in between
+    stats = await asyncio.to_thread(_take_tracemalloc_snapshot, top)
+    traced, peak = tracemalloc.get_traced_memory()
+    return TracemallocReport(
+        traced_memory=traced,
+        peak_traced_memory=peak,
+        stats=stats,
+    )
+
+
+def stop_tracemalloc():
+    global _last_snapshot
+
+    _last_snapshot = None
+    tracemalloc.stop()
+
+
+# endregion
+
+# region loop lag
+
+
+class LoopStall(BaseModel):
+    time: float  # unix timestamp the stall was captured at
+    lag: float  # seconds, updated once the loop gets going again
+    task: str | None  # the task running while blocked, set once the loop recovers
+    stack: str
+
+
+class LoopLagReport(BaseModel):
+    enabled: bool
+    interval: float
+    threshold: float
+    lag: float  # last measured lag
+    mean_lag: float  # over the last minute
+    max_lag: float  # over the last minute
+    max_lag_total: float  # since start
+    ticks: int
+    slow_ticks: int  # ticks late by more than `threshold`
+    stalls: list[LoopStall]  # recently captured, the latest last
+
+
+class LoopWatchdog:
+    """
+    Measures how late the event loop wakes up a task sleeping `interval` seconds.
+
+    A helper thread watches the heartbeat of that task and, once the loop has been
+    blocked for more than `threshold` seconds, captures the stack of the loop thread,
+    so the code blocking it shows up while it is still running.
+
+    The task the stack belongs to is only looked up on the loop thread, once the
+    loop gets going again, as the loop state isn't safe to read from another thread.
+    """
+
+    def __init__(self, interval: float, threshold: float, stall_history: int = 32):
+        self.interval = interval
+        self.threshold = threshold
+        self.lag = 0.0
+        self.max_lag_total = 0.0
+        self.ticks = 0
+        self.slow_ticks = 0
+        self.lags: deque[float] = deque(maxlen=max(int(60 / interval), 1))
+        self.stalls: deque[LoopStall] = deque(maxlen=stall_history)
+
+        self._heartbeat = time.monotonic()
+        self._stall: LoopStall | None = None
+        self._stall_frame: FrameType | None = None  # the blocking task's coroutine
+        self._task: asyncio.Task | None = None
+        self._thread: threading.Thread | None = None
+        self._stop = threading.Event()
+
+    @property
+    def enabled(self) -> bool:
+        return self._task is not None
+
+    def start(self):
+        if self._task is not None:
+            return
+        loop = asyncio.get_running_loop()
+        self._heartbeat = time.monotonic()
+        # a new one, so a thread still winding down from `stop` never sees it cleared
+        self._stop = threading.Event()
+        self._task = loop.create_task(self._tick())
+        self._thread = threading.Thread(
+            target=self._watch,
+            args=(threading.get_ident(), self._stop),
+            name="loop-watchdog",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self):
+        if self._task is None:
+            return
+        self._task.cancel()
+        self._task = None
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        self._stall = self._stall_frame = None
+
+    async def _tick(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self._heartbeat = now = time.monotonic()
+            self.lag = lag = max(now - expected, 0)
+            self.lags.append(lag)
+            self.ticks += 1
+            self.max_lag_total = max(self.max_lag_total, lag)
+            if lag <= self.threshold:
+                continue
+            self.slow_ticks += 1
+            if (stall := self._stall) is not None:
+                frame, self._stall, self._stall_frame = self._stall_frame, None, None
+                stall.lag = lag
+                stall.task = self._task_name(frame)
+                logger.warning(
+                    f"Event loop was blocked for {lag:.3f}s "
+                    f"in task {stall.task}, at:\n{stall.stack}",
+                )
+
+    @staticmethod
+    def _task_name(frame: FrameType | None) -> str | None:
+        """Name of the task running the coroutine `frame`, called on the loop thread"""
+        if frame is None:
+            return None
+        for task in asyncio.all_tasks():
+            if getattr(task.get_coro(), "cr_frame", None) is frame:
+                return task.get_name()
+        # finished since, its coroutine is all that's left to tell
+        return frame.f_code.co_qualname
+
+    def _watch(self, thread_id: int, stop: threading.Event):
+        captured: float | None = None
+        while not stop.wait(self.threshold / 2):
+            heartbeat = self._heartbeat
+            blocked = time.monotonic() - heartbeat - self.interval
+            if heartbeat == captured or blocked <= self.threshold:
+                continue
+            captured = heartbeat
+            if (frame := sys._current_frames().get(thread_id)) is None:  # noqa: SLF001
+                continue
+            stack = "".join(traceback.format_stack(frame))
+            # the outermost coroutine is the one the running task steps
+            coroutine_frame: FrameType | None = None
+            while frame is not None:
+                if frame.f_code.co_flags & inspect.CO_COROUTINE:
+                    coroutine_frame = frame
+                frame = frame.f_back
+            self._stall_frame = coroutine_frame
+            self._stall = stall = LoopStall(
+                time=time.time(),
+                lag=blocked,
+                task=None,
+                stack=stack,
+            )
+            self.stalls.append(stall)
+
+    def report(self) -> LoopLagReport:
+        lags = self.lags
+        return LoopLagReport(
+            enabled=self.enabled,
+            interval=self.interval,
+            threshold=self.threshold,
+            lag=self.lag,
+            mean_lag=(sum(lags) / len(lags)) if lags else 0,
+            max_lag=max(lags, default=0),
+            max_lag_total=self.max_lag_total,
+            ticks=self.ticks,
+            slow_ticks=self.slow_ticks,
+            stalls=list(self.stalls),
+        )
+
+
+loop_watchdog = LoopWatchdog(config.loop_watchdog_interval, config.loop_lag_threshold)
+
+
+# endregion
+
+# region metrics
+
+type Metric = tuple[str, str, str, float]  # name, type, help, value
+
+
+def get_metrics() -> list[Metric]:
+    metrics: list[Metric] = [
+        ("sleepy_devices", "gauge", "Known devices", len(device_manager.devices)),
+        (
+            "sleepy_device_updates_total",
+            "counter",
+            "Device info updates applied",
+            update_stats.applied,
+        ),
+        (
+            "sleepy_device_updates_throttled_total",
+            "counter",
+            "Device info updates deferred by the rate limit",
+            update_stats.throttled,
+        ),
+        (
+            "sleepy_device_updates_coalesced_total",
+            "counter",
+            "Deferred device info updates merged into a later one",
+            update_stats.coalesced,
+        ),
+        (
+            "sleepy_devices_throttled",
+            "gauge",
+            "Devices with a deferred update waiting for the rate limit",
+            sum(d.throttled for d in device_manager.devices.values()),
+        ),
+    ]
+    if loop_watchdog.enabled:
+        report = loop_watchdog.report()
+        metrics.extend(
+            [
+                (
+                    "sleepy_loop_lag_seconds",
+                    "gauge",
+                    "Last measured event loop lag",
+                    report.lag,
+                ),
+                (
+                    "sleepy_loop_lag_mean_seconds",
+                    "gauge",
+                    "Mean event loop lag over the last minute",
+                    report.mean_lag,
+                ),
+                (
+                    "sleepy_loop_lag_max_seconds",
+                    "gauge",
+                    "Max event loop lag over the last minute",
+                    report.max_lag,
+                ),
+                (
+                    "sleepy_loop_ticks_total",
+                    "counter",
+                    "Event loop lag measurements",
+                    report.ticks,
+                ),
+                (
+                    "sleepy_loop_slow_ticks_total",
+                    "counter",
+                    "Event loop lag measurements over the threshold",
+                    report.slow_ticks,
+                ),
+            ],
+        )
+    return metrics
+
+
+def format_metrics(metrics: list[Metric]) -> str:
+    """Prometheus text exposition format"""
+    return "".join(
+        f"# HELP {name} {help_}\n# TYPE {name} {type_}\n{name} {value}\n"
+        for name, type_, help_, value in metrics
+    )
+
+
+# endregion
@@ -0,0 +1,284 @@
+import gzip
+import mimetypes
+import os
+import re
+from collections.abc import Callable
+from dataclasses import dataclass, field, replace
+from email.utils import formatdate
+from functools import lru_cache
+from pathlib import Path
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+from .log import logger
+from .utils import etag_matches, make_etag
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MAX_CACHED_SIZE = 1024 * 1024
+MIN_COMPRESS_SIZE = 256
+COMPRESSIBLE_TYPES = {
+    "application/javascript",
+    "application/json",
+    "application/manifest+json",
+    "application/wasm",
+    "application/xml",
+    "image/svg+xml",
+    "image/x-icon",
+}
+# vite puts the content hash of built assets in their names, e.g. `index-BH7pDpo9.js`
+FINGERPRINTED = re.compile(r"(^|/)assets/.+[-.][\w-]{8,}\.\w+$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+@dataclass
+class StaticVariant:
+    headers: dict[str, str]
+    content: bytes | None = None  # read from `path` if not cached
+    path: str | None = None
+
+
+@dataclass
+class StaticAsset:
+    media_type: str
+    identity: StaticVariant
+    encoded: dict[str, StaticVariant] = field(default_factory=dict)  # by encoding
+    index: bool = False  # a directory's `index.html`, served under the directory
+    inline_state: bool = False  # the root `index.html`
+
+
+@lru_cache(maxsize=64)
+def parse_accept_encoding(value: str) -> frozenset[str]:
+    accepted: set[str] = set()
+    for item in value.split(","):
+        coding, _, params = item.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            k, _, v = param.partition("=")
+            if k.strip() == "q":
+                try:
+                    quality = float(v)
+                except ValueError:
+                    quality = 0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    return frozenset(accepted)
+
+
+def is_compressible(media_type: str) -> bool:
+    return media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+
+
+def compress(content: bytes) -> dict[str, bytes]:
+    """Encodings worth serving, compressed with the highest levels"""
+    compressed: dict[str, bytes] = {}
+    # in the order of preference
+    if brotli is not None:
+        compressed["br"] = brotli.compress(content)
+    compressed["gzip"] = gzip.compress(content, compresslevel=9, mtime=0)
+    return {k: v for k, v in compressed.items() if len(v) < len(content) * 0.9}
+
+
+def build_asset(
+    media_type: str,
+    base_headers: dict[str, str],
+    etag: str,
+    identity: StaticVariant,
+    encoded: dict[str, StaticVariant] | None = None,
+) -> StaticAsset:
+    """Compresses cached content if no `encoded` variants are given, then sets headers"""
+    if (
+        (encoded is None)
+        and (identity.content is not None)
+        and len(identity.content) >= MIN_COMPRESS_SIZE
+        and is_compressible(media_type)
+    ):
+        encoded = {
+            k: StaticVariant({}, v) for k, v in compress(identity.content).items()
+        }
+    encoded = encoded or {}
+
+    for encoding, variant in encoded.items():
+        # a different representation, so it needs its own strong ETag
+        variant.headers = {
+            **base_headers,
+            "etag": f'{etag[:-1]}-{encoding}"',
+            "content-encoding": encoding,
+            "vary": "Accept-Encoding",
+        }
+    identity.headers = {**base_headers, "etag": etag}
+    if encoded:
+        identity.headers["vary"] = "Accept-Encoding"
+    return StaticAsset(media_type, identity, encoded)
+
+
+def inject_head(html: bytes, content: bytes) -> bytes:
+    """Inserts `content` right before `</head>`, or at the start without one"""
+    if (index := html.lower().find(b"</head>")) == -1:
+        return content + html
+    return html[:index] + content + html[index:]
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    `StaticFiles` serving the files found in `directory` by `load` from an index
+    built once, so requests for them don't touch the file system.
+
+    Small files are kept in memory with their gzip (and brotli, if installed)
+    variants compressed up front; larger ones are streamed from disk, using
+    `.gz` / `.br` files built next to them if there are any.
+    Fingerprinted assets are served as immutable, everything else has to be
+    revalidated with its ETag.
+
+    Files added or changed after `load` are only picked up by calling it again,
+    anything not in the index is served by `StaticFiles` as usual.
+
+    With `render_state`, the markup it returns is put into the `<head>` of the root
+    `index.html`, rendered again only when `state_version` changes.
+    """
+
+    def __init__(
+        self,
+        *,
+        directory: str | os.PathLike[str],
+        state_version: Callable[[], int] | None = None,
+        render_state: Callable[[], str] | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(directory=directory, **kwargs)
+        self.state_version = state_version
+        self.render_state = render_state
+        self.assets: dict[str, StaticAsset] = {}
+        self._rendered: dict[int, tuple[int, StaticAsset]] = {}
+
+    def load(self):
+        assert self.directory is not None
+        root = Path(self.directory)
+        assets: dict[str, StaticAsset] = {}
+        cached_size = 0
+        for path in sorted(root.rglob("*")):
+            if (not path.is_file()) or path.suffix in {".gz", ".br"}:
+                continue
+            asset = self._load_asset(path, root)
+            key = os.path.normpath(path.relative_to(root))
+            asset.inline_state = key == "index.html" and (
+                asset.identity.content is not None
+            )
+            assets[key] = asset
+            if self.html and path.name == "index.html":
+                assets[os.path.normpath(path.parent.relative_to(root))] = replace(
+                    asset,
+                    index=True,
+                )
+            cached_size += sum(
+                len(x.content or b"") for x in (asset.identity, *asset.encoded.values())
+            )
+        self.assets = assets
+        self.reset_state()
+        logger.debug(
+            f"Indexed {len(assets)} static files, {cached_size} bytes cached in memory",
+        )
+
+    def _load_asset(self, path: Path, root: Path) -> StaticAsset:
+        stat_result = path.stat()
+        media_type = mimetypes.guess_type(path.name)[0] or "text/plain"
+        cache_control = (
+            IMMUTABLE_CACHE_CONTROL
+            if FINGERPRINTED.search(path.relative_to(root).as_posix())
+            else REVALIDATE_CACHE_CONTROL
+        )
+        cached = stat_result.st_size <= MAX_CACHED_SIZE
+        content = path.read_bytes() if cached else None
+        etag = make_etag(
+            content
+            if content is not None
+            else f"{stat_result.st_mtime}-{stat_result.st_size}".encode(),
+        )
+
+        encoded: dict[str, StaticVariant] = {}
+        for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+            if (encoded_path := path.with_name(path.name + suffix)).is_file():
+                encoded[encoding] = (
+                    StaticVariant({}, encoded_path.read_bytes())
+                    if cached
+                    else StaticVariant({}, path=str(encoded_path))
+                )
+        return build_asset(
+            media_type,
+            {
+                "last-modified": formatdate(stat_result.st_mtime, usegmt=True),
+                "cache-control": cache_control,
+            },
+            etag,
+            StaticVariant({}, content) if cached else StaticVariant({}, path=str(path)),
+            encoded or None,
+        )
+
+    def reset_state(self):
+        """Renders the state again on the next request, even if the version is the same"""
+        self._rendered.clear()
+
+    def _render_state(self, asset: StaticAsset) -> StaticAsset:
+        """`asset` with the current state inlined, rendered once per state version"""
+        assert self.state_version is not None
+        assert self.render_state is not None
+        version = self.state_version()
+        key = id(asset.identity)
+        if (rendered := self._rendered.get(key)) and rendered[0] == version:
+            return rendered[1]
+
+        assert asset.identity.content is not None
+        content = inject_head(asset.identity.content, self.render_state().encode())
+        rendered_asset = build_asset(
+            asset.media_type,
+            {"cache-control": REVALIDATE_CACHE_CONTROL},
+            make_etag(content),
+            StaticVariant({}, content),
+        )
+        self._rendered[key] = (version, rendered_asset)
+        return rendered_asset
+
+    def select_variant(self, asset: StaticAsset, headers: Headers) -> StaticVariant:
+        if asset.encoded and (accept := headers.get("accept-encoding")):
+            accepted = parse_accept_encoding(accept)
+            for encoding, variant in asset.encoded.items():
+                if encoding in accepted or "*" in accepted:
+                    return variant
+        return asset.identity
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        asset = self.assets.get(path)
+        if (
+            asset is None
+            or scope["method"] not in ("GET", "HEAD")
+            # let `StaticFiles` redirect directory URLs to end in "/"
+            or (asset.index and not scope["path"].endswith("/"))
+        ):
+            return await super().get_response(path, scope)
+
+        if asset.inline_state and self.render_state:
+            asset = self._render_state(asset)
+        headers = Headers(scope=scope)
+        variant = self.select_variant(asset, headers)
+        if etag_matches(headers.get("if-none-match"), variant.headers["etag"]):
+            return Response(status_code=304, headers=variant.headers)
+        if variant.content is None:
+            assert variant.path is not None
+            return FileResponse(
+                variant.path,
+                headers=variant.headers,
+                media_type=asset.media_type,
+            )
+        return Response(
+            variant.content,
+            headers=variant.headers,
+            media_type=asset.media_type,
+        )
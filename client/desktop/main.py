@@ -1,4 +1,4 @@
 # noqa: INP001
-from sleepy_rework_client_desktop.app import launch
+from sleepy_rework_client_desktop.__main__ import main
 
-launch()
+main()
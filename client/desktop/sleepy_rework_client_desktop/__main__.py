@@ -1,4 +1,23 @@
-if __name__ == "__main__":
+import sys
+
+
+def main():
+    from .utils.profiling import install_import_profiler_from_argv
+
+    install_import_profiler_from_argv()
+
+    from .utils.ipc import IPC_OPT
+
+    if IPC_OPT in sys.argv:
+        # talk to the running instance, don't start another Qt application
+        from .utils.ipc import run_cli
+
+        sys.exit(run_cli(sys.argv))
+
     from .app import launch
 
     launch()
+
+
+if __name__ == "__main__":
+    main()
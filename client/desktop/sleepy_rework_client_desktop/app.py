@@ -16,20 +16,19 @@ app = QtSingleApplication(APP_ID, sys.argv)
 
 
 def launch():
+    from .utils.ipc import ActivateCommand, dump_command, handle_message
+
     if app.isRunning():
         print("Another instance is already running.")
-        app.sendMessage("114514")
+        app.sendMessage(dump_command(ActivateCommand()))
         sys.exit(0)
 
-    import asyncio
-    import traceback
-
-    import qasync
     from PySide6.QtCore import QLocale
     from qfluentwidgets import FluentTranslator, qconfig
 
     from .config import config
-    from .utils.common import AUTO_START_OPT
+    from .utils.background import background_loop
+    from .utils.common import AUTO_START_OPT, UI_LATENCY_OPT
     from .window import MainWindow
 
     app.setQuitOnLastWindowClosed(False)
@@ -39,29 +38,31 @@ def launch():
     )
     app.installTranslator(translator)
 
-    event_loop = qasync.QEventLoop(app)
-    asyncio.set_event_loop(event_loop)
-
-    app_close_event = asyncio.Event()
-    app.aboutToQuit.connect(app_close_event.set)
-
-    async def _async_setup(app: QtSingleApplication):
-        show = not (
-            (AUTO_START_OPT in sys.argv) and qconfig.get(config.appStartMinimized)
-        )
-        window = MainWindow()
-        app.setActivationWindow(window)
-        if show:
-            window.show()
-        window.setup()
-
-    def async_setup_callback(task: asyncio.Task):
-        if e := task.exception():
-            traceback.print_exception(e)
-            app_close_event.set()
-
-    with event_loop:
-        event_loop.create_task(
-            _async_setup(app),
-        ).add_done_callback(async_setup_callback)
-        event_loop.run_until_complete(app_close_event.wait())
+    # network I/O, serialization and activity detection live in their own thread,
+    # Qt thread only runs the UI
+    background_loop.start()
+    app.aboutToQuit.connect(background_loop.stop)
+
+    if UI_LATENCY_OPT in sys.argv:
+        from .utils.ui_bridge import UILatencyProbe
+
+        latency_probe = UILatencyProbe(app)
+        latency_probe.start()
+        app.aboutToQuit.connect(latency_probe.stop)
+
+    show = not ((AUTO_START_OPT in sys.argv) and qconfig.get(config.appStartMinimized))
+    window = MainWindow()
+    # only the activate command shows the window, other commands work silently
+    app.setActivationWindow(window, activateOnMessage=False)
+    app.messageReceived.connect(lambda msg: handle_message(app, msg))
+    if show:
+        window.show()
+    window.setup()
+
+    from .utils.profiling import import_profiler
+
+    if import_profiler:
+        import_profiler.uninstall()
+        import_profiler.report()
+
+    sys.exit(app.exec())
@@ -0,0 +1,108 @@
+import asyncio
+import threading
+import traceback
+from collections.abc import Callable, Coroutine
+from concurrent.futures import Future
+from functools import partial
+from typing import Any
+
+
+class BackgroundEventLoop:
+    """
+    An asyncio event loop running in a dedicated daemon thread.
+
+    All network I/O, serialization and activity detection run here,
+    so the Qt UI thread only has to paint widgets.
+    """
+
+    def __init__(self, name: str = "SleepyBackgroundLoop") -> None:
+        self._name = name
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._ready = threading.Event()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if not self._loop:
+            raise RuntimeError("Background event loop not started")
+        return self._loop
+
+    @property
+    def running(self) -> bool:
+        return bool(self._thread and self._thread.is_alive())
+
+    def in_loop_thread(self) -> bool:
+        return bool(self._thread) and threading.current_thread() is self._thread
+
+    def _handle_exception(self, _: asyncio.AbstractEventLoop, ctx: dict[str, Any]):
+        if e := ctx.get("exception"):
+            traceback.print_exception(e)
+        else:
+            print(f"Background loop error: {ctx.get('message')}")
+
+    def _run(self) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.set_exception_handler(self._handle_exception)
+        self._loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            # cancelled tasks may schedule cleanup tasks (e.g. signal emissions)
+            for _ in range(3):
+                if not (tasks := asyncio.all_tasks(loop)):
+                    break
+                for task in tasks:
+                    task.cancel()
+                loop.run_until_complete(
+                    asyncio.gather(*tasks, return_exceptions=True),
+                )
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+            self._loop = None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._ready.clear()
+        self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def stop(self, timeout: float | None = 5) -> None:
+        thread = self._thread
+        if not (thread and thread.is_alive()):
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        thread.join(timeout)
+        self._thread = None
+
+    def call_soon[**A](
+        self,
+        func: Callable[A, Any],
+        *args: A.args,
+        **kwargs: A.kwargs,
+    ) -> None:
+        """Schedule a plain callable to run in the loop thread, thread-safe."""
+        self.loop.call_soon_threadsafe(partial(func, *args, **kwargs))
+
+    def submit[R](self, coro: Coroutine[Any, Any, R]) -> Future[R]:
+        """Schedule a coroutine to run in the loop thread, thread-safe."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+
+background_loop = BackgroundEventLoop()
+
+
+def in_background[**A](func: Callable[A, Any]) -> Callable[A, None]:
+    """
+    Wrap a callable so calling it only schedules it onto the background loop.
+
+    Used for Qt signal handlers that touch state owned by the background loop.
+    """
+
+    def wrapper(*args: A.args, **kwargs: A.kwargs) -> None:
+        background_loop.call_soon(func, *args, **kwargs)
+
+    return wrapper
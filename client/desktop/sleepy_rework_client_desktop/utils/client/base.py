@@ -1,6 +1,7 @@
 import asyncio
 import contextlib
 from asyncio import Task
+from datetime import datetime
 from typing import Any, Literal, Self, cast, overload
 
 from websockets import ClientConnection, connect
@@ -64,6 +65,7 @@ class RetryWSClient[D: str | bytes]:
 
         self._ws: ClientConnection | None = None
         self._run_task: Task | None = None
+        self._connected_time: datetime | None = None
 
         self.on_connect_error = SafeLoggedSignal[[Self, Exception], Any]()
         self.on_connected = SafeLoggedSignal[[Self], Any]()
@@ -87,6 +89,14 @@ class RetryWSClient[D: str | bytes]:
     def connected(self):
         return bool(self._ws)
 
+    @property
+    def connected_time(self) -> datetime | None:
+        return self._connected_time
+
+    @property
+    def running(self) -> bool:
+        return self._run_task is not None
+
     @property
     def decode(self) -> bool:
         return self._decode
@@ -111,6 +121,7 @@ class RetryWSClient[D: str | bytes]:
 
     async def _handle_ws(self, ws: ClientConnection):
         self._ws = ws
+        self._connected_time = datetime.now().astimezone()
         self.on_connected.task_gather(self)
         while True:
             try:
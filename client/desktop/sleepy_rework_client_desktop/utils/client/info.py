@@ -1,25 +1,29 @@
+import asyncio
 import json
+from collections import deque
+from collections.abc import Sequence
 from typing import Any, Self
 
-from debouncer import DebounceOptions, debounce
 from pydantic import BaseModel
 from qfluentwidgets import qconfig
 
 from sleepy_rework_types import (
+    AckMode,
     DeviceBatteryStatus,
     DeviceCurrentApp,
     DeviceData,
     DeviceInfo,
+    DeviceInfoAck,
     DeviceInfoFromClientWS,
 )
 
 from ...config import config
 from ..activity import ActivityDetector, activity_detector
-from ..common import SafeLoggedSignal, deep_update
+from ..background import in_background
+from ..common import SafeLoggedSignal
 from ..info.shared import get_device_os, get_device_type, get_initial_device_info_dict
 from .base import RetryWSClient
-
-THROTTLE = 1
+from .lanes import DEFAULT_SEND_LANES, LaneScheduler, SendLaneConfig
 
 
 class DeviceInfoFeeder(RetryWSClient[str]):
@@ -28,6 +32,7 @@ class DeviceInfoFeeder(RetryWSClient[str]):
         endpoint: str,
         secret: str,
         initial_info: DeviceInfoFromClientWS | None = None,
+        send_lanes: Sequence[SendLaneConfig] = DEFAULT_SEND_LANES,
         **kwargs,
     ):
         super().__init__(endpoint, decode=True, **kwargs)
@@ -35,30 +40,35 @@ class DeviceInfoFeeder(RetryWSClient[str]):
         self.update_secret(secret)
         self.initial_info = initial_info or DeviceInfoFromClientWS()
 
+        self._server_side_info_raw: str | None = None
         self._server_side_info: DeviceInfo | None = None
-        self._send_buffer: dict[str, Any] = {}
+        self.last_ack_seq: int | None = None
+        # connected with `ack=seq`, ask for the whole server side info while set
+        self.full_ack = False
+        # ack mode of every sent message not yet acked, replies come in order
+        self._pending_acks: deque[AckMode] = deque()
+        self.lanes = LaneScheduler(self._send_lane_frame, send_lanes)
 
         self.on_info_update = SafeLoggedSignal[[Self, DeviceInfoFromClientWS], None]()
         self.on_before_send_info = SafeLoggedSignal[[Self, dict[str, Any]], None]()
-        self.on_server_side_info_updated = SafeLoggedSignal[[Self, DeviceInfo], None]()
+        self.on_server_side_info_updated = SafeLoggedSignal[[Self], None]()
 
         self.on_connected.connect(lambda _: self._handle_connected())
+        self.on_disconnected.connect(lambda _, __: self._handle_disconnected())
         self.on_message.connect(lambda _, msg: self._handle_message(msg))
         self.on_info_update.connect(lambda _, x: self._handle_info_update(x))
 
-        @debounce(
-            THROTTLE,
-            DebounceOptions(leading=True, trailing=True, time_window=THROTTLE),
-        )
-        async def _debounced_send_buf():
-            buf = self._send_buffer
-            self._send_buffer = {}
-            await self.send_obj(buf)
-
-        self._debounced_send_buf = _debounced_send_buf
+    @property
+    def server_side_info_raw(self) -> str | None:
+        return self._server_side_info_raw
 
     @property
     def server_side_info(self) -> DeviceInfo | None:
+        # acks are only validated when someone actually reads them
+        if (self._server_side_info is None) and self._server_side_info_raw:
+            self._server_side_info = DeviceInfo.model_validate_json(
+                self._server_side_info_raw,
+            )
         return self._server_side_info
 
     def update_secret(self, secret: str):
@@ -70,38 +80,63 @@ class DeviceInfoFeeder(RetryWSClient[str]):
             info = DeviceInfoFromClientWS()
         self.on_info_update.task_gather(self, info)
 
+    def set_full_ack(self, enabled: bool):
+        """Enable while the server side info is displayed somewhere."""
+        # sends an empty update to get the current server side info right away
+        refresh = enabled and (not self.full_ack) and self.connected
+        self.full_ack = enabled
+        if refresh:
+            asyncio.create_task(self.send_obj({}))
+
     async def send_obj(self, d: Any):
+        if self.full_ack:
+            d = {**d, "ack": AckMode.FULL}
         self.on_before_send_info.task_gather(self, d)
-        await self.ws.send(json.dumps(d))
+        ws = self.ws
+        self._pending_acks.append(AckMode.FULL if self.full_ack else AckMode.SEQ)
+        await ws.send(json.dumps(d))
 
     async def send_model(self, v: BaseModel):
         return await self.send_obj(v.model_dump(exclude_unset=True))
 
+    async def _send_lane_frame(self, d: dict[str, Any]):
+        # changes made while offline are carried by the initial info on reconnect
+        if self.connected:
+            await self.send_obj(d)
+
     async def _handle_connected(self):
-        await self.send_model(self.initial_info)
-        if self._send_buffer:
-            await self._handle_info_update(DeviceInfoFromClientWS())
+        # initial info is kept up to date and has replace=True,
+        # so it supersedes everything still waiting in the lanes
+        self.lanes.reset()
+        self.lanes.put(self.initial_info.model_dump(exclude_unset=True), replace=True)
+
+    async def _handle_disconnected(self):
+        # nothing sent over the lost connection will be acked
+        self._pending_acks.clear()
 
     async def _handle_message(self, message: str):
-        info = DeviceInfo.model_validate_json(message)
-        self._server_side_info = info
-        self.on_server_side_info_updated.task_gather(self, info)
+        # told apart by the ack mode asked for, so full acks are left unparsed
+        ack = self._pending_acks.popleft() if self._pending_acks else AckMode.SEQ
+        if ack is AckMode.SEQ:
+            self.last_ack_seq = DeviceInfoAck.model_validate_json(message).seq
+            return
+        self._server_side_info_raw = message
+        self._server_side_info = None
+        self.on_server_side_info_updated.task_gather(self)
 
     async def _handle_info_update(self, info: DeviceInfoFromClientWS):
-        if info.replace:
-            self._send_buffer = info.model_dump(exclude_unset=True)
-        else:
-            self._send_buffer = deep_update(
-                self._send_buffer,
-                info.model_dump(exclude_unset=True),
-            )
-        if self.connected:
-            await self._debounced_send_buf()
+        self.lanes.put(
+            info.model_dump(exclude_unset=True),
+            replace=bool(info.replace),
+            flush=self.connected,
+        )
 
 
 def get_ws_url() -> str:
     base = qconfig.get(config.serverUrl).replace("http", "ws", 1).rstrip("/")
-    return f"{base}/api/v1/device/{qconfig.get(config.deviceKey)}/info"
+    return (
+        f"{base}/api/v1/device/{qconfig.get(config.deviceKey)}/info?ack={AckMode.SEQ}"
+    )
 
 
 info_feeder = DeviceInfoFeeder(
@@ -112,6 +147,9 @@ info_feeder = DeviceInfoFeeder(
 )
 
 
+# config signals are emitted in the UI thread,
+# but feeder state is owned by the background loop, so handlers hop over there
+@in_background
 def on_config_enable_change(v: bool):
     if v:
         info_feeder.run_in_background()
@@ -119,81 +157,128 @@ def on_config_enable_change(v: bool):
         info_feeder.stop_background()
 
 
+@in_background
 def on_config_url_change(_: str):
     info_feeder.endpoint = get_ws_url()
 
 
+@in_background
 def on_config_secret_change(v: str):
     info_feeder.update_secret(v)
 
 
+@in_background
 def on_config_proxy_change(v: str):
     info_feeder.proxy = v or True
 
 
-def on_config_device_attr_change(
-    attr: str,
-    v: Any | None,
-    falsy_default: Any = None,
-):
-    v_is_none = v is None
-    if falsy_default and (not v):
-        v = falsy_default
-    setattr(info_feeder.initial_info, attr, v)
-    if v_is_none:
-        info_feeder.initial_info.model_fields_set.remove(attr)
+# typing in a line edit or flipping a few switches should end up in one frame
+CONFIG_APPLY_WINDOW = 0.3
+
 
-    if not info_feeder.connected:
-        # we have changed the initial info
-        # and we will send the initial info before any message after connected
-        # the initial info have set replace=True
-        # so we don't need to care about updating now
-        return
+class DeviceAttrChangeBatch:
+    """
+    Collects device attribute changes coming from config,
+    then applies their net effect to the feeder as one minimal update.
 
-    if not v_is_none:
-        info_feeder.update_info(DeviceInfoFromClientWS.model_validate({attr: v}))
-        return
+    Lives in the background loop, like the feeder itself.
+    """
 
-    # if original v is None, meaning using server side config
-    # then we need to remove the attr from server side stored data
-    # so we replace the entire info with target attr excluded
+    def __init__(self, feeder: DeviceInfoFeeder, window: float = CONFIG_APPLY_WINDOW):
+        self.feeder = feeder
+        self.window = window
 
-    # info = info_feeder.server_side_info
-    # if info:
-    #     info = DeviceInfoFromClientWS.model_validate(
-    #         info.model_dump(exclude_unset=True),
-    #     )
-    #     setattr(info, attr, None)
-    #     info.model_fields_set.remove(attr)
-    # else:
-    #     info = info_feeder.initial_info
-    # info.replace = True
+        # `None` means falling back to server side config
+        self._changes: dict[str, Any] = {}
+        self._timer: asyncio.TimerHandle | None = None
 
-    # maybe just use initial info, then set replace=True (already set) is enough
+    def add(self, attr: str, v: Any | None):
+        self._changes[attr] = v
+        if not self._timer:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.window,
+                self.apply,
+            )
 
-    info_feeder.update_info(info_feeder.initial_info)
+    def apply(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if not self._changes:
+            return
+
+        changes = self._changes
+        self._changes = {}
+
+        info = self.feeder.initial_info
+        changed: dict[str, Any] = {}
+        need_replace = False
+        for attr, v in changes.items():
+            was_set = attr in info.model_fields_set
+            if v is None:
+                if was_set:
+                    setattr(info, attr, None)
+                    info.model_fields_set.remove(attr)
+                    need_replace = True
+            elif (not was_set) or (getattr(info, attr) != v):
+                setattr(info, attr, v)
+                changed[attr] = v
+
+        if not self.feeder.connected:
+            # we have changed the initial info
+            # and we will send the initial info before any message after connected
+            # the initial info have set replace=True
+            # so we don't need to care about updating now
+            return
+
+        if need_replace:
+            # removing an attr from server side stored data
+            # needs the entire info replaced with target attr excluded,
+            # initial info already is that, and it has set replace=True
+            self.feeder.update_info(self.feeder.initial_info)
+        elif changed:
+            self.feeder.update_info(DeviceInfoFromClientWS.model_validate(changed))
+
+
+device_attr_change_batch = DeviceAttrChangeBatch(info_feeder)
 
 
+def on_config_device_attr_change(
+    attr: str,
+    v: Any | None,
+    falsy_default: Any = None,
+):
+    if falsy_default and (not v) and (v is not None):
+        v = falsy_default
+    device_attr_change_batch.add(attr, v)
+
+
+@in_background
 def on_config_key_change(_: Any):
     info_feeder.endpoint = get_ws_url()
 
 
+@in_background
 def on_config_name_change(v: Any):
     on_config_device_attr_change("name", v or None)
 
 
+@in_background
 def on_config_description_change(v: Any):
     on_config_device_attr_change("description", v or None)
 
 
+@in_background
 def on_config_device_type_change(_: Any):
     on_config_device_attr_change("device_type", get_device_type())
 
 
+@in_background
 def on_config_device_os_change(_: Any):
     on_config_device_attr_change("device_os", get_device_os())
 
 
+@in_background
 def on_config_device_auto_remove_change(_: Any):
     on_config_device_attr_change(
         "remove_when_offline",
@@ -260,6 +345,16 @@ if activity_detector is not None:
             ),
         )
 
+    @activity_detector.on_additional_statuses_update.connect
+    async def on_additional_statuses_change(_: ActivityDetector, data: list[str]):
+        initial_data = get_initial_device_data()
+        initial_data.additional_statuses = data
+        info_feeder.update_info(
+            DeviceInfoFromClientWS(
+                data=DeviceData(additional_statuses=data),
+            ),
+        )
+
     @activity_detector.on_battery_status_update.connect
     async def on_battery_status_change(
         _: ActivityDetector,
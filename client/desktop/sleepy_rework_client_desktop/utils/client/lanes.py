@@ -0,0 +1,175 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from typing import Any
+
+from ..common import deep_update
+
+type FieldPath = tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class SendLaneConfig:
+    name: str
+    window: float
+    """
+    Minimum seconds between two frames of this lane,
+    changes inside the window are coalesced into one trailing frame.
+    `0` means send immediately.
+    """
+    fields: Sequence[FieldPath] = ()
+
+
+PRESENCE_LANE = "presence"
+
+DEFAULT_SEND_LANES: tuple[SendLaneConfig, ...] = (
+    # everything not claimed by other lanes, e.g. idle, name, replace
+    SendLaneConfig(PRESENCE_LANE, 0),
+    SendLaneConfig("current_app", 1, (("data", "current_app"),)),
+    SendLaneConfig("additional_statuses", 1, (("data", "additional_statuses"),)),
+    SendLaneConfig("battery", 30, (("data", "battery"),)),
+)
+
+
+@dataclass
+class SendLane:
+    config: SendLaneConfig
+    buffer: dict[str, Any] = field(default_factory=dict)
+    last_send_time: float | None = None
+    timer: asyncio.TimerHandle | None = None
+    frames_sent: int = 0
+    updates_received: int = 0
+
+    def cancel(self):
+        self.buffer = {}
+        if self.timer:
+            self.timer.cancel()
+            self.timer = None
+
+
+def pop_path(d: dict[str, Any], path: FieldPath) -> dict[str, Any] | None:
+    """Pop the value at `path` out of `d`, returns it wrapped in the same path."""
+
+    *parents, key = path
+    node = d
+    trail: list[dict[str, Any]] = []
+    for p in parents:
+        child = node.get(p)
+        if not isinstance(child, dict):
+            return None
+        trail.append(node)
+        node = child
+    if key not in node:
+        return None
+
+    value = node.pop(key)
+    # drop parents emptied by the pop, so they won't produce empty frames
+    for parent, p in zip(reversed(trail), reversed(parents), strict=True):
+        if parent[p]:
+            break
+        del parent[p]
+
+    for p in reversed(path):
+        value = {p: value}
+    return value
+
+
+class LaneScheduler:
+    """
+    Splits outgoing updates into lanes by field,
+    each lane is throttled (leading and trailing edge) by its own window.
+
+    Must be used from inside the event loop that `send` runs on.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[dict[str, Any]], Awaitable[Any]],
+        lanes: Sequence[SendLaneConfig] = DEFAULT_SEND_LANES,
+    ):
+        self.send = send
+        self.lanes: dict[str, SendLane] = {x.name: SendLane(x) for x in lanes}
+        if PRESENCE_LANE not in self.lanes:
+            self.lanes[PRESENCE_LANE] = SendLane(SendLaneConfig(PRESENCE_LANE, 0))
+
+        self._tasks: set[asyncio.Task] = set()
+
+    @property
+    def counters(self) -> dict[str, int]:
+        """Frames sent per lane."""
+        return {k: v.frames_sent for k, v in self.lanes.items()}
+
+    def split(self, d: dict[str, Any]) -> dict[str, dict[str, Any]]:
+        d = deep_update({}, d)  # don't touch the caller's dict
+        parts: dict[str, dict[str, Any]] = {}
+        for lane in self.lanes.values():
+            for path in lane.config.fields:
+                if (v := pop_path(d, path)) is not None:
+                    parts[lane.config.name] = deep_update(
+                        parts.get(lane.config.name, {}),
+                        v,
+                    )
+        if d:
+            parts[PRESENCE_LANE] = d
+        return parts
+
+    def put(self, d: dict[str, Any], replace: bool = False, flush: bool = True):
+        if replace:
+            # a full replace supersedes everything still waiting
+            for lane in self.lanes.values():
+                lane.cancel()
+            parts = {PRESENCE_LANE: d}
+        else:
+            parts = self.split(d)
+
+        due: list[SendLane] = []
+        for name, part in parts.items():
+            lane = self.lanes[name]
+            lane.buffer = deep_update(lane.buffer, part)
+            lane.updates_received += 1
+            if flush and self._schedule(lane):
+                due.append(lane)
+        if due:
+            self._spawn_flush(*due)
+
+    def reset(self):
+        for lane in self.lanes.values():
+            lane.cancel()
+            lane.last_send_time = None
+
+    def _schedule(self, lane: SendLane) -> bool:
+        """Returns `True` if the lane is due now, otherwise arms its trailing timer."""
+        if lane.timer:
+            return False  # trailing frame already scheduled, it will carry this change
+
+        loop = asyncio.get_running_loop()
+        delay = (
+            0
+            if lane.last_send_time is None
+            else lane.last_send_time + lane.config.window - loop.time()
+        )
+        if delay <= 0:
+            return True
+        lane.timer = loop.call_later(delay, self._spawn_flush, lane)
+        return False
+
+    def _spawn_flush(self, *lanes: SendLane):
+        for lane in lanes:
+            lane.timer = None
+        task = asyncio.create_task(self._flush(lanes))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _flush(self, lanes: Sequence[SendLane]):
+        # lanes due at the same moment share one frame
+        now = asyncio.get_running_loop().time()
+        frame: dict[str, Any] = {}
+        for lane in lanes:
+            if not lane.buffer:
+                continue
+            frame = deep_update(frame, lane.buffer)
+            lane.buffer = {}
+            lane.last_send_time = now
+            lane.frames_sent += 1
+        if frame:
+            await self.send(frame)
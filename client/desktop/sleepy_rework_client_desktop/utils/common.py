@@ -9,6 +9,7 @@ from cookit import Signal
 from ..consts import FROZEN
 
 AUTO_START_OPT = "--auto-start"
+UI_LATENCY_OPT = "--measure-ui-latency"
 
 
 def get_start_args(auto_start: bool = True) -> list[str]:
@@ -65,5 +66,5 @@ async def wrap_async[**A, R](
     return func(*args, **kwargs)
 
 
-def get_str_time():
-    return datetime.now().astimezone().strftime("%m-%d %H:%M:%S")
+def get_str_time(t: datetime | None = None):
+    return (t or datetime.now().astimezone()).strftime("%m-%d %H:%M:%S")
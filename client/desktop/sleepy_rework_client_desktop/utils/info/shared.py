@@ -1,4 +1,5 @@
 import platform
+from functools import cache
 from pathlib import Path
 
 from qfluentwidgets import qconfig
@@ -33,6 +34,7 @@ def parse_env_file(env_file: str | Path) -> dict[str, str | None] | None:
 
 
 # Thanks to https://github.com/nonedesktop/nonebot-plugin-guestool/blob/main/nonebot_plugin_guestool/info.py
+@cache
 def get_linux_name_version() -> tuple[str, str] | None:
     env = parse_env_file("/etc/os-release")
     if env and (name := env.get("NAME")) and (version_id := env.get("VERSION_ID")):
@@ -49,6 +51,8 @@ def get_linux_name_version() -> tuple[str, str] | None:
     return None
 
 
+# OS won't change while running, avoid re-reading files on every config change
+@cache
 def detect_device_os():
     system, _, release, version, _, _ = platform.uname()
     system, release, version = platform.system_alias(system, release, version)
@@ -0,0 +1,134 @@
+import sys
+from typing import TYPE_CHECKING, Annotated, Literal
+
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
+
+from ..consts import APP_ID
+from .single_app import QtSingleApplication, send_to_instance
+
+if TYPE_CHECKING:
+    from .activity.basic import AdditionalStatusItem
+
+IPC_OPT = "--ipc"
+IPC_USAGE = f"""\
+Usage: {IPC_OPT} <command> [args...]
+
+Commands:
+  activate                  show the window of the running client
+  idle [on|off|toggle]      set idle state of the running client, default toggle
+  add-status <key> <text>   add an additional status, or update the one with same key
+  remove-status <key>       remove the additional status with given key
+"""
+
+
+class ActivateCommand(BaseModel):
+    cmd: Literal["activate"] = "activate"
+
+
+class IdleCommand(BaseModel):
+    cmd: Literal["idle"] = "idle"
+    idle: bool | None = None  # None to toggle
+
+
+class AddStatusCommand(BaseModel):
+    cmd: Literal["add_status"] = "add_status"
+    key: str
+    content: str
+
+
+class RemoveStatusCommand(BaseModel):
+    cmd: Literal["remove_status"] = "remove_status"
+    key: str
+
+
+type IPCCommand = Annotated[
+    ActivateCommand | IdleCommand | AddStatusCommand | RemoveStatusCommand,
+    Field(discriminator="cmd"),
+]
+ipc_command_adapter = TypeAdapter[IPCCommand](IPCCommand)
+
+
+def parse_message(msg: str) -> IPCCommand:
+    # older instances just send anything to ask us to show the window
+    if not msg.startswith("{"):
+        return ActivateCommand()
+    return ipc_command_adapter.validate_json(msg)
+
+
+def dump_command(command: IPCCommand) -> str:
+    return command.model_dump_json()
+
+
+def parse_cli_command(args: list[str]) -> IPCCommand:
+    match args:
+        case ["activate"]:
+            return ActivateCommand()
+        case ["idle"] | ["idle", "toggle"]:
+            return IdleCommand()
+        case ["idle", "on" | "true" | "1"]:
+            return IdleCommand(idle=True)
+        case ["idle", "off" | "false" | "0"]:
+            return IdleCommand(idle=False)
+        case ["add-status", key, *content] if content:
+            return AddStatusCommand(key=key, content=" ".join(content))
+        case ["remove-status", key]:
+            return RemoveStatusCommand(key=key)
+        case _:
+            raise ValueError(f"Invalid IPC command: {' '.join(args)}")
+
+
+def run_cli(argv: list[str]) -> int:
+    """Send a command to the running client, without starting a Qt application."""
+    args = argv[argv.index(IPC_OPT) + 1 :]
+    try:
+        command = parse_cli_command(args)
+    except (ValueError, ValidationError) as e:
+        print(e, file=sys.stderr)
+        print(IPC_USAGE, file=sys.stderr)
+        return 2
+    if not send_to_instance(APP_ID, dump_command(command)):
+        print("No running instance found.", file=sys.stderr)
+        return 1
+    return 0
+
+
+_additional_statuses: dict[str, "AdditionalStatusItem"] = {}
+
+
+def handle_command(command: IPCCommand) -> None:
+    """Applies a state changing command, must be called in the background loop."""
+    from .activity import activity_detector
+
+    match command:
+        case IdleCommand(idle=idle):
+            activity_detector.update_idle(
+                (not activity_detector.idle) if idle is None else idle,
+            )
+        case AddStatusCommand(key=key, content=content):
+            if item := _additional_statuses.get(key):
+                item.update_content(content)
+            else:
+                _additional_statuses[key] = activity_detector.create_additional_status(
+                    content,
+                )
+        case RemoveStatusCommand(key=key):
+            if item := _additional_statuses.pop(key, None):
+                activity_detector.remove_additional_status(item)
+        case _:
+            pass
+
+
+def handle_message(app: QtSingleApplication, msg: str) -> None:
+    """`QtSingleApplication.messageReceived` slot, called in the UI thread."""
+    from .background import background_loop
+
+    try:
+        command = parse_message(msg)
+    except ValidationError as e:
+        print(f"Invalid IPC message: {e}")
+        return
+
+    if isinstance(command, ActivateCommand):
+        app.activateWindow()
+    else:
+        background_loop.call_soon(handle_command, command)
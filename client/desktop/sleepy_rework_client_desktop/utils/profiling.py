@@ -0,0 +1,126 @@
+import builtins
+import sys
+import threading
+import time
+from importlib.util import resolve_name
+from typing import Any
+
+PROFILE_IMPORT_OPT = "--profile-import"
+
+# seconds, auto-started clients should reach "connected" within this on login,
+# only measured and warned about when exceeded
+STARTUP_CONNECT_BUDGET = 5.0
+
+STARTUP_TIME = time.perf_counter()
+
+
+def elapsed_since_startup() -> float:
+    return time.perf_counter() - STARTUP_TIME
+
+
+class ImportProfiler:
+    """
+    Built-in equivalent of `python -X importtime`,
+    also usable in frozen builds where interpreter options can't be passed.
+
+    Records self and cumulative time of every module imported for the first time,
+    separately for each thread importing while installed.
+    """
+
+    def __init__(self) -> None:
+        # (thread name, depth, module name, self us, cumulative us),
+        # in import finish order
+        self.records: list[tuple[str, int, str, int, int]] = []
+        self._local = threading.local()
+        self._original_import: Any = None
+
+    @property
+    def _child_time_stack(self) -> list[float]:
+        try:
+            return self._local.child_time_stack
+        except AttributeError:
+            stack = self._local.child_time_stack = []
+            return stack
+
+    @property
+    def installed(self) -> bool:
+        return self._original_import is not None
+
+    def install(self) -> None:
+        if self.installed:
+            return
+        self._original_import = builtins.__import__
+        builtins.__import__ = self._import
+
+    def uninstall(self) -> None:
+        if not self.installed:
+            return
+        builtins.__import__ = self._original_import
+        self._original_import = None
+
+    def _import(
+        self,
+        name: str,
+        globals: dict[str, Any] | None = None,  # noqa: A002
+        locals: dict[str, Any] | None = None,  # noqa: A002
+        fromlist: Any = (),
+        level: int = 0,
+    ) -> Any:
+        original = self._original_import
+        try:
+            fullname = (
+                resolve_name(f"{'.' * level}{name}", (globals or {})["__package__"])
+                if level
+                else name
+            )
+        except Exception:
+            fullname = name
+        if fullname in sys.modules:
+            return original(name, globals, locals, fromlist, level)
+
+        stack = self._child_time_stack
+        stack.append(0)
+        start = time.perf_counter()
+        try:
+            return original(name, globals, locals, fromlist, level)
+        finally:
+            cumulative = time.perf_counter() - start
+            child = stack.pop()
+            if stack:
+                stack[-1] += cumulative
+            self.records.append(
+                (
+                    threading.current_thread().name,
+                    len(stack),
+                    fullname,
+                    int((cumulative - child) * 1e6),
+                    int(cumulative * 1e6),
+                ),
+            )
+
+    def report(self, file: Any = None) -> None:
+        file = file or sys.stderr
+        threads = dict.fromkeys(x[0] for x in self.records)
+        for thread in threads:
+            records = [x[1:] for x in self.records if x[0] == thread]
+            print(f"import time: in thread {thread}", file=file)
+            print("import time: self [us] | cumulative | imported package", file=file)
+            for depth, fullname, self_us, cumulative_us in records:
+                print(
+                    f"import time: {self_us:>9} | {cumulative_us:>10} | "
+                    f"{'  ' * depth}{fullname}",
+                    file=file,
+                )
+            total = sum(x[3] for x in records if x[0] == 0)
+            print(f"import time: total {total / 1000:.1f} ms", file=file)
+
+
+import_profiler: ImportProfiler | None = None
+
+
+def install_import_profiler_from_argv() -> ImportProfiler | None:
+    global import_profiler
+    if PROFILE_IMPORT_OPT in sys.argv and not import_profiler:
+        import_profiler = ImportProfiler()
+        import_profiler.install()
+    return import_profiler
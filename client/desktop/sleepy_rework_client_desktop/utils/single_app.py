@@ -1,7 +1,39 @@
-from PySide6.QtCore import QStringConverter, Qt, QTextStream, Signal
+from PySide6.QtCore import Qt, Signal
 from PySide6.QtNetwork import QLocalServer, QLocalSocket
 from PySide6.QtWidgets import QApplication, QWidget
 
+# a live instance answers almost instantly,
+# never let a stale or hung socket hold up startup
+CONNECT_TIMEOUT_MS = 300
+WRITE_TIMEOUT_MS = 1000
+
+
+def connect_to_instance(uid: str, timeout_ms: int = CONNECT_TIMEOUT_MS):
+    """
+    Try to connect to a running instance, without needing a `QApplication`.
+    Returns the connected socket, or `None` if there is no live instance.
+    """
+    socket = QLocalSocket()
+    socket.connectToServer(uid)
+    if socket.waitForConnected(timeout_ms):
+        return socket
+    socket.abort()
+    return None
+
+
+def send_to_instance(
+    uid: str,
+    msg: str,
+    timeout_ms: int = CONNECT_TIMEOUT_MS,
+) -> bool:
+    socket = connect_to_instance(uid, timeout_ms)
+    if not socket:
+        return False
+    socket.write(f"{msg}\n".encode())
+    ok = socket.waitForBytesWritten(WRITE_TIMEOUT_MS)
+    socket.disconnectFromServer()
+    return ok
+
 
 # https://stackoverflow.com/a/79574637
 class QtSingleApplication(QApplication):
@@ -13,24 +45,27 @@ class QtSingleApplication(QApplication):
         self._activationWindow: QWidget | None = None
         self._activateOnMessage: bool = False
 
+        self._inSockets: set[QLocalSocket] = set()
+        self._server: QLocalServer | None = None
+
         # Is there another instance running?
-        self._outSocket = QLocalSocket()
-        self._outSocket.connectToServer(self._uid)
-        self._isRunning = self._outSocket.waitForConnected()
-
-        if self._isRunning:
-            # Yes, there is.
-            self._outStream = QTextStream(self._outSocket)
-            self._outStream.setEncoding(QStringConverter.Encoding.Utf8)
-        else:
+        self._outSocket = connect_to_instance(self._uid)
+        self._isRunning = self._outSocket is not None
+
+        if not self._isRunning:
             # No, there isn't.
-            self._outSocket = None
-            self._outStream = None
-            self._inSocket = None
-            self._inStream = None
-            self._server = QLocalServer()
-            self._server.listen(self._uid)
-            self._server.newConnection.connect(self._onNewConnection)
+            self._listen()
+
+    def _listen(self):
+        self._server = QLocalServer(self)
+        self._server.newConnection.connect(self._onNewConnection)
+        if self._server.listen(self._uid):
+            return
+        # nobody answered, so whatever holds the name is a leftover
+        # from an instance that crashed, clean it up and try again
+        QLocalServer.removeServer(self._uid)
+        if not self._server.listen(self._uid):
+            print(f"Failed to listen on local socket: {self._server.errorString()}")
 
     def isRunning(self):
         return self._isRunning
@@ -61,30 +96,28 @@ class QtSingleApplication(QApplication):
         self._activationWindow.activateWindow()
 
     def sendMessage(self, msg: str):
-        if not self._outStream:
+        if self._outSocket is None:
             return False
-        self._outStream << msg << "\n"  # pyright: ignore[reportUnusedExpression]
-        self._outStream.flush()
-        if self._outSocket is not None:
-            return self._outSocket.waitForBytesWritten()
-        return False
+        self._outSocket.write(f"{msg}\n".encode())
+        return self._outSocket.waitForBytesWritten(WRITE_TIMEOUT_MS)
 
     def _onNewConnection(self):
-        if self._inSocket:
-            self._inSocket.readyRead.disconnect(self._onReadyRead)
-        self._inSocket = self._server.nextPendingConnection()
-        if not self._inSocket:
+        if not self._server:
             return
-        self._inStream = QTextStream(self._inSocket)
-        self._inStream.setEncoding(QStringConverter.Encoding.Utf8)
-        self._inSocket.readyRead.connect(self._onReadyRead)
+        while socket := self._server.nextPendingConnection():
+            self._inSockets.add(socket)
+            socket.readyRead.connect(lambda s=socket: self._onReadyRead(s))
+            socket.disconnected.connect(lambda s=socket: self._onDisconnected(s))
         if self._activateOnMessage:
             self.activateWindow()
 
-    def _onReadyRead(self):
-        while True:
-            if self._inStream is not None:
-                msg = self._inStream.readLine()
-                if not msg:
-                    break
+    def _onDisconnected(self, socket: QLocalSocket):
+        self._onReadyRead(socket)
+        self._inSockets.discard(socket)
+        socket.deleteLater()
+
+    def _onReadyRead(self, socket: QLocalSocket):
+        while socket.canReadLine():
+            msg = bytes(socket.readLine().data()).decode("u8", "replace").strip()
+            if msg:
                 self.messageReceived.emit(msg)
@@ -0,0 +1,118 @@
+import statistics
+import time
+import traceback
+from collections import deque
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+from PySide6.QtCore import QObject, Qt, QTimer, Signal
+
+
+class UIBridge(QObject):
+    """Forwards calls from any thread to the Qt UI thread through a queued signal."""
+
+    _invoke = Signal(object)
+
+    def __init__(self, parent: QObject | None = None) -> None:
+        super().__init__(parent)
+        self._invoke.connect(self._onInvoke, Qt.ConnectionType.QueuedConnection)
+
+    def _onInvoke(self, func: Callable[[], Any]) -> None:
+        try:
+            func()
+        except Exception as e:
+            traceback.print_exception(e)
+
+    def post[**A](
+        self,
+        func: Callable[A, Any],
+        *args: A.args,
+        **kwargs: A.kwargs,
+    ) -> None:
+        self._invoke.emit(partial(func, *args, **kwargs))
+
+
+# created on import, which happens in the UI thread,
+# so queued invocations are always delivered to the UI thread
+ui_bridge = UIBridge()
+
+
+async def post_to_ui[**A](
+    func: Callable[A, Any],
+    *args: A.args,
+    **kwargs: A.kwargs,
+) -> None:
+    """
+    `SafeLoggedSignal` slot helper, like `wrap_async`,
+    but runs `func` in the UI thread instead of the emitting thread.
+    """
+    ui_bridge.post(func, *args, **kwargs)
+
+
+class UILatencyProbe(QObject):
+    """
+    Measures UI thread responsiveness by checking how late a fixed-interval
+    `QTimer` fires, then periodically prints the collected statistics.
+    """
+
+    def __init__(
+        self,
+        parent: QObject | None = None,
+        interval_ms: int = 50,
+        report_interval: float = 10,
+        max_samples: int = 2048,
+    ) -> None:
+        super().__init__(parent)
+        self.interval_ms = interval_ms
+        self.report_interval = report_interval
+        self.samples: deque[float] = deque(maxlen=max_samples)
+
+        self._last_tick: float | None = None
+        self._last_report: float = 0
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+        self._timer.setInterval(interval_ms)
+        self._timer.timeout.connect(self._onTick)
+
+    def start(self) -> None:
+        self._last_tick = None
+        self._last_report = time.perf_counter()
+        self._timer.start()
+
+    def stop(self) -> None:
+        self._timer.stop()
+        self.report()
+
+    def _onTick(self) -> None:
+        now = time.perf_counter()
+        if self._last_tick is not None:
+            lag = (now - self._last_tick) * 1000 - self.interval_ms
+            self.samples.append(max(lag, 0))
+        self._last_tick = now
+
+        if now - self._last_report >= self.report_interval:
+            self._last_report = now
+            self.report()
+
+    def summary(self) -> dict[str, float] | None:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        return {
+            "samples": len(ordered),
+            "mean": statistics.fmean(ordered),
+            "p50": ordered[len(ordered) // 2],
+            "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+            "max": ordered[-1],
+        }
+
+    def report(self) -> None:
+        if not (s := self.summary()):
+            return
+        print(
+            f"UI thread latency (ms): samples={s['samples']:.0f}"
+            f" mean={s['mean']:.2f} p50={s['p50']:.2f}"
+            f" p95={s['p95']:.2f} max={s['max']:.2f}",
+        )
@@ -1,7 +1,10 @@
+import json
+from abc import abstractmethod
+from datetime import datetime
 from typing import ClassVar, override
 
 from PySide6.QtCore import QTimer
-from PySide6.QtGui import QFont
+from PySide6.QtGui import QFont, QHideEvent, QShowEvent
 from PySide6.QtWidgets import QHBoxLayout, QVBoxLayout, QWidget
 from qfluentwidgets import (
     BodyLabel,
@@ -13,8 +16,10 @@ from qfluentwidgets import (
     ToolButton,
 )
 
+from ..utils.background import background_loop
 from ..utils.client.info import info_feeder
-from ..utils.common import get_str_time, wrap_async
+from ..utils.common import get_str_time
+from ..utils.ui_bridge import post_to_ui, ui_bridge
 from ..widgets.scroll_area import VerticalScrollAreaView
 
 
@@ -59,22 +64,28 @@ class ConnectionStatusCard(HeaderCardWidget):
 
         self.isDisconnect = False
 
-        self.onBackgroundStopped()
+        # page may be built long after the feeder started, so restore current state
+        if info_feeder.connected:
+            self.onConnected(info_feeder.connected_time)
+        elif info_feeder.running:
+            self.onBackgroundStarted()
+        else:
+            self.onBackgroundStopped()
 
         info_feeder.on_background_started.connect(
-            lambda _: wrap_async(self.onBackgroundStarted),
+            lambda _: post_to_ui(self.onBackgroundStarted),
         )
         info_feeder.on_background_stopped.connect(
-            lambda _: wrap_async(self.onBackgroundStopped),
+            lambda _: post_to_ui(self.onBackgroundStopped),
         )
         info_feeder.on_connect_error.connect(
-            lambda _, e: wrap_async(self.onError, e),
+            lambda _, e: post_to_ui(self.onError, e),
         )
         info_feeder.on_connected.connect(
-            lambda _: wrap_async(self.onConnected),
+            lambda _: post_to_ui(self.onConnected),
         )
         info_feeder.on_disconnected.connect(
-            lambda _, e: wrap_async(self.onDisconnected, e),
+            lambda _, e: post_to_ui(self.onDisconnected, e),
         )
 
     def onBackgroundStarted(self):
@@ -101,9 +112,11 @@ class ConnectionStatusCard(HeaderCardWidget):
         self.descText.setText(str(e))
         self.descText.show()
 
-    def onConnected(self):
+    def onConnected(self, connectedTime: datetime | None = None):
         self.statusIcon.setIcon(InfoBarIcon.SUCCESS)
-        self.statusText.setText(f"已于 {get_str_time()} 成功连接到服务端")
+        self.statusText.setText(
+            f"已于 {get_str_time(connectedTime)} 成功连接到服务端",
+        )
         self.descText.hide()
 
     def onDisconnected(self, e: Exception):
@@ -166,37 +179,100 @@ class CodeCard(HeaderCardWidget):
         )
 
 
-class CurrentClientSideInfoCard(CodeCard):
+class LazyCodeCard(CodeCard):
+    """
+    Code card that only renders while visible, at most once per `throttleMs`.
+
+    Updates received while hidden (e.g. window minimized to tray)
+    only mark the card dirty, it will be rendered when shown again.
+    """
+
+    def __init__(self, parent: QWidget | None = None, throttleMs: int = 500):  # type: ignore
+        super().__init__(parent)
+
+        self._dirty = True
+        self._renderTimer = QTimer(self)
+        self._renderTimer.setSingleShot(True)
+        self._renderTimer.setInterval(throttleMs)
+        self._renderTimer.timeout.connect(self._render)
+
+    @abstractmethod
+    def dumpText(self) -> str:
+        """Called in the background loop thread, must not touch widgets."""
+
+    def markDirty(self):
+        self._dirty = True
+        if not self._renderTimer.isActive():
+            self._render()
+
+    def _render(self):
+        if not (self._dirty and self.isVisible()):
+            return
+        self._dirty = False
+        self._renderTimer.start()
+        background_loop.call_soon(self._dumpAndPost)
+
+    def _dumpAndPost(self):
+        ui_bridge.post(self.bodyLabel.setText, self.dumpText())
+
+    @override
+    def showEvent(self, event: QShowEvent):
+        super().showEvent(event)
+        if not self._renderTimer.isActive():
+            self._render()
+
+
+class CurrentClientSideInfoCard(LazyCodeCard):
     def __init__(self, parent: QWidget | None = None):  # type: ignore
         super().__init__(parent)
         self.setTitle("客户端侧当前信息")
 
-        info_feeder.on_info_update.connect(lambda *_: wrap_async(self._onInfoUpdate))
-        self._onInfoUpdate()
+        info_feeder.on_info_update.connect(lambda *_: post_to_ui(self.markDirty))
 
-    def _onInfoUpdate(self):
-        self.bodyLabel.setText(
-            info_feeder.initial_info.model_dump_json(indent=2, exclude_unset=True),
-        )
+    @override
+    def dumpText(self) -> str:
+        return info_feeder.initial_info.model_dump_json(indent=2, exclude_unset=True)
 
 
-class CurrentServerSideInfoCard(CodeCard):
+class CurrentServerSideInfoCard(LazyCodeCard):
     def __init__(self, parent: QWidget | None = None):  # type: ignore
         super().__init__(parent)
         self.setTitle("服务端侧当前信息")
 
         info_feeder.on_server_side_info_updated.connect(
-            lambda *_: wrap_async(self._onInfoUpdate),
+            lambda *_: post_to_ui(self.markDirty),
         )
-        self._onInfoUpdate()
+        info_feeder.on_disconnected.connect(lambda *_: post_to_ui(self.markDirty))
 
-    def _onInfoUpdate(self):
-        if (not info_feeder.server_side_info) or (not info_feeder.connected):
-            self.bodyLabel.setText("null")
-        else:
-            self.bodyLabel.setText(
-                info_feeder.server_side_info.model_dump_json(indent=2),
-            )
+    @override
+    def showEvent(self, event: QShowEvent):
+        background_loop.call_soon(info_feeder.set_full_ack, enabled=True)
+        super().showEvent(event)
+
+    @override
+    def hideEvent(self, event: QHideEvent):
+        background_loop.call_soon(info_feeder.set_full_ack, enabled=False)
+        super().hideEvent(event)
+
+    @override
+    def dumpText(self) -> str:
+        raw = info_feeder.server_side_info_raw
+        if (not raw) or (not info_feeder.connected):
+            return "null"
+        # only for display, no need to validate it into a model
+        return json.dumps(json.loads(raw), indent=2, ensure_ascii=False)
+
+
+class SendLaneCountersCard(LazyCodeCard):
+    def __init__(self, parent: QWidget | None = None):  # type: ignore
+        super().__init__(parent)
+        self.setTitle("各通道已发送帧数")
+
+        info_feeder.on_before_send_info.connect(lambda *_: post_to_ui(self.markDirty))
+
+    @override
+    def dumpText(self) -> str:
+        return json.dumps(info_feeder.lanes.counters, indent=2)
 
 
 class HomePage(VerticalScrollAreaView):
@@ -218,3 +294,6 @@ class HomePage(VerticalScrollAreaView):
 
         self.currentServerSideInfoCard = CurrentServerSideInfoCard()
         self.addWidget(self.currentServerSideInfoCard)
+
+        self.sendLaneCountersCard = SendLaneCountersCard()
+        self.addWidget(self.sendLaneCountersCard)
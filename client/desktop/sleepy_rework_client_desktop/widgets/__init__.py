@@ -1,3 +1,6 @@
+from .lazy_view import (
+    LazyView as LazyView,
+)
 from .scroll_area import (
     VerticalScrollAreaView as VerticalScrollAreaView,
 )
@@ -0,0 +1,43 @@
+from collections.abc import Callable
+from typing import override
+
+from PySide6.QtGui import QShowEvent
+from PySide6.QtWidgets import QVBoxLayout, QWidget
+
+
+class LazyView(QWidget):
+    """
+    Navigation placeholder that constructs the real view on first show,
+    so a client started minimized to tray never builds pages it does not display.
+    """
+
+    def __init__(
+        self,
+        routeKey: str,
+        factory: Callable[[], QWidget],
+        parent: QWidget | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.routeKey = routeKey
+        self.setObjectName(routeKey)
+
+        self._factory = factory
+        self._view: QWidget | None = None
+
+        self.vLayout = QVBoxLayout(self)
+        self.vLayout.setContentsMargins(0, 0, 0, 0)
+
+    @property
+    def view(self) -> QWidget | None:
+        return self._view
+
+    def ensureView(self) -> QWidget:
+        if self._view is None:
+            self._view = self._factory()
+            self.vLayout.addWidget(self._view)
+        return self._view
+
+    @override
+    def showEvent(self, event: QShowEvent):
+        self.ensureView()
+        super().showEvent(event)
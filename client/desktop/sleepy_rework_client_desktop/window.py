@@ -1,4 +1,4 @@
-from typing import override
+from typing import Any, override
 
 from PySide6.QtCore import QSize
 from PySide6.QtGui import QCloseEvent, QIcon, QShowEvent
@@ -13,6 +13,20 @@ from qfluentwidgets import (
 from .assets import ICON_PATH
 from .config import config, reApplyThemeColor, reApplyThemeMode
 from .consts import APP_NAME
+from .utils.profiling import STARTUP_CONNECT_BUDGET, elapsed_since_startup
+from .widgets.lazy_view import LazyView
+
+
+def _createHomePage():
+    from .views import HomePage
+
+    return HomePage()
+
+
+def _createSettingsPage():
+    from .views import SettingsPage
+
+    return SettingsPage()
 
 
 class MainWindow(MSFluentWindow):
@@ -26,11 +40,12 @@ class MainWindow(MSFluentWindow):
         self.splashScreen.setIconSize(QSize(128, 128))
 
     def setup(self):
+        # start connecting first, everything else can happen meanwhile
+        self.setupInfoClient()
         self.setupTrayIcon()
         self.setupThemeListener()
         self.setupUI()
         self.restoreAutoStart()
-        self.setupInfoClient()
         self.splashScreen.finish()
 
     def setupTrayIcon(self):
@@ -46,9 +61,8 @@ class MainWindow(MSFluentWindow):
         self.themeListener.start()
 
     def setupUI(self):
-        from .views import HomePage, SettingsPage
-
-        self.homePage = HomePage()
+        # pages are only built when first shown, see `LazyView`
+        self.homePage = LazyView("home", _createHomePage)
         self.addSubInterface(
             self.homePage,
             FluentIcon.HOME,
@@ -56,7 +70,7 @@ class MainWindow(MSFluentWindow):
             FluentIcon.HOME_FILL,
         )
 
-        self.settingsPage = SettingsPage()
+        self.settingsPage = LazyView("settings", _createSettingsPage)
         self.addSubInterface(
             self.settingsPage,
             FluentIcon.SETTING,
@@ -88,12 +102,24 @@ class MainWindow(MSFluentWindow):
 
     def setupInfoClient(self):
         from .utils.activity import activity_detector
+        from .utils.background import background_loop
         from .utils.client.info import info_feeder
 
+        @info_feeder.on_connected.connect
+        async def reportStartupConnect(_: Any):
+            info_feeder.on_connected.slots.remove(reportStartupConnect)
+            elapsed = elapsed_since_startup()
+            print(f"Connected to server {elapsed:.2f}s after startup")
+            if elapsed > STARTUP_CONNECT_BUDGET:
+                print(
+                    f"Startup connection exceeded budget of"
+                    f" {STARTUP_CONNECT_BUDGET:.2f}s",
+                )
+
         if qconfig.get(config.serverEnableConnect):
-            info_feeder.run_in_background()
+            background_loop.call_soon(info_feeder.run_in_background)
 
-        activity_detector.setup()
+        background_loop.call_soon(activity_detector.setup)
 
     @override
     def showEvent(self, a0: QShowEvent):
@@ -0,0 +1,69 @@
+"""
+Time a fresh interpreter takes to import the backend config and the whole app,
+with a `sleepy.toml` defining no devices and one defining 10k of them.
+
+Every run is a new process, so nothing is cached between them.
+"""
+
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+RUNS = 5
+DEVICE_COUNTS = (0, 10_000)
+MODULES = ("sleepy_rework.config", "sleepy_rework.app")
+
+TIMED_IMPORT = """
+import time
+start = time.perf_counter()
+import {module}
+print(time.perf_counter() - start)
+"""
+
+
+def write_config(path: Path, devices: int):
+    lines = ['environment = "prod"', ""]
+    for i in range(devices):
+        lines.extend(
+            [
+                f'[devices."device-{i}"]',
+                f'name = "Device {i}"',
+                f'description = "Benchmark device number {i}"',
+                'device_type = "pc"',
+                'device_os = "Linux"',
+                f"remove_when_offline = {'true' if i % 10 == 0 else 'false'}",
+                "",
+            ],
+        )
+    (path / "sleepy.toml").write_text("\n".join(lines), encoding="u8")
+
+
+def time_import(cwd: Path, module: str) -> float:
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-c", TIMED_IMPORT.format(module=module)],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    for devices in DEVICE_COUNTS:
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = Path(tmp)
+            write_config(cwd, devices)
+            for module in MODULES:
+                times = [time_import(cwd, module) for _ in range(RUNS)]
+                print(
+                    f"{devices:>6} devices  import {module:<22}"
+                    f" median {statistics.median(times) * 1000:>8.1f} ms"
+                    f"  min {min(times) * 1000:>8.1f} ms",
+                )
+
+
+if __name__ == "__main__":
+    main()
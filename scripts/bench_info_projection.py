@@ -0,0 +1,63 @@
+"""
+Time building a page of 100 devices out of 10k, and encoding `Info` with all of
+them or only that page, in full and projected to a few fields with `fields=`.
+
+Run from a directory with a `sleepy.toml`, as the backend config is loaded on import.
+"""
+
+import statistics
+import timeit
+from collections.abc import Callable
+
+from sleepy_rework.broadcast import get_info_page, info_serializer
+from sleepy_rework.devices import device_manager
+from sleepy_rework_types import DeviceConfig
+
+RUNS = 20
+DEVICES = 10_000
+PROJECTIONS = (None, frozenset({"name", "status"}), frozenset({"name", "data"}))
+
+
+def add_devices():
+    for i in range(DEVICES):
+        device = device_manager.add(f"device-{i}", DeviceConfig(name=f"Device {i}"))
+        device.info = device.info.model_validate(
+            {
+                **device.info.model_dump(exclude_unset=True),
+                "description": f"Benchmark device number {i}",
+                "device_type": "pc",
+                "device_os": "Linux",
+                "online": True,
+                "data": {
+                    "current_app": {"name": "VSCode", "last_change_time": i},
+                    "battery": {"percent": i % 100},
+                    "additional_statuses": ["Listening to something", "Busy"],
+                },
+            },
+        )
+
+
+def bench(name: str, func: Callable[[], object]):
+    times = timeit.repeat(func, number=1, repeat=RUNS)
+    result = func()
+    size = f"  {len(result):>9} bytes" if isinstance(result, bytes) else ""
+    print(f"{name:<36} median {statistics.median(times) * 1000:>8.2f} ms{size}")
+
+
+def main():
+    add_devices()
+    info, _ = get_info_page()
+    page, _ = get_info_page(limit=100)
+    bench(
+        "build 100 devices page",
+        lambda: get_info_page(after="device-5000", limit=100),
+    )
+    for fields in PROJECTIONS:
+        serializer = info_serializer(fields)
+        label = "all fields" if fields is None else ",".join(sorted(fields))
+        bench(f"{DEVICES} devices, {label}", lambda s=serializer: s(info))
+        bench(f"100 devices page, {label}", lambda s=serializer: s(page))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+Calls per second of the generated API methods,
+compared with the old `__getattr__` + `partial(request_from_info)` dispatch.
+
+`dispatch` measures client side overhead only, `request` stays a canned response;
+`mock transport` goes through httpx with an in-process transport.
+"""
+
+import json
+import time
+from collections.abc import Callable
+from functools import partial
+from typing import Any, override
+
+from httpx import Client, MockTransport, Request, Response
+
+from sleepy_rework_types import DeviceInfoFromClient, SyncHttpApiClient
+from sleepy_rework_types.api.http import HTTP_APIS, RespValidator
+
+DURATION = 1.0
+
+DEVICE_INFO = {
+    "name": "bench",
+    "idle": False,
+    "online": True,
+    "data": {"current_app": {"name": "app", "title": "title"}},
+}
+RESPONSES: dict[tuple[str, str], Any] = {
+    ("GET", "/api/v1/info"): {"status": "online", "devices": {"bench": DEVICE_INFO}},
+    ("PATCH", "/api/v1/device/bench/info"): DEVICE_INFO,
+}
+
+
+def handler(request: Request) -> Response:
+    return Response(200, json=RESPONSES[(request.method, request.url.path)])
+
+
+class CannedClient(SyncHttpApiClient):
+    # with their request, as device info replies are validated by its `ack`
+    canned: dict[tuple[str, str], Response] = {  # noqa: RUF012
+        (method, endpoint): Response(
+            200,
+            content=json.dumps(v).encode(),
+            request=Request(method, f"http://bench{endpoint}"),
+        )
+        for (method, endpoint), v in RESPONSES.items()
+    }
+
+    @override
+    def request(
+        self,
+        method: str,
+        endpoint: str,
+        query_params: dict[str, Any] | None,
+        body: Any,
+        validate: RespValidator | None,
+    ) -> Any:
+        resp = self.canned[(method, endpoint)]
+        return validate(resp) if validate else None
+
+
+def legacy_dispatch(client: SyncHttpApiClient, name: str) -> Callable[..., Any]:
+    # what `BaseHttpApiClient.__getattr__` used to do on every call,
+    # building the partial is part of the measured cost
+    def call(*args: Any, **kwargs: Any) -> Any:
+        return partial(client.request_from_info, HTTP_APIS[name])(*args, **kwargs)
+
+    return call
+
+
+def bench(label: str, func: Callable[[], Any]) -> float:
+    func()  # warm up
+    count = 0
+    start = time.perf_counter()
+    end = start + DURATION
+    while time.perf_counter() < end:
+        for _ in range(100):
+            func()
+        count += 100
+    rate = count / (time.perf_counter() - start)
+    print(f"  {label:<12} {rate:>12,.0f} calls/s")
+    return rate
+
+
+def run(title: str, client: SyncHttpApiClient):
+    body = DeviceInfoFromClient(idle=True)
+    print(title)
+    for name, call_new, call_old in (
+        (
+            "get_info",
+            client.get_info,
+            legacy_dispatch(client, "get_info"),
+        ),
+        (
+            "patch_device_info",
+            lambda: client.patch_device_info(body, device_key="bench"),
+            lambda: legacy_dispatch(client, "patch_device_info")(
+                body,
+                device_key="bench",
+            ),
+        ),
+    ):
+        print(f" {name}")
+        old = bench("legacy", call_old)
+        new = bench("generated", call_new)
+        print(f"  speedup      {new / old:>12.2f}x")
+
+
+def main():
+    run("dispatch", CannedClient("http://bench"))
+
+    client = SyncHttpApiClient("http://bench")
+    client._client = Client(  # noqa: SLF001
+        base_url=client.base_url,
+        headers=client.headers,
+        transport=MockTransport(handler),
+    )
+    run("mock transport", client)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Checks that `DeviceIngestFastPath` answers device info updates with the same
+status, headers and body bytes as the plain FastAPI route, then compares their speed.
+"""
+
+import asyncio
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+from starlette.middleware import Middleware
+
+from sleepy_rework import devices
+from sleepy_rework.api_v1.fast_path import DeviceIngestFastPath
+from sleepy_rework.app import app
+from sleepy_rework.config import config
+from sleepy_rework.devices import device_manager
+from sleepy_rework_types import DeviceConfig
+
+SECRET = "fast-path-secret"  # noqa: S105
+EXISTING = "existing"
+CREATED = "created"
+
+type Case = tuple[str, str, dict[str, str], bytes, Callable[[], Any] | None]
+
+
+def json_body(data: Any) -> bytes:
+    return json.dumps(data, ensure_ascii=False).encode()
+
+
+def new_device_allowed():
+    config.allow_new_devices = True
+    device_manager.devices.pop(CREATED, None)
+
+
+def reset_update_seq():
+    device_manager.devices[EXISTING].update_seq = 0
+
+
+def new_device_denied():
+    config.allow_new_devices = False
+
+
+AUTH = {"X-Sleepy-Secret": SECRET, "Content-Type": "application/json"}
+BEARER = {"Authorization": f"bearer {SECRET}", "Content-Type": "application/json"}
+
+CASES: list[Case] = [
+    ("existing device", EXISTING, AUTH, json_body({"idle": True}), None),
+    ("bearer auth", EXISTING, BEARER, json_body({"idle": False}), None),
+    (
+        "non ascii and extra data",
+        EXISTING,
+        AUTH,
+        json_body({"name": "睡觉中 💤", "data": {"nested": [1, 2.5, None]}}),
+        None,
+    ),
+    ("new device", CREATED, AUTH, json_body({"name": "new"}), new_device_allowed),
+    ("wrong secret", EXISTING, {**AUTH, "X-Sleepy-Secret": "x"}, b"{}", None),
+    ("missing auth", EXISTING, {"Content-Type": "application/json"}, b"{}", None),
+    ("unknown device", "unknown", AUTH, b"{}", new_device_denied),
+    ("invalid body", EXISTING, AUTH, json_body({"idle": "maybe"}), None),
+    ("malformed json", EXISTING, AUTH, b"{", None),
+    ("empty body", EXISTING, AUTH, b"", None),
+    ("text body", EXISTING, {**AUTH, "Content-Type": "text/plain"}, b"{}", None),
+    (
+        "seq ack",
+        f"{EXISTING}?ack=seq",
+        AUTH,
+        json_body({"idle": True}),
+        reset_update_seq,
+    ),
+    ("no ack", f"{EXISTING}?ack=none", AUTH, json_body({"idle": True}), None),
+    (
+        "no ack new device",
+        f"{CREATED}?ack=none",
+        AUTH,
+        json_body({"name": "new"}),
+        new_device_allowed,
+    ),
+    ("invalid ack", f"{EXISTING}?ack=maybe", AUTH, b"{}", None),
+]
+
+
+async def request(
+    client: httpx.AsyncClient,
+    key: str,
+    headers: dict[str, str],
+    body: bytes,
+) -> httpx.Response:
+    key, _, query = key.partition("?")
+    return await client.patch(
+        f"/api/v1/device/{key}/info?{query}" if query else f"/api/v1/device/{key}/info",
+        headers=headers,
+        content=body,
+    )
+
+
+async def check(plain: httpx.AsyncClient, fast: httpx.AsyncClient) -> bool:
+    ok = True
+    for title, key, headers, body, setup in CASES:
+        if setup:
+            setup()
+        plain_resp = await request(plain, key, headers, body)
+        if setup:
+            setup()
+        fast_resp = await request(fast, key, headers, body)
+
+        same = (
+            plain_resp.status_code == fast_resp.status_code
+            and plain_resp.headers.raw == fast_resp.headers.raw
+            and plain_resp.content == fast_resp.content
+        )
+        ok = ok and same
+        print(f"{'ok  ' if same else 'DIFF'} {plain_resp.status_code} {title}")
+        if not same:
+            print(f"  plain: {plain_resp.headers.raw} {plain_resp.content!r}")
+            print(f"  fast:  {fast_resp.headers.raw} {fast_resp.content!r}")
+    return ok
+
+
+async def bench(client: httpx.AsyncClient, n: int) -> float:
+    body = json_body({"idle": False, "current_app": "bench"})
+    start = time.perf_counter()
+    for _ in range(n):
+        await request(client, EXISTING, AUTH, body)
+    return n / (time.perf_counter() - start)
+
+
+async def main():
+    # the same bytes are only expected with the same timestamp
+    devices.time.time = lambda: 1_700_000_000.0
+
+    config.secret = SECRET
+    device_manager.add(EXISTING, DeviceConfig())
+
+    # same stack as with `fast_device_ingest` enabled: innermost user middleware
+    plain_app = app.build_middleware_stack()
+    app.user_middleware.append(Middleware(DeviceIngestFastPath))
+    fast_app = app.build_middleware_stack()
+    app.user_middleware.pop()
+
+    base_url = "http://testserver"
+    async with (
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(plain_app),
+            base_url=base_url,
+        ) as plain,
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(fast_app),
+            base_url=base_url,
+        ) as fast,
+    ):
+        ok = await check(plain, fast)
+        n = 2000
+        print(f"plain route  {await bench(plain, n):>10,.0f} req/s")
+        print(f"fast path    {await bench(fast, n):>10,.0f} req/s")
+
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
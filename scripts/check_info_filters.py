@@ -0,0 +1,92 @@
+"""
+Checks that `/info` viewers subscribed with a `DeviceFilter` get the devices
+entering their filter, a removal for the ones leaving it, and nothing for changes
+of devices they don't see.
+
+Run from a directory with a `sleepy.toml`, as the backend config is loaded on import.
+"""
+
+import asyncio
+import json
+from typing import Any
+
+from sleepy_rework.broadcast import EncodedMessage, info_broadcaster
+from sleepy_rework.config import config
+from sleepy_rework.devices import DeviceFilter, device_manager
+from sleepy_rework_types import DeviceConfig, DeviceInfoFromClient, OnlineStatus
+
+TIMEOUT = config.frontend_event_throttle * 2 + 0.5
+
+type Events = asyncio.Queue[EncodedMessage | None]
+
+_subscriptions: set[asyncio.Task] = set()
+
+
+def subscribe(device_filter: DeviceFilter) -> Events:
+    """Events for `device_filter` from now on"""
+    queue: Events = asyncio.Queue()
+
+    async def pump():
+        async for event in info_broadcaster.subscribe_events(
+            info_broadcaster.version,
+            device_filter=device_filter,
+        ):
+            queue.put_nowait(event)
+
+    _subscriptions.add(asyncio.create_task(pump()))
+    return queue
+
+
+async def next_devices(events: Events) -> dict[str, Any] | None:
+    """Devices of the next event, `None` if none came within `TIMEOUT`"""
+    try:
+        message = await asyncio.wait_for(events.get(), TIMEOUT)
+    except TimeoutError:
+        return None
+    assert message is not None
+    return json.loads(message.data)["devices"]
+
+
+def check(name: str, got: Any, expected: Any):
+    assert got == expected, f"{name}: expected {expected!r}, got {got!r}"
+    print(f"ok  {name}")
+
+
+async def main():
+    config.privacy_mode = False
+    phone = device_manager.add("phone", DeviceConfig(name="Phone", device_type="phone"))
+    pc = device_manager.add("pc", DeviceConfig(name="PC", device_type="pc"))
+    await phone.update(online=True)
+    await pc.update(online=True)
+    await asyncio.sleep(config.frontend_event_throttle * 2)
+
+    online = subscribe(DeviceFilter(status=[OnlineStatus.ONLINE]))
+    phones = subscribe(DeviceFilter(device_type=["phone"]))
+
+    await pc.update(DeviceInfoFromClient(description="busy"))
+    pc_info = json.loads(pc.info.model_dump_json())
+    check("matching change", await next_devices(online), {"pc": pc_info})
+    check("change not seen", await next_devices(phones), None)
+
+    # `online` is changed in place, as offline timers and disconnects do
+    await phone.update(online=False)
+    check("leaving the filter", await next_devices(online), {"phone": None})
+    phone_devices = await next_devices(phones) or {}
+    check("still matching", phone_devices["phone"]["online"], expected=False)
+
+    await phone.update(online=True)
+    online_devices = await next_devices(online) or {}
+    check("entering the filter", online_devices["phone"]["status"], "online")
+    phone_devices = await next_devices(phones) or {}
+    check("matching again", phone_devices["phone"]["status"], "online")
+
+    await device_manager.remove("pc")
+    check("removed", await next_devices(online), {"pc": None})
+    check("removed, not seen", await next_devices(phones), None)
+
+    for task in _subscriptions:
+        task.cancel()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
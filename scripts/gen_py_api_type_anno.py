@@ -1,9 +1,13 @@
+import json
+import re
+from enum import Enum
 from pathlib import Path
+from string import Formatter
 
 from sleepy_rework_types.api.http import HTTP_APIS, HttpApiInfo, __file__
 
 
-def gen_method_anno(name: str, info: HttpApiInfo, is_async: bool = False) -> str:
+def gen_params(info: HttpApiInfo) -> list[str]:
     params = ["self"]
     if info.body:
         is_op = info.body.default is not Ellipsis
@@ -28,7 +32,10 @@ def gen_method_anno(name: str, info: HttpApiInfo, is_async: bool = False) -> str
         params.append("*")
         params.extend(required_kw)
         params.extend(optional_kw)
+    return params
 
+
+def gen_resp_anno(info: HttpApiInfo, is_async: bool = False) -> str:
     if info.response and info.response.type_anno is not Ellipsis:
         resp = info.response.type_anno
     else:
@@ -36,26 +43,124 @@ def gen_method_anno(name: str, info: HttpApiInfo, is_async: bool = False) -> str
 
     if is_async:
         resp = f"t.Coroutine[t.Any, t.Any, {resp}]"
+    return resp
+
+
+def gen_endpoint_builder(info: HttpApiInfo) -> str:
+    # compile the endpoint template into an f-string
+    parts: list[str] = []
+    for literal, field_name, format_spec, conversion in Formatter().parse(
+        info.endpoint,
+    ):
+        parts.append(literal.replace("{", "{{").replace("}", "}}"))
+        if field_name is None:
+            continue
+        if field_name not in info.path_params:
+            raise ValueError(f"Unknown path param {field_name} in {info.endpoint}")
+        parts.append(
+            f"{{{field_name}"
+            f"{f'!{conversion}' if conversion else ''}"
+            f"{f':{format_spec}' if format_spec else ''}}}",
+        )
+    if not info.path_params:
+        return json.dumps("".join(parts))
+    return f'f"{"".join(parts)}"'
+
+
+def to_snake_case(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "_", name).lower()
+
+
+def get_validator_name(info: HttpApiInfo) -> str:
+    if not info.response:
+        return "None"
+    if info.response.validator:
+        return info.response.validator.__name__
+    if issubclass(info.response.model, str):
+        return "text_resp_validator"
+    if issubclass(info.response.model, bytes):
+        return "bytes_resp_validator"
+    return f"_validate_{to_snake_case(info.response.model.__name__)}"
+
+
+def gen_method(name: str, info: HttpApiInfo, is_async: bool = False) -> str:
+    params = gen_params(info)
+    resp = gen_resp_anno(info, is_async)
+    sig = f"    def {name}({', '.join(params)}) -> {resp}:\n"
+    if len(sig) > 89:  # line length limit + newline
+        sig = f"    def {name}(\n"
+        sig += "".join(f"        {x},\n" for x in params)
+        sig += f"    ) -> {resp}:\n"
+
+    query = (
+        f"{{{', '.join(f'{json.dumps(k)}: {k}' for k in info.query_params)}}}"
+        if info.query_params
+        else "None"
+    )
+    body = "dump_body(body)" if info.body else "None"
+    # async methods hand back the coroutine of `request` directly,
+    # saving a wrapping coroutine per call
+    return (
+        f"{sig}"
+        f"        return self.request(\n"
+        f"            {json.dumps(info.method)},\n"
+        f"            {gen_endpoint_builder(info)},\n"
+        f"            {query},\n"
+        f"            {body},\n"
+        f"            {get_validator_name(info)},\n"
+        f"        )\n"
+    )
+
+
+def gen_module() -> str:
+    models: dict[str, type] = {}
+    enums: dict[str, type] = {}
+    validators = {"model_resp_validator"}
+    for info in HTTP_APIS.values():
+        if (v := get_validator_name(info)) != "None" and not v.startswith("_"):
+            validators.add(v)
+        if info.response and not (
+            info.response.validator or issubclass(info.response.model, (str, bytes))
+        ):
+            models[info.response.model.__name__] = info.response.model
+        # enum defaults are evaluated at runtime, unlike the annotations
+        for param in (*info.path_params.values(), *info.query_params.values()):
+            if isinstance(param.default, Enum):
+                enums[type(param.default).__name__] = type(param.default)
+
+    http_imports = sorted({"BaseHttpApiClient", "dump_body", *validators})
+    model_imports: dict[str, list[str]] = {}
+    imported = {**models, **enums}
+    for model_name in sorted(imported):
+        module = imported[model_name].__module__.removeprefix("sleepy_rework_types")
+        model_imports.setdefault(module, []).append(model_name)
+
+    code = "# generated by scripts/gen_py_api_type_anno.py, do not edit\n"
+    code += "from __future__ import annotations\n\n"
+    code += "import typing as t\n\n"
+    for module, names in sorted(model_imports.items()):
+        code += f"from .{module} import {', '.join(names)}\n"
+    code += "from .http import (\n"
+    code += "".join(f"    {x},\n" for x in http_imports)
+    code += ")\n\n"
+    code += "if t.TYPE_CHECKING:\n    import sleepy_rework_types as m\n\n"
+
+    code += "# pre-bound once at import time, not looked up per call\n"
+    for model_name in sorted(models):
+        validator_name = f"_validate_{to_snake_case(model_name)}"
+        code += f"{validator_name} = model_resp_validator({model_name})\n"
 
-    return f"def {name}({', '.join(params)}) -> {resp}: ..."
+    for cls_name, is_async in (("SyncHttpApi", False), ("AsyncHttpApi", True)):
+        code += f"\n\nclass {cls_name}(BaseHttpApiClient):\n"
+        code += "\n".join(
+            gen_method(name, info, is_async) for name, info in HTTP_APIS.items()
+        )
+    return code
 
 
 def main():
-    with (Path(__file__).parent / "types.pyi").open("w", encoding="utf-8") as f:
-        f.write("import typing as t\n")
-        f.write("import sleepy_rework_types as m\n")
-
-        f.write("class SyncHttpApi:\n")
-        for name, info in HTTP_APIS.items():
-            f.write("    ")
-            f.write(gen_method_anno(name, info))
-            f.write("\n")
-
-        f.write("class AsyncHttpApi:\n")
-        for name, info in HTTP_APIS.items():
-            f.write("    ")
-            f.write(gen_method_anno(name, info, is_async=True))
-            f.write("\n")
+    path = Path(__file__).parent / "types.py"
+    path.write_text(gen_module(), encoding="utf-8")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,184 @@
+"""
+Load test of `AsyncHttpApiClient.patch_device_info` against a local stand-in server
+that fails a share of requests with 503, comparing client configurations.
+
+Reports throughput, latency, errors, retries and TCP connections opened.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import statistics
+import time
+from typing import Any
+
+import httpx
+import uvicorn
+
+from sleepy_rework_types import (
+    APIError,
+    AsyncHttpApiClient,
+    DeviceInfoFromClient,
+    RetryPolicy,
+)
+
+HOST = "127.0.0.1"
+PORT = 29307
+
+DEVICE_INFO = json.dumps({"name": "load", "online": True}).encode()
+
+
+class StandInServer:
+    """
+    Minimal ASGI app answering every request with a device info or a 503,
+    `GET /stats` returns and resets its counters.
+    """
+
+    def __init__(self, fail_rate: float):
+        self.fail_rate = fail_rate
+        self.connections: set[tuple[str, int]] = set()
+        self.requests = 0
+
+    async def __call__(self, scope: dict[str, Any], receive: Any, send: Any):
+        if scope["type"] != "http":
+            return
+
+        while (await receive()).get("more_body"):
+            pass
+
+        if scope["path"] == "/stats":
+            status = 200
+            body = json.dumps(
+                {"requests": self.requests, "connections": len(self.connections)},
+            ).encode()
+            self.connections.clear()
+            self.requests = 0
+        else:
+            if client := scope.get("client"):
+                self.connections.add(tuple(client))
+            self.requests += 1
+            failed = random.random() < self.fail_rate  # noqa: S311
+            status = 503 if failed else 200
+            body = b'{"type":"unavailable"}' if failed else DEVICE_INFO
+
+        await send(
+            {
+                "type": "http.response.start",
+                "status": status,
+                "headers": [(b"content-type", b"application/json")],
+            },
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def serve(fail_rate: float):
+    uvicorn.run(StandInServer(fail_rate), host=HOST, port=PORT, log_level="warning")
+
+
+def wait_server_up():
+    for _ in range(100):
+        try:
+            httpx.get(f"http://{HOST}:{PORT}/stats")
+        except httpx.TransportError:
+            time.sleep(0.1)
+        else:
+            return
+    raise RuntimeError("Stand-in server did not start")
+
+
+async def fetch_stats() -> dict[str, int]:
+    """Returns and resets the stand-in server counters."""
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"http://{HOST}:{PORT}/stats")).json()
+
+
+async def run_case(
+    title: str,
+    client: AsyncHttpApiClient,
+    concurrency: int,
+    duration: float,
+):
+    await fetch_stats()
+    latencies: list[float] = []
+    errors = 0
+    body = DeviceInfoFromClient(idle=False)
+    end = time.perf_counter() + duration
+
+    async def worker(i: int):
+        nonlocal errors
+        while time.perf_counter() < end:
+            start = time.perf_counter()
+            try:
+                await client.patch_device_info(body, device_key=f"load-{i}")
+            except APIError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    async with client:
+        await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    stats = await fetch_stats()
+
+    ordered = sorted(latencies)
+    print(title)
+    print(f"  calls        {len(ordered):>10} ({len(ordered) / duration:,.0f}/s)")
+    print(f"  errors       {errors:>10} ({errors / max(len(ordered), 1):.2%})")
+    print(f"  p50 latency  {statistics.median(ordered) * 1000:>10.2f} ms")
+    print(f"  p99 latency  {ordered[int(len(ordered) * 0.99)] * 1000:>10.2f} ms")
+    print(f"  server reqs  {stats['requests']:>10}")
+    print(f"  connections  {stats['connections']:>10}")
+    if client.retry:
+        print(f"  retries      {client.retry.retries:>10}")
+        print(f"  budget out   {client.retry.budget_exhausted:>10}")
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--concurrency", type=int, default=50)
+    parser.add_argument("-d", "--duration", type=float, default=5)
+    parser.add_argument("-f", "--fail-rate", type=float, default=0.05)
+    args = parser.parse_args()
+
+    # own process, so the server doesn't compete with the client for the loop
+    server = multiprocessing.Process(target=serve, args=(args.fail_rate,))
+    server.start()
+    wait_server_up()
+
+    base_url = f"http://{HOST}:{PORT}"
+    retry_methods = frozenset({*RetryPolicy().idempotent_methods, "PATCH"})
+    cases = (
+        (
+            "small keepalive pool, no retry",
+            AsyncHttpApiClient(base_url, max_keepalive_connections=1),
+        ),
+        (
+            "pool sized to concurrency, no retry",
+            AsyncHttpApiClient(
+                base_url,
+                max_connections=args.concurrency,
+                max_keepalive_connections=args.concurrency,
+                keepalive_expiry=30,
+            ),
+        ),
+        (
+            "pool sized to concurrency, retry with budget",
+            AsyncHttpApiClient(
+                base_url,
+                max_connections=args.concurrency,
+                max_keepalive_connections=args.concurrency,
+                keepalive_expiry=30,
+                retry=RetryPolicy(idempotent_methods=retry_methods),
+            ),
+        ),
+    )
+    try:
+        for title, client in cases:
+            await run_case(title, client, args.concurrency, args.duration)
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""
+UI thread latency of the desktop client during a reconnect storm: a local stand-in
+server answers every device info message with a full device info, then drops the
+connection, and the client reconnects right away.
+
+Runs the client offscreen from `--client` (this tree by default), so an older
+checkout can be measured the same way, and prints `UILatencyProbe` statistics.
+"""
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+from contextlib import suppress
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+HOST = "127.0.0.1"
+PORT = 29308
+
+CLIENT_PATH = Path(__file__).parent.parent / "client" / "desktop"
+UI_BRIDGE_PATH = CLIENT_PATH / "sleepy_rework_client_desktop" / "utils" / "ui_bridge.py"
+
+
+def device_info(statuses: int) -> str:
+    return json.dumps(
+        {
+            "name": "storm",
+            "online": True,
+            "long_connection": True,
+            "status": "online",
+            "data": {
+                "current_app": {"name": "app", "last_change_time": 1},
+                "additional_statuses": [f"status line {i}" for i in range(statuses)],
+            },
+        },
+    )
+
+
+def serve(lifetime: float, statuses: int):
+    import websockets
+
+    info = device_info(statuses)
+
+    async def handler(ws: websockets.ServerConnection):
+        assert ws.request
+        ack = parse_qs(urlsplit(ws.request.path).query).get("ack", ["full"])[0]
+        seq = 0
+
+        async def answer():
+            nonlocal seq
+            async for message in ws:
+                seq += 1
+                mode = json.loads(message).get("ack") or ack
+                if mode == "seq":
+                    await ws.send(json.dumps({"seq": seq}))
+                elif mode == "full":
+                    await ws.send(info)
+
+        with suppress(TimeoutError, websockets.ConnectionClosed):
+            await asyncio.wait_for(answer(), lifetime)
+
+    async def main():
+        async with websockets.serve(handler, HOST, PORT, max_size=None):
+            await asyncio.Future()
+
+    asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--client", type=Path, default=CLIENT_PATH)
+    parser.add_argument("-d", "--duration", type=float, default=20)
+    parser.add_argument("-w", "--warmup", type=float, default=3)
+    parser.add_argument("-l", "--lifetime", type=float, default=0.15)
+    parser.add_argument("-r", "--retry-sleep", type=float, default=0.05)
+    parser.add_argument("-s", "--statuses", type=int, default=20)
+    args = parser.parse_args()
+    client_path = args.client.resolve()
+
+    # own process, so the server doesn't compete with the client for the GIL
+    server = multiprocessing.Process(target=serve, args=(args.lifetime, args.statuses))
+    server.start()
+
+    # the client reads its config from the working directory
+    os.chdir(tempfile.mkdtemp())
+    Path("client_desktop.json").write_text(
+        json.dumps(
+            {
+                "server": {"enableConnect": True, "url": f"http://{HOST}:{PORT}"},
+                "device": {"key": "storm"},
+            },
+        ),
+    )
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.argv = sys.argv[:1]
+    sys.path.insert(0, str(client_path))
+
+    # this tree's probe, older checkouts may not have one
+    spec = importlib.util.spec_from_file_location("_ui_bridge", UI_BRIDGE_PATH)
+    assert spec
+    assert spec.loader
+    ui_bridge = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(ui_bridge)
+
+    from PySide6.QtCore import QTimer
+
+    from sleepy_rework_client_desktop.app import app, launch
+    from sleepy_rework_client_desktop.utils.client.info import info_feeder
+
+    info_feeder.retry_sleep = args.retry_sleep  # type: ignore
+
+    probe = ui_bridge.UILatencyProbe(app, report_interval=float("inf"))
+    QTimer.singleShot(int(args.warmup * 1000), probe.start)
+
+    def finish():
+        probe.stop()
+        app.quit()
+
+    QTimer.singleShot(int((args.warmup + args.duration) * 1000), finish)
+    try:
+        launch()
+    except SystemExit:
+        pass
+    finally:
+        server.terminate()
+        server.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,25 @@
 import type { components } from './openapi'
 
+export type AckMode = components['schemas']['AckMode']
+export type ConfigReloadResult = components['schemas']['ConfigReloadResult']
 export type DeviceBatteryStatus = components['schemas']['DeviceBatteryStatus']
 export type DeviceConfig = components['schemas']['DeviceConfig']
 export type DeviceCurrentApp = components['schemas']['DeviceCurrentApp']
 export type DeviceData = components['schemas']['DeviceData']
 export type DeviceInfo = components['schemas']['DeviceInfo']
+export type DeviceInfoAck = components['schemas']['DeviceInfoAck']
 export type DeviceInfoFromClient = components['schemas']['DeviceInfoFromClient']
+export type DeviceMemoryUsage = components['schemas']['DeviceMemoryUsage']
 export type DeviceType = components['schemas']['DeviceType']
 export type ErrDetail = components['schemas']['ErrDetail']
 export type FrontendConfig = components['schemas']['FrontendConfig']
 export type FrontendStatusConfig = components['schemas']['FrontendStatusConfig']
 export type Info = components['schemas']['Info']
+export type LoopLagReport = components['schemas']['LoopLagReport']
+export type LoopStall = components['schemas']['LoopStall']
+export type MemoryReport = components['schemas']['MemoryReport']
 export type OnlineStatus = components['schemas']['OnlineStatus']
 export type OpSuccess = components['schemas']['OpSuccess']
+export type ProfileFormat = components['schemas']['ProfileFormat']
+export type TracemallocReport = components['schemas']['TracemallocReport']
+export type TracemallocStat = components['schemas']['TracemallocStat']
@@ -4,6 +4,131 @@
  */
 
 export interface paths {
+  '/api/v1/admin/profile': {
+    parameters: {
+      query?: never
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    /**
+     * 对事件循环进行性能分析
+     * @description 在 `duration` 秒内对处理请求的事件循环线程进行性能分析，同一时间只能进行一个
+     *
+     *     - `collapsed`（默认）：在另一线程中每 `interval` 秒采样一次事件循环线程的调用栈，    返回 collapsed stacks 格式文本（每行为 `栈帧;栈帧;... 采样次数`），可直接用于生成火焰图，对服务影响很小
+     *     - `pstats`：使用 cProfile 记录事件循环期间运行的所有函数调用，返回 pstats 文件，    可用 `pstats` 模块或 snakeviz 等工具查看，分析期间服务会明显变慢
+     */
+    get: operations['__api_v1_admin_profile_get']
+    put?: never
+    post?: never
+    delete?: never
+    options?: never
+    head?: never
+    patch?: never
+    trace?: never
+  }
+  '/api/v1/admin/loop-lag': {
+    parameters: {
+      query?: never
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    /**
+     * 获取事件循环延迟情况
+     * @description 返回事件循环调度延迟的统计，以及最近捕获到的事件循环阻塞时的调用栈，    需要在配置中开启 `loop_watchdog`
+     */
+    get: operations['__api_v1_admin_loop_lag_get']
+    put?: never
+    post?: never
+    delete?: never
+    options?: never
+    head?: never
+    patch?: never
+    trace?: never
+  }
+  '/api/v1/admin/metrics': {
+    parameters: {
+      query?: never
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    /** 获取 Prometheus 格式的指标 */
+    get: operations['__api_v1_admin_metrics_get']
+    put?: never
+    post?: never
+    delete?: never
+    options?: never
+    head?: never
+    patch?: never
+    trace?: never
+  }
+  '/api/v1/admin/config/reload': {
+    parameters: {
+      query?: never
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    get?: never
+    put?: never
+    /**
+     * 重新加载配置文件
+     * @description 重新加载配置文件，并只应用与上次加载时相比有变化的部分，    未变化的设备及其连接不受影响，配置中开启 `watch_config` 时会在配置文件变化时自动执行
+     *
+     *     部分仅在启动时读取的配置项（如 `app`、`cors` 等）变化时不会被应用，    将在 `restart_required` 中列出，需重启后生效
+     */
+    post: operations['__api_v1_admin_config_reload_post']
+    delete?: never
+    options?: never
+    head?: never
+    patch?: never
+    trace?: never
+  }
+  '/api/v1/admin/memory': {
+    parameters: {
+      query?: never
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    /**
+     * 获取内存占用概况
+     * @description 返回进程峰值 RSS、各设备状态的大致内存占用、状态数据最大的 `top` 个设备、    以 WebSocket 连接的设备数、各方式连接的状态查看者数，以及事件日志占用
+     */
+    get: operations['__api_v1_admin_memory_get']
+    put?: never
+    post?: never
+    delete?: never
+    options?: never
+    head?: never
+    patch?: never
+    trace?: never
+  }
+  '/api/v1/admin/memory/tracemalloc': {
+    parameters: {
+      query?: never
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    get?: never
+    put?: never
+    /**
+     * 获取 tracemalloc 快照差异
+     * @description 未开始追踪时以 `nframes` 层调用栈开始追踪内存分配，    然后拍摄快照，返回与上次调用时快照相比差异最大的 `top` 个分配位置，首次调用时为空
+     *
+     *     追踪期间内存分配会变慢，排查完毕后请调用 DELETE 方法停止追踪
+     */
+    post: operations['__api_v1_admin_memory_tracemalloc_post']
+    /** 停止 tracemalloc 追踪 */
+    delete: operations['__api_v1_admin_memory_tracemalloc_delete']
+    options?: never
+    head?: never
+    patch?: never
+    trace?: never
+  }
   '/api/v1': {
     parameters: {
       query?: never
@@ -31,6 +156,8 @@ export interface paths {
     /**
      * 获取前端配置
      * @description 获取配置文件中 frontend 项下定义的数据
+     *
+     *     响应带有 `ETag`，可使用 `If-None-Match` 进行条件请求
      */
     get: operations['__api_v1_config_frontend_get']
     put?: never
@@ -50,9 +177,36 @@ export interface paths {
     }
     /**
      * 获取当前状态信息
-     * @description ### 实时获取
+     * @description ### 筛选设备
+     *
+     *     可使用 `status`、`device_type`、`device_os` 查询参数只获取符合条件的设备，    每个参数可重复传入多个值，设备需符合所有传入的参数，且符合每个参数的任一值，    如 `?status=online&status=idle&device_type=phone`，筛选后的设备按 key 排序，    `status` 字段仍为所有设备的总体状态
+     *
+     *     以下各种获取方式均可使用筛选，实时获取时只会收到符合条件的设备的变化，    设备不再符合条件时视为被移除
+     *
+     *     ### 实时获取
      *
      *     使用 WebSocket 连接到该路径可以获取实时推送的状态
+     *
+     *     连接时携带 `offset` 查询参数则改为推送状态变更事件（参见 InfoEvent），`offset` 为事件序号，    每个事件只包含发生变化的设备，被移除的设备值为 `null`，    断线重连时传入最后收到的事件序号即可只收到错过的事件，    若错过的事件已不在服务端保留的范围内（或首次连接传入 `0`），将先收到一个 `snapshot` 为 `true` 的完整状态事件
+     *
+     *     无法使用 WebSocket 时，也可以在 `Accept` Header 中包含 `text/event-stream` 以 SSE 的方式获取状态变更事件，    事件的 `id` 为事件序号，断线重连时携带 `Last-Event-ID` Header 即可只收到错过的事件，未携带时先收到完整状态事件
+     *
+     *     ### 长轮询
+     *
+     *     WebSocket 与 SSE 均无法使用时，可携带 `since` 查询参数进行长轮询，    响应的 `X-Sleepy-Version` Header 为当前状态版本号，下次请求时作为 `since` 传入即可：
+     *
+     *     - `since` 不是当前版本时（首次请求可传入 `0`），立即返回当前状态
+     *     - `since` 是当前版本时，等待至状态变化后返回新状态，`timeout` 秒内状态未变化则返回 304，不带响应体
+     *
+     *     ### 条件请求
+     *
+     *     未携带 `since` 时，响应带有 `ETag`，可使用 `If-None-Match` 进行条件请求，状态未变化时返回 304
+     *
+     *     ### 分页与字段选择
+     *
+     *     设备较多时，普通请求（非实时获取与长轮询）可携带 `limit` 查询参数分页获取，设备按 key 排序，    每页最多 `limit` 个，还有下一页时响应带有 `X-Sleepy-Next-Cursor` Header，    将其值作为 `cursor` 查询参数传入即可获取下一页，期间设备增删不会导致重复或遗漏已有设备
+     *
+     *     可携带 `fields` 查询参数只返回设备的指定字段（可重复传入或以逗号分隔，如 `fields=name,status`），    能显著减小响应体积，传入不存在的字段时返回 422
      */
     get: operations['__api_v1_info_get']
     put?: never
@@ -70,7 +224,10 @@ export interface paths {
       path?: never
       cookie?: never
     }
-    /** 获取设备配置 */
+    /**
+     * 获取设备配置
+     * @description 响应带有 `ETag`，可使用 `If-None-Match` 进行条件请求
+     */
     get: operations['__api_v1_device__device_key__config_get']
     /** 临时修改设备配置 */
     put: operations['__api_v1_device__device_key__config_put']
@@ -216,6 +373,20 @@ export interface paths {
      *     ### 仅保持唯一数据接收方式
      *
      *     当某设备已通过 WebSocket 连接到后端，依然 HTTP 请求本接口，或新建一个 WebSocket 连接时，旧连接将自动断开
+     *
+     *     ### 更新频率限制
+     *
+     *     如配置了设备的更新频率限制，超出频率的更新不会被拒绝，而是暂缓应用，    并与之后收到的更新合并（后收到的字段覆盖先收到的），在频率允许时作为一次更新应用，    此时返回的是合并的更新应用前的设备状态
+     *
+     *     ### 确认模式
+     *
+     *     可使用 `ack` 查询参数指定更新成功后返回的内容，WebSocket 连接时指定则对整个连接生效：
+     *
+     *     - `full`（默认）：返回更新后的完整设备状态
+     *     - `seq`：仅返回设备的更新序号（参见 DeviceInfoAck），每次更新后递增
+     *     - `none`：不返回内容，HTTP 请求将返回 `204 No Content`（新设备仍为 `201 Created`），WebSocket 连接将不再推送消息
+     *
+     *     WebSocket 连接消息体中也可以设置 `ack` 字段，覆盖连接的确认模式，仅对该条消息生效，    例如以 `seq` 模式连接后，在需要时发送 `{"ack": "full"}` 获取一次完整状态
      */
     patch: operations['__api_v1_device__device_key__info_patch']
     trace?: never
@@ -224,6 +395,18 @@ export interface paths {
 export type webhooks = Record<string, never>
 export interface components {
   schemas: {
+    /**
+     * AckMode
+     * @enum {string}
+     */
+    AckMode: 'none' | 'seq' | 'full'
+    /** ConfigReloadResult */
+    ConfigReloadResult: {
+      /** Applied */
+      applied: string[]
+      /** Restart Required */
+      restart_required: string[]
+    }
     /** DeviceBatteryStatus */
     DeviceBatteryStatus: {
       /** Percent */
@@ -309,6 +492,11 @@ export interface components {
       long_connection: boolean
       readonly status: components['schemas']['OnlineStatus']
     }
+    /** DeviceInfoAck */
+    DeviceInfoAck: {
+      /** Seq */
+      seq: number
+    }
     /** DeviceInfoFromClient */
     DeviceInfoFromClient: {
       /**
@@ -334,6 +522,15 @@ export interface components {
       idle: boolean
       data?: components['schemas']['DeviceData'] | null
     }
+    /** DeviceMemoryUsage */
+    DeviceMemoryUsage: {
+      /** Key */
+      key: string
+      /** Payload Size */
+      payload_size: number
+      /** Approx Memory */
+      approx_memory: number
+    }
     /**
      * DeviceType
      * @enum {string}
@@ -382,6 +579,61 @@ export interface components {
         [key: string]: components['schemas']['DeviceInfo']
       } | null
     }
+    /** LoopLagReport */
+    LoopLagReport: {
+      /** Enabled */
+      enabled: boolean
+      /** Interval */
+      interval: number
+      /** Threshold */
+      threshold: number
+      /** Lag */
+      lag: number
+      /** Mean Lag */
+      mean_lag: number
+      /** Max Lag */
+      max_lag: number
+      /** Max Lag Total */
+      max_lag_total: number
+      /** Ticks */
+      ticks: number
+      /** Slow Ticks */
+      slow_ticks: number
+      /** Stalls */
+      stalls: components['schemas']['LoopStall'][]
+    }
+    /** LoopStall */
+    LoopStall: {
+      /** Time */
+      time: number
+      /** Lag */
+      lag: number
+      /** Task */
+      task: string | null
+      /** Stack */
+      stack: string
+    }
+    /** MemoryReport */
+    MemoryReport: {
+      /** Peak Rss */
+      peak_rss: number | null
+      /** Devices */
+      devices: number
+      /** Devices Approx Memory */
+      devices_approx_memory: number
+      /** Top Devices */
+      top_devices: components['schemas']['DeviceMemoryUsage'][]
+      /** Device Connections */
+      device_connections: number
+      /** Viewers */
+      viewers: {
+        [key: string]: number
+      }
+      /** Event Log Entries */
+      event_log_entries: number
+      /** Event Log Size */
+      event_log_size: number
+    }
     /**
      * OnlineStatus
      * @enum {string}
@@ -396,6 +648,33 @@ export interface components {
        */
       success: true
     }
+    /**
+     * ProfileFormat
+     * @enum {string}
+     */
+    ProfileFormat: 'collapsed' | 'pstats'
+    /** TracemallocReport */
+    TracemallocReport: {
+      /** Traced Memory */
+      traced_memory: number
+      /** Peak Traced Memory */
+      peak_traced_memory: number
+      /** Stats */
+      stats: components['schemas']['TracemallocStat'][]
+    }
+    /** TracemallocStat */
+    TracemallocStat: {
+      /** Location */
+      location: string
+      /** Size */
+      size: number
+      /** Size Diff */
+      size_diff: number
+      /** Count */
+      count: number
+      /** Count Diff */
+      count_diff: number
+    }
   }
   responses: never
   parameters: never
@@ -405,6 +684,264 @@ export interface components {
 }
 export type $defs = Record<string, never>
 export interface operations {
+  __api_v1_admin_profile_get: {
+    parameters: {
+      query?: {
+        duration?: number
+        format?: components['schemas']['ProfileFormat']
+        interval?: number
+      }
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    requestBody?: never
+    responses: {
+      /** @description collapsed stacks 文本，或 pstats 文件 */
+      200: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'text/plain': string
+          'application/octet-stream': unknown
+        }
+      }
+      /** @description 鉴权失败 */
+      401: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'text/plain': components['schemas']['ErrDetail']
+        }
+      }
+      /** @description 已有性能分析正在进行 */
+      409: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'text/plain': components['schemas']['ErrDetail']
+        }
+      }
+      /** @description 请求参数解析失败 */
+      422: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'text/plain': components['schemas']['ErrDetail']
+        }
+      }
+    }
+  }
+  __api_v1_admin_loop_lag_get: {
+    parameters: {
+      query?: never
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    requestBody?: never
+    responses: {
+      /** @description Successful Response */
+      200: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['LoopLagReport']
+        }
+      }
+      /** @description 鉴权失败 */
+      401: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['ErrDetail']
+        }
+      }
+    }
+  }
+  __api_v1_admin_metrics_get: {
+    parameters: {
+      query?: never
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    requestBody?: never
+    responses: {
+      /** @description Successful Response */
+      200: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'text/plain': string
+        }
+      }
+      /** @description 鉴权失败 */
+      401: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'text/plain': components['schemas']['ErrDetail']
+        }
+      }
+    }
+  }
+  __api_v1_admin_config_reload_post: {
+    parameters: {
+      query?: never
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    requestBody?: never
+    responses: {
+      /** @description Successful Response */
+      200: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['ConfigReloadResult']
+        }
+      }
+      /** @description 鉴权失败 */
+      401: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['ErrDetail']
+        }
+      }
+      /** @description 配置文件加载失败，仍使用当前配置 */
+      422: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['ErrDetail']
+        }
+      }
+    }
+  }
+  __api_v1_admin_memory_get: {
+    parameters: {
+      query?: {
+        top?: number
+      }
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    requestBody?: never
+    responses: {
+      /** @description Successful Response */
+      200: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['MemoryReport']
+        }
+      }
+      /** @description 鉴权失败 */
+      401: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['ErrDetail']
+        }
+      }
+      /** @description 请求参数解析失败 */
+      422: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['ErrDetail']
+        }
+      }
+    }
+  }
+  __api_v1_admin_memory_tracemalloc_post: {
+    parameters: {
+      query?: {
+        top?: number
+        nframes?: number
+      }
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    requestBody?: never
+    responses: {
+      /** @description Successful Response */
+      200: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['TracemallocReport']
+        }
+      }
+      /** @description 鉴权失败 */
+      401: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['ErrDetail']
+        }
+      }
+      /** @description 请求参数解析失败 */
+      422: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['ErrDetail']
+        }
+      }
+    }
+  }
+  __api_v1_admin_memory_tracemalloc_delete: {
+    parameters: {
+      query?: never
+      header?: never
+      path?: never
+      cookie?: never
+    }
+    requestBody?: never
+    responses: {
+      /** @description Successful Response */
+      200: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['OpSuccess']
+        }
+      }
+      /** @description 鉴权失败 */
+      401: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['ErrDetail']
+        }
+      }
+    }
+  }
   __api_v1_get: {
     parameters: {
       query?: never
@@ -447,20 +984,48 @@ export interface operations {
   }
   __api_v1_info_get: {
     parameters: {
-      query?: never
-      header?: never
+      query?: {
+        since?: number | null
+        timeout?: number
+        cursor?: string | null
+        limit?: number | null
+        fields?: string[] | null
+        status?: components['schemas']['OnlineStatus'][] | null
+        device_type?: string[] | null
+        device_os?: string[] | null
+      }
+      header?: {
+        'last-event-id'?: string | null
+      }
       path?: never
       cookie?: never
     }
     requestBody?: never
     responses: {
-      /** @description Successful Response */
+      /** @description `Accept` 包含 `text/event-stream` 时为 SSE 流 */
       200: {
         headers: {
           [name: string]: unknown
         }
         content: {
           'application/json': components['schemas']['Info']
+          'text/event-stream': unknown
+        }
+      }
+      /** @description 状态未变化，或长轮询超时 */
+      304: {
+        headers: {
+          [name: string]: unknown
+        }
+        content?: never
+      }
+      /** @description 请求参数解析失败 */
+      422: {
+        headers: {
+          [name: string]: unknown
+        }
+        content: {
+          'application/json': components['schemas']['ErrDetail']
         }
       }
     }
@@ -580,7 +1145,9 @@ export interface operations {
   }
   __api_v1_device__device_key__info_put: {
     parameters: {
-      query?: never
+      query?: {
+        ack?: components['schemas']['AckMode']
+      }
       header?: never
       path: {
         device_key: string
@@ -593,16 +1160,18 @@ export interface operations {
       }
     }
     responses: {
-      /** @description Successful Response */
+      /** @description 更新成功，`ack` 为 `seq` 时返回 DeviceInfoAck */
       200: {
         headers: {
           [name: string]: unknown
         }
         content: {
-          'application/json': components['schemas']['DeviceInfo']
+          'application/json':
+            | components['schemas']['DeviceInfo']
+            | components['schemas']['DeviceInfoAck']
         }
       }
-      /** @description Created */
+      /** @description 已添加新设备 */
       201: {
         headers: {
           [name: string]: unknown
@@ -611,6 +1180,13 @@ export interface operations {
           'application/json': components['schemas']['DeviceInfo']
         }
       }
+      /** @description `ack` 为 `none` 时更新成功 */
+      204: {
+        headers: {
+          [name: string]: unknown
+        }
+        content?: never
+      }
       /** @description 新设备缺少设备初始配置 */
       400: {
         headers: {
@@ -700,7 +1276,9 @@ export interface operations {
   }
   __api_v1_device__device_key__info_patch: {
     parameters: {
-      query?: never
+      query?: {
+        ack?: components['schemas']['AckMode']
+      }
       header?: never
       path: {
         device_key: string
@@ -713,16 +1291,18 @@ export interface operations {
       }
     }
     responses: {
-      /** @description Successful Response */
+      /** @description 更新成功，`ack` 为 `seq` 时返回 DeviceInfoAck */
       200: {
         headers: {
           [name: string]: unknown
         }
         content: {
-          'application/json': components['schemas']['DeviceInfo']
+          'application/json':
+            | components['schemas']['DeviceInfo']
+            | components['schemas']['DeviceInfoAck']
         }
       }
-      /** @description Created */
+      /** @description 已添加新设备 */
       201: {
         headers: {
           [name: string]: unknown
@@ -731,6 +1311,13 @@ export interface operations {
           'application/json': components['schemas']['DeviceInfo']
         }
       }
+      /** @description `ack` 为 `none` 时更新成功 */
+      204: {
+        headers: {
+          [name: string]: unknown
+        }
+        content?: never
+      }
       /** @description 鉴权失败 */
       401: {
         headers: {
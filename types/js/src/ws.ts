@@ -1,25 +1,48 @@
-import type { DeviceInfo, DeviceInfoFromClient, Info } from './base'
+import type {
+  AckMode,
+  DeviceInfo,
+  DeviceInfoAck,
+  DeviceInfoFromClient,
+  Info,
+  OnlineStatus,
+} from './base'
 import type { StringOnly } from './utils'
 import { TypedEventTarget } from './utils'
 
-export type DeviceInfoFromClientWS = DeviceInfoFromClient & { replace?: boolean }
+export interface InfoEvent {
+  offset: number
+  status: OnlineStatus
+  devices?: Record<string, DeviceInfo | null> | null
+  snapshot?: boolean
+}
+export type DeviceInfoFromClientWS = DeviceInfoFromClient & {
+  replace?: boolean
+  ack?: AckMode
+}
 
 export interface ws {
   '/api/v1/info': {
     path: never
-    query: never
+    query: {
+      offset?: number
+      status?: OnlineStatus[]
+      device_type?: string[]
+      device_os?: string[]
+    }
     needAuth: false
     send: any
-    recv: Info
+    recv: Info | InfoEvent
   }
   '/api/v1/device/{device_key}/info': {
     path: {
       device_key: string
     }
-    query: never
+    query: {
+      ack?: AckMode
+    }
     needAuth: true
     send: DeviceInfoFromClientWS
-    recv: DeviceInfo
+    recv: DeviceInfo | DeviceInfoAck
   }
 }
 
@@ -75,7 +98,11 @@ export type WebSocketClientEvents<M> = {
 export type WSCPathOptions<K extends WsPath> =
   WsPathParams<K> extends never ? {} : { path: WsPathParams<K> }
 export type WSCQueryOptions<K extends WsPath> =
-  WsQueryParams<K> extends never ? {} : { query: WsQueryParams<K> }
+  WsQueryParams<K> extends never
+    ? {}
+    : {} extends WsQueryParams<K>
+      ? { query?: WsQueryParams<K> }
+      : { query: WsQueryParams<K> }
 export type WSCParamOptions<K extends WsPath> = WSCPathOptions<K> & WSCQueryOptions<K>
 
 export interface WSOptionsCommon {
@@ -117,15 +144,19 @@ export class WebSocketClient<P extends WsPath> extends TypedEventTarget<
     }
 
     let url = `${this.$baseUrl.replace(/\/+$/, '')}${path}`
-    if ('query' in this.$options) {
+    if ('query' in this.$options && this.$options.query) {
       const params = Object.entries(this.$options.query)
-        .map(
-          ([key, value]) =>
-            `${encodeURIComponent(key)}=${encodeURIComponent(`${value}`)}`,
+        .filter(([, value]) => value !== undefined && value !== null)
+        .flatMap(([key, value]) =>
+          (Array.isArray(value) ? value : [value]).map(
+            (v) => `${encodeURIComponent(key)}=${encodeURIComponent(`${v}`)}`,
+          ),
         )
         .join('&')
-      const hasAnd = url.includes('?')
-      url += `${hasAnd ? '&' : '?'}${params}`
+      if (params) {
+        const hasAnd = url.includes('?')
+        url += `${hasAnd ? '&' : '?'}${params}`
+      }
     }
     return url
   }
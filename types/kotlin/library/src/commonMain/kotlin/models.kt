@@ -44,6 +44,13 @@ enum class OnlineStatus(val value: String) {
   @SerialName("unknown") UNKNOWN("unknown"),
 }
 
+@Serializable
+enum class AckMode(val value: String) {
+  @SerialName("none") NONE("none"),
+  @SerialName("seq") SEQ("seq"),
+  @SerialName("full") FULL("full"),
+}
+
 @Serializable
 data class ErrDetail(
   var type: String? = null,
@@ -127,8 +134,11 @@ data class DeviceInfoFromClientWS(
   var idle: Boolean = false,
   var data: DeviceData? = null,
   var replace: Boolean = false,
+  var ack: AckMode? = null,
 )
 
+@Serializable data class DeviceInfoAck(var seq: Long)
+
 @Serializable
 data class DeviceInfo(
   var name: String = "Unnamed Device",
@@ -146,3 +156,11 @@ data class DeviceInfo(
 
 @Serializable
 data class Info(var status: OnlineStatus, var devices: Map<String, DeviceInfo>? = null)
+
+@Serializable
+data class InfoEvent(
+  var offset: Long,
+  var status: OnlineStatus,
+  var devices: Map<String, DeviceInfo?>? = null,
+  var snapshot: Boolean = false,
+)
@@ -2,6 +2,10 @@ from .api import (
     APIError as APIError,
     AsyncHttpApiClient as AsyncHttpApiClient,
     BaseHttpApiClient as BaseHttpApiClient,
+    InfoSubscriber as InfoSubscriber,
+    ResponseCache as ResponseCache,
+    RetryBudget as RetryBudget,
+    RetryPolicy as RetryPolicy,
     SyncHttpApiClient as SyncHttpApiClient,
 )
 from .config import (
@@ -9,10 +13,12 @@ from .config import (
     Config as Config,
     CORSConfig as CORSConfig,
     DeviceConfig as DeviceConfig,
+    DeviceServerConfig as DeviceServerConfig,
     FrontendConfig as FrontendConfig,
     FrontendStatusConfig as FrontendStatusConfig,
 )
 from .enums import (
+    AckMode as AckMode,
     DeviceType as DeviceType,
     OnlineStatus as OnlineStatus,
 )
@@ -21,10 +27,12 @@ from .models import (
     DeviceCurrentApp as DeviceCurrentApp,
     DeviceData as DeviceData,
     DeviceInfo as DeviceInfo,
+    DeviceInfoAck as DeviceInfoAck,
     DeviceInfoFromClient as DeviceInfoFromClient,
     DeviceInfoFromClientWS as DeviceInfoFromClientWS,
     ErrDetail as ErrDetail,
     Info as Info,
+    InfoEvent as InfoEvent,
     OpSuccess as OpSuccess,
     WSErr as WSErr,
 )
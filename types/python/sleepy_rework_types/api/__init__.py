@@ -1,6 +1,18 @@
+from .cache import (
+    ResponseCache as ResponseCache,
+)
+from .client import (
+    AsyncHttpApiClient as AsyncHttpApiClient,
+    SyncHttpApiClient as SyncHttpApiClient,
+)
 from .http import (
     APIError as APIError,
-    AsyncHttpApiClient as AsyncHttpApiClient,
     BaseHttpApiClient as BaseHttpApiClient,
-    SyncHttpApiClient as SyncHttpApiClient,
+)
+from .retry import (
+    RetryBudget as RetryBudget,
+    RetryPolicy as RetryPolicy,
+)
+from .ws import (
+    InfoSubscriber as InfoSubscriber,
 )
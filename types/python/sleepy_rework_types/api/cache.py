@@ -0,0 +1,97 @@
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+
+from httpx import Response
+
+type CacheKey = tuple[str, str, tuple[tuple[str, str], ...]]
+
+
+def make_cache_key(
+    method: str,
+    endpoint: str,
+    query_params: dict[str, Any] | None,
+) -> CacheKey:
+    query = (
+        tuple(sorted((k, str(v)) for k, v in query_params.items() if v is not None))
+        if query_params
+        else ()
+    )
+    return (method, endpoint, query)
+
+
+@dataclass
+class CacheEntry:
+    value: Any
+    etag: str | None
+    last_modified: str | None
+    expires_at: float
+
+    @property
+    def conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    Validated responses of GET requests, revalidated with conditional headers.
+
+    Entries are dropped `ttl` seconds after they were last stored or revalidated,
+    and the least recently used ones go first when there are more than `max_size`.
+
+    Cached models are shared between calls, don't mutate them.
+    """
+
+    def __init__(self, ttl: float = 300, max_size: int = 128):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[CacheKey, CacheEntry] = OrderedDict()
+
+        self.hits = 0
+        """Requests answered with `304 Not Modified`"""
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: CacheKey) -> CacheEntry | None:
+        entry = self._entries.get(key)
+        if not entry:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def store(self, key: CacheKey, resp: Response, value: Any):
+        self.misses += 1
+        etag = resp.headers.get("ETag")
+        last_modified = resp.headers.get("Last-Modified")
+        if not (etag or last_modified):
+            self._entries.pop(key, None)
+            return
+
+        self._entries[key] = CacheEntry(
+            value=value,
+            etag=etag,
+            last_modified=last_modified,
+            expires_at=time.monotonic() + self.ttl,
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def revalidated(self, entry: CacheEntry) -> Any:
+        self.hits += 1
+        entry.expires_at = time.monotonic() + self.ttl
+        return entry.value
+
+    def clear(self):
+        self._entries.clear()
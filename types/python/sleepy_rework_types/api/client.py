@@ -0,0 +1,131 @@
+import asyncio
+import time
+from types import TracebackType
+from typing import Any, Self, override
+
+from httpx import AsyncClient, Client, TransportError
+
+from .http import RespValidator
+from .types import AsyncHttpApi, SyncHttpApi
+
+
+class SyncHttpApiClient(SyncHttpApi):
+    @override
+    def __post_init__(self):
+        super().__post_init__()
+        self._client: Client | None = None
+
+    def get_client(self) -> Client:
+        if not self._client:
+            self._client = Client(**self.client_kwargs)
+        return self._client
+
+    def __enter__(self) -> Self:
+        self.get_client().__enter__()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        cli = self.get_client()
+        self._client = None
+        return cli.__exit__(exc_type, exc_value, traceback)
+
+    @override
+    def request(
+        self,
+        method: str,
+        endpoint: str,
+        query_params: dict[str, Any] | None,
+        body: Any,
+        validate: RespValidator | None,
+    ) -> Any:
+        cache_key, cache_entry = self.get_cache_entry(method, endpoint, query_params)
+        headers = cache_entry.conditional_headers if cache_entry else None
+        client = self.get_client()
+        if self.retry:
+            self.retry.record_request()
+
+        attempt = 0
+        while True:
+            try:
+                resp = client.request(
+                    method,
+                    endpoint,
+                    params=query_params,
+                    json=body,
+                    headers=headers,
+                )
+            except TransportError as e:
+                if (delay := self.get_retry_delay(method, attempt, exc=e)) is None:
+                    raise
+            else:
+                if (delay := self.get_retry_delay(method, attempt, resp)) is None:
+                    return self.handle_resp(resp, validate, cache_key, cache_entry)
+                resp.close()
+            time.sleep(delay)
+            attempt += 1
+
+
+class AsyncHttpApiClient(AsyncHttpApi):
+    @override
+    def __post_init__(self):
+        super().__post_init__()
+        self._client: AsyncClient | None = None
+
+    def get_client(self) -> AsyncClient:
+        if not self._client:
+            self._client = AsyncClient(**self.client_kwargs)
+        return self._client
+
+    async def __aenter__(self) -> Self:
+        await self.get_client().__aenter__()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        cli = self.get_client()
+        self._client = None
+        return await cli.__aexit__(exc_type, exc_value, traceback)
+
+    @override
+    async def request(
+        self,
+        method: str,
+        endpoint: str,
+        query_params: dict[str, Any] | None,
+        body: Any,
+        validate: RespValidator | None,
+    ) -> Any:
+        cache_key, cache_entry = self.get_cache_entry(method, endpoint, query_params)
+        headers = cache_entry.conditional_headers if cache_entry else None
+        client = self.get_client()
+        if self.retry:
+            self.retry.record_request()
+
+        attempt = 0
+        while True:
+            try:
+                resp = await client.request(
+                    method,
+                    endpoint,
+                    params=query_params,
+                    json=body,
+                    headers=headers,
+                )
+            except TransportError as e:
+                if (delay := self.get_retry_delay(method, attempt, exc=e)) is None:
+                    raise
+            else:
+                if (delay := self.get_retry_delay(method, attempt, resp)) is None:
+                    return self.handle_resp(resp, validate, cache_key, cache_entry)
+                await resp.aclose()
+            await asyncio.sleep(delay)
+            attempt += 1
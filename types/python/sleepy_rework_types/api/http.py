@@ -1,17 +1,21 @@
 from abc import ABC, abstractmethod
 from collections.abc import Callable
 from dataclasses import dataclass, field
-from functools import cached_property, partial
-from types import EllipsisType, TracebackType
-from typing import Any, Never, Self, override
+from functools import cached_property
+from types import EllipsisType
+from typing import Any, Never
 
-from httpx import AsyncClient, Client, HTTPStatusError, Response
+from httpx import HTTPStatusError, Limits, Response, TransportError
 from httpx._client import USER_AGENT as UA_BASE
 from pydantic import BaseModel
 
 from ..config import DeviceConfig, FrontendConfig
-from ..models import DeviceInfo, ErrDetail, Info, OpSuccess
-from .types import AsyncHttpApi, SyncHttpApi
+from ..enums import AckMode
+from ..models import DeviceInfo, DeviceInfoAck, ErrDetail, Info, OpSuccess
+from .cache import CacheEntry, CacheKey, ResponseCache, make_cache_key
+from .retry import RetryPolicy
+
+type RespValidator = Callable[[Response], Any]
 
 
 @dataclass
@@ -33,6 +37,8 @@ class BodyInfo:
 class ResponseInfo:
     model: type[BaseModel] | type[str] | type[bytes]
     type_anno: str
+    # for replies `model` alone doesn't describe, imported by name in types.py
+    validator: RespValidator | None = None
 
 
 @dataclass
@@ -44,6 +50,55 @@ class HttpApiInfo:
     body: BodyInfo | None = None  # model is ignored
     response: ResponseInfo | None = None  # default is ignored
 
+    @cached_property
+    def resp_validator(self) -> RespValidator | None:
+        # built once, model validators are not free to create
+        return make_resp_validator(self.response)
+
+
+def text_resp_validator(resp: Response) -> str:
+    return resp.text
+
+
+def bytes_resp_validator(resp: Response) -> bytes:
+    return resp.content
+
+
+def model_resp_validator[M: BaseModel](model: type[M]) -> Callable[[Response], M]:
+    # skip the `model_validate_json` classmethod wrapper on every call
+    validate_json = model.__pydantic_validator__.validate_json
+
+    def validator(resp: Response) -> M:
+        return validate_json(resp.content)
+
+    return validator
+
+
+_validate_device_info = model_resp_validator(DeviceInfo)
+_validate_device_info_ack = model_resp_validator(DeviceInfoAck)
+
+
+def ack_resp_validator(resp: Response) -> DeviceInfo | DeviceInfoAck | None:
+    """Reply to a device info update, told apart by the `ack` mode it asked for"""
+    ack = resp.request.url.params.get("ack", AckMode.FULL)
+    if ack == AckMode.NONE:
+        return None
+    if ack == AckMode.SEQ:
+        return _validate_device_info_ack(resp)
+    return _validate_device_info(resp)
+
+
+def make_resp_validator(info: ResponseInfo | None) -> RespValidator | None:
+    if not info:
+        return None
+    if info.validator:
+        return info.validator
+    if issubclass(info.model, str):
+        return text_resp_validator
+    if issubclass(info.model, bytes):
+        return bytes_resp_validator
+    return model_resp_validator(info.model)
+
 
 HTTP_APIS: dict[str, HttpApiInfo] = {
     "test_alive": HttpApiInfo(
@@ -110,6 +165,14 @@ HTTP_APIS: dict[str, HttpApiInfo] = {
                 type_anno="str",
             ),
         },
+        query_params={
+            "ack": ParamInfo(
+                name="ack",
+                type_anno="m.AckMode",
+                default=AckMode.FULL,
+                default_type_anno="AckMode.FULL",
+            ),
+        },
         body=BodyInfo(
             type_anno="m.DeviceInfoFromClient | None",
             default=None,
@@ -117,7 +180,8 @@ HTTP_APIS: dict[str, HttpApiInfo] = {
         ),
         response=ResponseInfo(
             model=DeviceInfo,
-            type_anno="m.DeviceInfo",
+            type_anno="m.DeviceInfo | m.DeviceInfoAck | None",
+            validator=ack_resp_validator,
         ),
     ),
     "put_device_info": HttpApiInfo(
@@ -129,6 +193,14 @@ HTTP_APIS: dict[str, HttpApiInfo] = {
                 type_anno="str",
             ),
         },
+        query_params={
+            "ack": ParamInfo(
+                name="ack",
+                type_anno="m.AckMode",
+                default=AckMode.FULL,
+                default_type_anno="AckMode.FULL",
+            ),
+        },
         body=BodyInfo(
             type_anno="m.DeviceInfoFromClient | None",
             default=None,
@@ -136,7 +208,8 @@ HTTP_APIS: dict[str, HttpApiInfo] = {
         ),
         response=ResponseInfo(
             model=DeviceInfo,
-            type_anno="m.DeviceInfo",
+            type_anno="m.DeviceInfo | m.DeviceInfoAck | None",
+            validator=ack_resp_validator,
         ),
     ),
     "delete_device_info": HttpApiInfo(
@@ -156,6 +229,12 @@ HTTP_APIS: dict[str, HttpApiInfo] = {
 }
 
 
+def dump_body(obj: Any) -> Any:
+    if obj and isinstance(obj, BaseModel):
+        return obj.model_dump()
+    return obj
+
+
 class APIError(Exception):
     def __init__(self, status: int, detail: ErrDetail) -> None:
         super().__init__()
@@ -177,11 +256,31 @@ class BaseHttpApiClient(ABC):
         base_url: str,
         secret: str | None = None,
         app_ua: str | None = None,
+        cache: ResponseCache | None = None,
+        retry: RetryPolicy | None = None,
+        http2: bool = True,
+        max_connections: int | None = 100,
+        max_keepalive_connections: int | None = 20,
+        keepalive_expiry: float | None = 5,
+        timeout: float | None = 5,
         **kwargs: Any,
     ):
+        """
+        With `http2`, requests to an HTTPS server are multiplexed over one connection,
+        the pool settings mostly matter for HTTP/1.1.
+        """
         self.base_url = base_url
         self.secret = secret
         self.app_ua = app_ua
+        self.cache = cache
+        self.retry = retry
+        self.http2 = http2
+        self.limits = Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = timeout
         self.__post_init__(**kwargs)
 
     def __post_init__(self, **kwargs: Any):
@@ -211,11 +310,7 @@ class BaseHttpApiClient(ABC):
             raise ValueError("This API does not accept body arguments")
         else:
             obj = None
-
-        if obj and isinstance(obj, BaseModel):
-            obj = obj.model_dump()
-
-        return obj
+        return dump_body(obj)
 
     @cached_property
     def headers(self) -> dict[str, str]:
@@ -228,29 +323,73 @@ class BaseHttpApiClient(ABC):
             headers["User-Agent"] = f"{self.app_ua} {headers['User-Agent']}"
         return headers
 
+    @property
+    def client_kwargs(self) -> dict[str, Any]:
+        return {
+            "base_url": self.base_url,
+            "headers": self.headers,
+            "follow_redirects": True,
+            "http2": self.http2,
+            "limits": self.limits,
+            "timeout": self.timeout,
+        }
+
     def handle_status_err(self, e: HTTPStatusError) -> Never:
         raise APIError(
             e.response.status_code,
             ErrDetail.model_validate_json(e.response.content),
         ) from e
 
-    def validate_resp(self, resp: Response, info: ResponseInfo | None):
-        if not info:
+    def get_cache_entry(
+        self,
+        method: str,
+        endpoint: str,
+        query_params: dict[str, Any] | None,
+    ) -> tuple[CacheKey | None, CacheEntry | None]:
+        if (self.cache is None) or (method != "GET"):
+            return None, None
+        key = make_cache_key(method, endpoint, query_params)
+        return key, self.cache.get(key)
+
+    def get_retry_delay(
+        self,
+        method: str,
+        attempt: int,
+        resp: Response | None = None,
+        exc: TransportError | None = None,
+    ) -> float | None:
+        if not self.retry:
             return None
-        if issubclass(info.model, str):
-            return resp.text
-        if issubclass(info.model, bytes):
-            return resp.content
-        return info.model.model_validate_json(resp.content)
+        return self.retry.get_retry_delay(method, attempt, resp, exc)
+
+    def handle_resp(
+        self,
+        resp: Response,
+        validate: RespValidator | None,
+        cache_key: CacheKey | None = None,
+        cache_entry: CacheEntry | None = None,
+    ) -> Any:
+        if (self.cache is not None) and cache_entry and resp.status_code == 304:
+            return self.cache.revalidated(cache_entry)
+
+        try:
+            resp.raise_for_status()
+        except HTTPStatusError as e:
+            self.handle_status_err(e)
+
+        value = validate(resp) if validate else None
+        if (self.cache is not None) and cache_key:
+            self.cache.store(cache_key, resp, value)
+        return value
 
     @abstractmethod
     def request(
         self,
         method: str,
         endpoint: str,
-        query_params: dict[str, Any],
+        query_params: dict[str, Any] | None,
         body: Any,
-        resp_info: ResponseInfo | None,
+        validate: RespValidator | None,
     ) -> Any: ...
 
     def request_from_info(
@@ -259,6 +398,10 @@ class BaseHttpApiClient(ABC):
         *args: Any,
         **kwargs: Any,
     ) -> Any:
+        """
+        Call an API described by `HttpApiInfo` at runtime,
+        the generated methods should be preferred for known APIs.
+        """
         endpoint = api_info.endpoint
         path_params = self.collect_params(api_info.path_params, kwargs)
         endpoint = endpoint.format(**path_params)
@@ -271,113 +414,5 @@ class BaseHttpApiClient(ABC):
             endpoint=endpoint,
             query_params=query_params,
             body=body,
-            resp_info=api_info.response,
+            validate=api_info.resp_validator,
         )
-
-    def __getattr__(self, name: str, /) -> Callable[..., Any]:
-        if name.startswith("_") or not (api_info := HTTP_APIS.get(name)):
-            return super().__getattribute__(name)
-        return partial(self.request_from_info, api_info)
-
-
-class SyncHttpApiClient(BaseHttpApiClient, SyncHttpApi):
-    @override
-    def __post_init__(self):
-        super().__post_init__()
-        self._client: Client | None = None
-
-    def get_client(self) -> Client:
-        if not self._client:
-            self._client = Client(
-                base_url=self.base_url,
-                headers=self.headers,
-                follow_redirects=True,
-                http2=True,
-            )
-        return self._client
-
-    def __enter__(self) -> Self:
-        self.get_client().__enter__()
-        return self
-
-    def __exit__(
-        self,
-        exc_type: type[BaseException] | None,
-        exc_value: BaseException | None,
-        traceback: TracebackType | None,
-    ) -> None:
-        cli = self.get_client()
-        self._client = None
-        return cli.__exit__(exc_type, exc_value, traceback)
-
-    @override
-    def request(
-        self,
-        method: str,
-        endpoint: str,
-        query_params: dict[str, Any],
-        body: Any,
-        resp_info: ResponseInfo | None,
-    ) -> Any:
-        try:
-            resp = (
-                self.get_client()
-                .request(method, endpoint, params=query_params, json=body)
-                .raise_for_status()
-            )
-        except HTTPStatusError as e:
-            self.handle_status_err(e)
-        return self.validate_resp(resp, resp_info)
-
-
-class AsyncHttpApiClient(BaseHttpApiClient, AsyncHttpApi):
-    @override
-    def __post_init__(self):
-        super().__post_init__()
-        self._client: AsyncClient | None = None
-
-    def get_client(self) -> AsyncClient:
-        if not self._client:
-            self._client = AsyncClient(
-                base_url=self.base_url,
-                headers=self.headers,
-                follow_redirects=True,
-                http2=True,
-            )
-        return self._client
-
-    async def __aenter__(self) -> Self:
-        await self.get_client().__aenter__()
-        return self
-
-    async def __aexit__(
-        self,
-        exc_type: type[BaseException] | None,
-        exc_value: BaseException | None,
-        traceback: TracebackType | None,
-    ) -> None:
-        cli = self.get_client()
-        self._client = None
-        return await cli.__aexit__(exc_type, exc_value, traceback)
-
-    @override
-    async def request(
-        self,
-        method: str,
-        endpoint: str,
-        query_params: dict[str, Any],
-        body: Any,
-        resp_info: ResponseInfo | None,
-    ) -> Any:
-        try:
-            resp = (
-                await self.get_client().request(
-                    method,
-                    endpoint,
-                    params=query_params,
-                    json=body,
-                )
-            ).raise_for_status()
-        except HTTPStatusError as e:
-            self.handle_status_err(e)
-        return self.validate_resp(resp, resp_info)
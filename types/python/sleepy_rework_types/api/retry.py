@@ -0,0 +1,128 @@
+import random
+import time
+from dataclasses import dataclass, field
+
+from httpx import ConnectError, ConnectTimeout, PoolTimeout, Response, TransportError
+
+# RFC 9110 section 9.2.2
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# the request never reached the server, retrying is safe for any method
+UNSENT_ERRORS = (ConnectError, ConnectTimeout, PoolTimeout)
+
+
+class RetryBudget:
+    """
+    Caps retries to a fraction of the request volume, so a struggling server
+    isn't hit with a multiple of the normal load.
+
+    Every request deposits `ratio` tokens, every retry withdraws one, and
+    `min_per_sec` tokens are added over time so low traffic can still retry.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.2,
+        min_per_sec: float = 10,
+        max_tokens: float = 100,
+    ):
+        self.ratio = ratio
+        self.min_per_sec = min_per_sec
+        self.max_tokens = max_tokens
+
+        self._tokens = min(min_per_sec, max_tokens)
+        self._last_refill = time.monotonic()
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(
+            self._tokens + (now - self._last_refill) * self.min_per_sec,
+            self.max_tokens,
+        )
+        self._last_refill = now
+
+    def deposit(self):
+        self._tokens = min(self._tokens + self.ratio, self.max_tokens)
+
+    def withdraw(self) -> bool:
+        self._refill()
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Retries transient failures with full-jitter exponential backoff.
+
+    Responses with `retry_statuses` and errors after the request was sent are only
+    retried for `idempotent_methods`. `PATCH /device/{key}/info` is a deep merge,
+    so adding `PATCH` there is safe for this API if you want those retried too.
+    """
+
+    max_attempts: int = 3
+    backoff_base: float = 0.1
+    backoff_max: float = 2
+    max_retry_after: float = 10
+    retry_statuses: frozenset[int] = RETRY_STATUSES
+    idempotent_methods: frozenset[str] = IDEMPOTENT_METHODS
+    budget: RetryBudget = field(default_factory=RetryBudget)
+
+    retries: int = field(default=0, init=False)
+    budget_exhausted: int = field(default=0, init=False)
+
+    def record_request(self):
+        self.budget.deposit()
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(  # noqa: S311
+            0,
+            min(self.backoff_max, self.backoff_base * (2**attempt)),
+        )
+
+    def get_retry_delay(
+        self,
+        method: str,
+        attempt: int,
+        resp: Response | None = None,
+        exc: TransportError | None = None,
+    ) -> float | None:
+        """
+        Returns seconds to wait before the next attempt,
+        or `None` if the result of attempt `attempt` (0-based) should be kept.
+        """
+        if attempt + 1 >= self.max_attempts:
+            return None
+
+        delay = self.backoff(attempt)
+        if exc is not None:
+            if not (
+                isinstance(exc, UNSENT_ERRORS) or method in self.idempotent_methods
+            ):
+                return None
+        elif resp is not None:
+            if (resp.status_code not in self.retry_statuses) or (
+                method not in self.idempotent_methods
+            ):
+                return None
+            retry_after = resp.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                if int(retry_after) > self.max_retry_after:
+                    return None
+                delay = max(delay, int(retry_after))
+        else:
+            return None
+
+        if not self.budget.withdraw():
+            self.budget_exhausted += 1
+            return None
+        self.retries += 1
+        return delay
@@ -1,4 +1,220 @@
-class SyncHttpApi: ...
+# generated by scripts/gen_py_api_type_anno.py, do not edit
+from __future__ import annotations
 
+import typing as t
 
-class AsyncHttpApi: ...
+from ..config import DeviceConfig, FrontendConfig
+from ..enums import AckMode
+from ..models import Info, OpSuccess
+from .http import (
+    BaseHttpApiClient,
+    ack_resp_validator,
+    dump_body,
+    model_resp_validator,
+    text_resp_validator,
+)
+
+if t.TYPE_CHECKING:
+    import sleepy_rework_types as m
+
+# pre-bound once at import time, not looked up per call
+_validate_device_config = model_resp_validator(DeviceConfig)
+_validate_frontend_config = model_resp_validator(FrontendConfig)
+_validate_info = model_resp_validator(Info)
+_validate_op_success = model_resp_validator(OpSuccess)
+
+
+class SyncHttpApi(BaseHttpApiClient):
+    def test_alive(self) -> str:
+        return self.request(
+            "GET",
+            "/api/v1",
+            None,
+            None,
+            text_resp_validator,
+        )
+
+    def get_frontend_config(self) -> m.FrontendConfig:
+        return self.request(
+            "GET",
+            "/api/v1/config/frontend",
+            None,
+            None,
+            _validate_frontend_config,
+        )
+
+    def get_info(self) -> m.Info:
+        return self.request(
+            "GET",
+            "/api/v1/info",
+            None,
+            None,
+            _validate_info,
+        )
+
+    def get_device_config(self, *, device_key: str) -> m.DeviceConfig:
+        return self.request(
+            "GET",
+            f"/api/v1/device/{device_key}/config",
+            None,
+            None,
+            _validate_device_config,
+        )
+
+    def put_device_config(
+        self,
+        body: m.DeviceConfig,
+        /,
+        *,
+        device_key: str,
+    ) -> m.OpSuccess:
+        return self.request(
+            "PUT",
+            f"/api/v1/device/{device_key}/config",
+            None,
+            dump_body(body),
+            _validate_op_success,
+        )
+
+    def patch_device_info(
+        self,
+        body: m.DeviceInfoFromClient | None = None,
+        /,
+        *,
+        device_key: str,
+        ack: m.AckMode = AckMode.FULL,
+    ) -> m.DeviceInfo | m.DeviceInfoAck | None:
+        return self.request(
+            "PATCH",
+            f"/api/v1/device/{device_key}/info",
+            {"ack": ack},
+            dump_body(body),
+            ack_resp_validator,
+        )
+
+    def put_device_info(
+        self,
+        body: m.DeviceInfoFromClient | None = None,
+        /,
+        *,
+        device_key: str,
+        ack: m.AckMode = AckMode.FULL,
+    ) -> m.DeviceInfo | m.DeviceInfoAck | None:
+        return self.request(
+            "PUT",
+            f"/api/v1/device/{device_key}/info",
+            {"ack": ack},
+            dump_body(body),
+            ack_resp_validator,
+        )
+
+    def delete_device_info(self, *, device_key: str) -> m.OpSuccess:
+        return self.request(
+            "DELETE",
+            f"/api/v1/device/{device_key}/info",
+            None,
+            None,
+            _validate_op_success,
+        )
+
+
+class AsyncHttpApi(BaseHttpApiClient):
+    def test_alive(self) -> t.Coroutine[t.Any, t.Any, str]:
+        return self.request(
+            "GET",
+            "/api/v1",
+            None,
+            None,
+            text_resp_validator,
+        )
+
+    def get_frontend_config(self) -> t.Coroutine[t.Any, t.Any, m.FrontendConfig]:
+        return self.request(
+            "GET",
+            "/api/v1/config/frontend",
+            None,
+            None,
+            _validate_frontend_config,
+        )
+
+    def get_info(self) -> t.Coroutine[t.Any, t.Any, m.Info]:
+        return self.request(
+            "GET",
+            "/api/v1/info",
+            None,
+            None,
+            _validate_info,
+        )
+
+    def get_device_config(
+        self,
+        *,
+        device_key: str,
+    ) -> t.Coroutine[t.Any, t.Any, m.DeviceConfig]:
+        return self.request(
+            "GET",
+            f"/api/v1/device/{device_key}/config",
+            None,
+            None,
+            _validate_device_config,
+        )
+
+    def put_device_config(
+        self,
+        body: m.DeviceConfig,
+        /,
+        *,
+        device_key: str,
+    ) -> t.Coroutine[t.Any, t.Any, m.OpSuccess]:
+        return self.request(
+            "PUT",
+            f"/api/v1/device/{device_key}/config",
+            None,
+            dump_body(body),
+            _validate_op_success,
+        )
+
+    def patch_device_info(
+        self,
+        body: m.DeviceInfoFromClient | None = None,
+        /,
+        *,
+        device_key: str,
+        ack: m.AckMode = AckMode.FULL,
+    ) -> t.Coroutine[t.Any, t.Any, m.DeviceInfo | m.DeviceInfoAck | None]:
+        return self.request(
+            "PATCH",
+            f"/api/v1/device/{device_key}/info",
+            {"ack": ack},
+            dump_body(body),
+            ack_resp_validator,
+        )
+
+    def put_device_info(
+        self,
+        body: m.DeviceInfoFromClient | None = None,
+        /,
+        *,
+        device_key: str,
+        ack: m.AckMode = AckMode.FULL,
+    ) -> t.Coroutine[t.Any, t.Any, m.DeviceInfo | m.DeviceInfoAck | None]:
+        return self.request(
+            "PUT",
+            f"/api/v1/device/{device_key}/info",
+            {"ack": ack},
+            dump_body(body),
+            ack_resp_validator,
+        )
+
+    def delete_device_info(
+        self,
+        *,
+        device_key: str,
+    ) -> t.Coroutine[t.Any, t.Any, m.OpSuccess]:
+        return self.request(
+            "DELETE",
+            f"/api/v1/device/{device_key}/info",
+            None,
+            None,
+            _validate_op_success,
+        )
@@ -0,0 +1,281 @@
+import asyncio
+import inspect
+import random
+from collections.abc import Awaitable, Callable
+from contextlib import suppress
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Self
+
+from httpx._client import USER_AGENT as UA_BASE
+
+from ..enums import OnlineStatus
+from ..models import DeviceInfo, Info, InfoEvent
+
+if TYPE_CHECKING:
+    from websockets.asyncio.client import ClientConnection
+
+type MaybeAwaitable = Awaitable[Any] | Any
+type SyncCallback = Callable[[Info], MaybeAwaitable]
+type StatusChangeCallback = Callable[[OnlineStatus, OnlineStatus], MaybeAwaitable]
+type DeviceCallback = Callable[[str, DeviceInfo], MaybeAwaitable]
+type DeviceUpdateCallback = Callable[[str, DeviceInfo, DeviceInfo], MaybeAwaitable]
+type DisconnectCallback = Callable[[Exception], MaybeAwaitable]
+
+_validate_event = InfoEvent.__pydantic_validator__.validate_json
+
+
+class InfoSubscriber:
+    """
+    Keeps an in-memory replica of `Info` synced from the `/api/v1/info` WebSocket.
+
+    The server pushes the changed devices of every update, and a reconnect resumes
+    from the last received offset, so only the missed changes are replayed
+    (or a full snapshot, if they are no longer kept by the server).
+    The difference each message makes is dispatched to the registered callbacks.
+
+    Reads (`info`, `status`, `devices`, `get_device`) are plain attribute lookups.
+
+    Requires the `ws` extra (`websockets`).
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        app_ua: str | None = None,
+        reconnect_delay: float = 1,
+        max_reconnect_delay: float = 30,
+        **connect_kwargs: Any,
+    ):
+        self.base_url = base_url
+        self.app_ua = app_ua
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connect_kwargs = connect_kwargs
+
+        self._info: Info | None = None
+        self._offset = 0
+        self._devices: dict[str, DeviceInfo] = {}
+        self._synced = asyncio.Event()
+        self._ws: ClientConnection | None = None
+        self._task: asyncio.Task | None = None
+
+        self._sync_callbacks: list[SyncCallback] = []
+        self._status_change_callbacks: list[StatusChangeCallback] = []
+        self._device_add_callbacks: list[DeviceCallback] = []
+        self._device_update_callbacks: list[DeviceUpdateCallback] = []
+        self._device_remove_callbacks: list[DeviceCallback] = []
+        self._disconnect_callbacks: list[DisconnectCallback] = []
+
+    @property
+    def url(self) -> str:
+        base = self.base_url.replace("http", "ws", 1).rstrip("/")
+        return f"{base}/api/v1/info?offset={self._offset}"
+
+    @property
+    def headers(self) -> dict[str, str]:
+        from .. import __version__
+
+        ua = f"{UA_BASE} sleepy-rework-types/{__version__}"
+        if self.app_ua:
+            ua = f"{self.app_ua} {ua}"
+        return {"User-Agent": ua}
+
+    # region replica
+
+    @property
+    def info(self) -> Info | None:
+        """Last received snapshot, kept (but possibly stale) while reconnecting."""
+        return self._info
+
+    @property
+    def status(self) -> OnlineStatus | None:
+        return self._info.status if self._info else None
+
+    @property
+    def devices(self) -> dict[str, DeviceInfo]:
+        """Empty when the server is in privacy mode."""
+        return self._devices
+
+    def get_device(self, key: str) -> DeviceInfo | None:
+        return self._devices.get(key)
+
+    @property
+    def offset(self) -> int:
+        """Offset of the last applied event, `0` before the first one"""
+        return self._offset
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    @property
+    def synced(self) -> bool:
+        """Whether the replica reflects the current connection."""
+        return self._synced.is_set()
+
+    async def wait_synced(self) -> Info:
+        await self._synced.wait()
+        assert self._info
+        return self._info
+
+    # endregion
+
+    # region callbacks
+
+    def on_sync(self, func: SyncCallback) -> SyncCallback:
+        """Called after every applied snapshot, with the new `Info`."""
+        self._sync_callbacks.append(func)
+        return func
+
+    def on_status_change(self, func: StatusChangeCallback) -> StatusChangeCallback:
+        self._status_change_callbacks.append(func)
+        return func
+
+    def on_device_add(self, func: DeviceCallback) -> DeviceCallback:
+        self._device_add_callbacks.append(func)
+        return func
+
+    def on_device_update(self, func: DeviceUpdateCallback) -> DeviceUpdateCallback:
+        self._device_update_callbacks.append(func)
+        return func
+
+    def on_device_remove(self, func: DeviceCallback) -> DeviceCallback:
+        self._device_remove_callbacks.append(func)
+        return func
+
+    def on_disconnect(self, func: DisconnectCallback) -> DisconnectCallback:
+        self._disconnect_callbacks.append(func)
+        return func
+
+    async def _call[**P](
+        self,
+        callbacks: list[Callable[P, MaybeAwaitable]],
+        *args: P.args,
+        **kwargs: P.kwargs,
+    ):
+        for cb in callbacks:
+            try:
+                ret = cb(*args, **kwargs)
+                if inspect.isawaitable(ret):
+                    await ret
+            except Exception as e:
+                self.handle_callback_error(e)
+
+    def handle_callback_error(self, e: Exception):
+        asyncio.get_running_loop().call_exception_handler(
+            {"message": "Error in InfoSubscriber callback", "exception": e},
+        )
+
+    # endregion
+
+    async def apply_snapshot(self, info: Info):
+        old_info = self._info
+        old_devices = self._devices
+        new_devices = info.devices or {}
+
+        self._info = info
+        self._devices = new_devices
+        self._synced.set()
+
+        if old_info and old_info.status != info.status:
+            await self._call(
+                self._status_change_callbacks,
+                old_info.status,
+                info.status,
+            )
+
+        for key, device in new_devices.items():
+            if (old := old_devices.get(key)) is None:
+                await self._call(self._device_add_callbacks, key, device)
+            elif old != device:
+                await self._call(self._device_update_callbacks, key, old, device)
+        for key, device in old_devices.items():
+            if key not in new_devices:
+                await self._call(self._device_remove_callbacks, key, device)
+
+        await self._call(self._sync_callbacks, info)
+
+    def merge_event(self, event: InfoEvent) -> Info:
+        if event.devices is None:
+            devices = None
+        elif event.snapshot or (self._info is None):
+            devices = {k: v for k, v in event.devices.items() if v is not None}
+        else:
+            devices = self._devices.copy()
+            for k, v in event.devices.items():
+                if v is None:
+                    devices.pop(k, None)
+                else:
+                    devices[k] = v
+        return Info(status=event.status, devices=devices)
+
+    async def _handle_ws(self, ws: "ClientConnection"):
+        async for message in ws:
+            event = _validate_event(message)
+            info = self.merge_event(event)
+            self._offset = event.offset
+            await self.apply_snapshot(info)
+
+    async def run(self):
+        """Connect and keep the replica synced until cancelled."""
+        try:
+            from websockets.asyncio.client import connect
+        except ImportError as e:
+            raise ImportError(
+                "InfoSubscriber requires websockets,"
+                " install sleepy-rework-types[ws] to use it",
+            ) from e
+
+        delay = self.reconnect_delay
+        while True:
+            try:
+                async with connect(
+                    self.url,
+                    additional_headers=self.headers,
+                    **self.connect_kwargs,
+                ) as ws:
+                    self._ws = ws
+                    delay = self.reconnect_delay
+                    # resumed, missed events (if any) are replayed right away
+                    if self._info is not None:
+                        self._synced.set()
+                    await self._handle_ws(ws)
+                e = ConnectionError("Connection closed by server")
+            except asyncio.CancelledError:
+                raise
+            except Exception as ex:
+                e = ex
+            finally:
+                self._ws = None
+                self._synced.clear()
+
+            await self._call(self._disconnect_callbacks, e)
+            # jittered so a restarting server isn't hit by every viewer at once
+            await asyncio.sleep(delay * random.uniform(0.5, 1.5))  # noqa: S311
+            delay = min(delay * 2, self.max_reconnect_delay)
+
+    def start(self) -> asyncio.Task:
+        if not (self._task and not self._task.done()):
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    async def stop(self):
+        if not self._task:
+            return
+        task = self._task
+        self._task = None
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    async def __aenter__(self) -> Self:
+        self.start()
+        return self
+
+    async def __aexit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
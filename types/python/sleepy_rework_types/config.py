@@ -2,7 +2,7 @@ import ssl
 from ipaddress import IPv4Address
 from pathlib import Path
 
-from pydantic import BaseModel, ConfigDict, IPvAnyAddress, field_validator
+from pydantic import BaseModel, ConfigDict, Field, IPvAnyAddress, field_validator
 
 from .enums import DeviceType, OnlineStatus
 
@@ -66,6 +66,25 @@ class DeviceConfig(BaseModel):
     remove_when_offline: bool = False
 
 
+class DeviceServerConfig(DeviceConfig):
+    """`DeviceConfig` with the settings only the config files can set"""
+
+    # overrides `Config.device_update_rate` and `Config.device_update_burst`,
+    # server side only, so never dumped
+    update_rate: float | None = Field(default=None, exclude=True)
+    update_burst: int | None = Field(default=None, exclude=True)
+
+    def with_config(self, cfg: DeviceConfig) -> "DeviceServerConfig":
+        """`cfg` sent by a client, keeping the server side settings of this one"""
+        return self.model_validate(
+            {
+                **cfg.model_dump(exclude_unset=True),
+                "update_rate": self.update_rate,
+                "update_burst": self.update_burst,
+            },
+        )
+
+
 class FrontendStatusConfig(BaseModel):
     name: str
     description: str
@@ -98,9 +117,18 @@ class Config(BaseModel):
 
     poll_offline_timeout: int = 30
     frontend_event_throttle: float = 1
+    frontend_event_log_size: int = 1024
     allow_new_devices: bool = False
+    fast_device_ingest: bool = False
+    inline_initial_state: bool = False  # into the `index.html` of the frontend
+    watch_config: bool = False  # reload the config files when they change
+    device_update_rate: float = 0  # updates per second per device, 0 for unlimited
+    device_update_burst: int = 5
+    loop_watchdog: bool = False
+    loop_watchdog_interval: float = 0.1
+    loop_lag_threshold: float = 0.1  # seconds, stalls longer than it are captured
 
     app: AppConfig = AppConfig()
     cors: CORSConfig = CORSConfig()
     frontend: FrontendConfig = FrontendConfig()
-    devices: dict[str, DeviceConfig] = {}
+    devices: dict[str, DeviceServerConfig] = {}
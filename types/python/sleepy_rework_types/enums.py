@@ -15,3 +15,9 @@ class OnlineStatus(StrEnum):
     OFFLINE = auto()
     IDLE = auto()
     UNKNOWN = auto()
+
+
+class AckMode(StrEnum):
+    NONE = auto()
+    SEQ = auto()  # only the update sequence number of the device
+    FULL = auto()  # the whole updated device info
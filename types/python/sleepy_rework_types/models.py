@@ -3,7 +3,7 @@ from typing import Any, Literal
 from pydantic import BaseModel, ConfigDict, computed_field
 
 from .config import DeviceConfig
-from .enums import OnlineStatus
+from .enums import AckMode, OnlineStatus
 
 
 class ErrDetail(BaseModel):
@@ -47,6 +47,11 @@ class DeviceInfoFromClient(DeviceConfig):
 
 class DeviceInfoFromClientWS(DeviceInfoFromClient):
     replace: bool = False
+    ack: AckMode | None = None  # overrides the ack mode of the connection
+
+
+class DeviceInfoAck(BaseModel):
+    seq: int  # number of updates applied to the device since it was added
 
 
 class DeviceInfo(DeviceInfoFromClient):
@@ -66,3 +71,11 @@ class DeviceInfo(DeviceInfoFromClient):
 class Info(BaseModel):
     status: OnlineStatus
     devices: dict[str, DeviceInfo] | None = None
+
+
+class InfoEvent(BaseModel):
+    offset: int
+    status: OnlineStatus
+    # changed devices, removed ones are `None`; always `None` in privacy mode
+    devices: dict[str, DeviceInfo | None] | None = None
+    snapshot: bool = False  # `devices` holds every device instead of the changed ones
@@ -56,7 +56,11 @@ client.use({
 export type WSPathOption<K extends WsPath> =
   WsPathParams<K> extends never ? {} : { path: WsPathParams<K> }
 export type WSQueryOption<K extends WsPath> =
-  WsQueryParams<K> extends never ? {} : { query: WsQueryParams<K> }
+  WsQueryParams<K> extends never
+    ? {}
+    : {} extends WsQueryParams<K>
+      ? { query?: WsQueryParams<K> }
+      : { query: WsQueryParams<K> }
 export type WSOption<K extends WsPath> = WSPathOption<K> & WSQueryOption<K>
 
 export function createWS<T extends WsPath>(
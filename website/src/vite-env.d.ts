@@ -1 +1,8 @@
 /// <reference types="vite/client" />
+
+interface Window {
+  __SLEEPY_INITIAL_STATE__?: {
+    config: import('sleepy-rework-types').FrontendConfig
+    info: import('sleepy-rework-types').Info
+  }
+}